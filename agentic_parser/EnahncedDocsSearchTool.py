@@ -1,76 +1,186 @@
 from crewai_tools import CodeDocsSearchTool
+from crewai_tools.adapters.embedchain_adapter import EmbedchainAdapter
+from crewai_tools.tools.code_docs_search_tool.code_docs_search_tool import FixedCodeDocsSearchToolSchema
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
-import requests
+from embedding_service import ServiceEmbedder, crew_embedder_config
+import streaming
+import telemetry
+import time
+from embedchain import App
+from embedchain.config import BaseLlmConfig
+from embedchain.llm.google import GoogleLlm
+from embedchain.models.data_type import DataType
+from pydantic import BaseModel
+from typing import Dict, Optional, Type
 from bs4 import BeautifulSoup
-import os
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urldefrag, urljoin, urlparse
+from crawl_scope import CrawlBudgetExhausted, CrawlScope, CrawlScopeError
+from near_duplicates import NEAR_DUP_THRESHOLD, NearDuplicateFilter, prefer_url_key
+from page_cache import page_cache
+from refresh_scheduler import REFRESH_BUDGET, RefreshScheduler
+from site_index import discover_site_pages
 
 load_dotenv()
 
-gapi_key = os.getenv('GEMINI_API_KEY')
 documentation_url = 'https://documentation-using-ai-agent.readthedocs.io/en/latest/'
 
-def find_all_subpages(base_url, visited=None):
-    """Find all subpages of a documentation website."""
+def find_all_subpages(base_url, visited=None, scope=None, depth=0, fetched=None):
+    """
+    Find all subpages of a documentation website.
+
+    The crawl follows the scope's depth limit and URL rules and stops once its
+    page or byte budget is used up. `visited` collects every URL attempted;
+    only the URLs that were actually fetched are returned, so a URL skipped
+    when first reached too deep is still returned once fetched from a shallower page.
+    """
     if visited is None:
         visited = set()
+    if scope is None:
+        scope = CrawlScope()
+    if fetched is None:
+        fetched = set()
 
-    if base_url in visited:
-        return visited
+    if base_url in visited or scope.exhausted or not scope.allows(base_url, depth):
+        return fetched
 
     print(f"Finding links on: {base_url}")
     visited.add(base_url)
 
     try:
-        response = requests.get(base_url, timeout=10)
-        if response.status_code != 200:
-            return visited
+        page = scope.fetch(base_url, timeout=10)
+        fetched.add(base_url)
+        if page['status_code'] != 200:
+            return fetched
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(page['html'], "html.parser")
 
         # Find all internal links
         for link in soup.find_all("a", href=True):
             href = link["href"]
-            next_url = urljoin(base_url, href)
+            next_url = urldefrag(urljoin(base_url, href))[0]
 
             # Ensure it's within the same documentation domain
             if urlparse(next_url).netloc == urlparse(base_url).netloc:
                 if next_url not in visited:
-                    visited.update(find_all_subpages(next_url, visited))
+                    find_all_subpages(next_url, visited, scope, depth + 1, fetched)
 
+    except (CrawlBudgetExhausted, CrawlScopeError) as e:
+        print(f"Skipping {base_url}: {e}")
     except Exception as e:
         print(f"Error finding links on {base_url}: {e}")
 
-    return visited
+    return fetched
+
+
+def discover_pages(base_url):
+    """
+    Discover documentation pages, preferring the site's own index over link walking.
+
+    Pages whose text comes with the index are stored in the page cache so indexing
+    does not need to download them at all.
+    """
+    indexed_pages = discover_site_pages(base_url)
+    if not indexed_pages:
+        scope = CrawlScope()
+        pages = find_all_subpages(base_url, scope=scope)
+        scope.report()
+        return pages
+
+    for page_url, entry in indexed_pages.items():
+        if entry['text'] is not None and page_cache.get(page_url) is None:
+            page_cache.put(page_url, '', text=entry['text'])
+    return set(indexed_pages)
+
+
+def drop_near_duplicate_pages(page_urls, base_url):
+    """
+    Keep one page per cluster of near-identical pages, such as the same page under
+    several documentation versions, so each is embedded only once.
+    """
+    if NEAR_DUP_THRESHOLD <= 0:
+        return list(page_urls)
+
+    detector = NearDuplicateFilter(NEAR_DUP_THRESHOLD)
+    unique_pages = []
+    for page_url in sorted(page_urls, key=lambda url: prefer_url_key(url, base_url)):
+        try:
+            page = page_cache.fetch(page_url, timeout=10)
+        except Exception:
+            # build_docs_search_tool reports the failure
+            unique_pages.append(page_url)
+            continue
+        if page['text'] and detector.check(page_url, page['text']):
+            continue
+        unique_pages.append(page_url)
+
+    print(f"Dropped {len(detector.duplicates)} near-duplicate pages.")
+    return unique_pages
+
+
+class CachedDocsSearchTool(CodeDocsSearchTool):
+    """
+    CodeDocsSearchTool over text the crawler already extracted.
+
+    Passing docs_url to CodeDocsSearchTool makes it download the page again, so
+    this tool is created empty and pages are indexed with add_text. Searches
+    take only the query, as for a tool created with a docs_url.
+    """
+    args_schema: Type[BaseModel] = FixedCodeDocsSearchToolSchema
+
+    def add_text(self, text: str, metadata: Optional[Dict] = None) -> None:
+        """Index text as it is, without fetching anything."""
+        self.add(text, data_type=DataType.TEXT, metadata=metadata)
+
+
+def build_docs_search_tool(page_url):
+    """
+    Create a search tool over one page, indexed from the page cache instead of re-downloading.
+
+    Page and query embeddings go through the embedding service, so they are
+    batched, deduplicated and rate-limited with the crews' memory embeddings.
+    """
+    app = App(
+        llm=GoogleLlm(BaseLlmConfig(model="gemini/gemini-1.5-flash-latest")),
+        embedding_model=ServiceEmbedder()
+    )
+    tool = CachedDocsSearchTool(
+        description=f"A tool that can be used to semantic search a query the {page_url} Code Docs content.",
+        adapter=EmbedchainAdapter(embedchain_app=app)
+    )
+    try:
+        page = page_cache.fetch(page_url, timeout=10)
+    except Exception as e:
+        print(f"Error fetching {page_url}: {e}")
+        page = None
+    if page and page['text']:
+        with telemetry.span("embed", url=page_url):
+            tool.add_text(page['text'], metadata={'url': page_url})
+    return tool
 
 
 # Step 1: Find all subpages
-all_documentation_pages = find_all_subpages(documentation_url)
+discovery_started = time.time()
+all_documentation_pages = discover_pages(documentation_url)
 print(f"Discovered {len(all_documentation_pages)} pages.")
+if REFRESH_BUDGET:
+    # Cached pages are kept until the scheduler picks them, so they must not expire on their own
+    if page_cache.ttl or not page_cache.path:
+        print("Warning: scheduled refreshes need AGENTIC_PAGE_CACHE_PATH set and AGENTIC_PAGE_CACHE_TTL=0")
+    # Pages discovery just downloaded are recorded as visits instead of being fetched again
+    just_fetched = {
+        url: page for url, page in ((url, page_cache.get(url)) for url in all_documentation_pages)
+        if page is not None and page['fetched_at'] >= discovery_started
+    }
+    RefreshScheduler().refresh(all_documentation_pages, page_cache.refresh, fetched=just_fetched)
+all_documentation_pages = drop_near_duplicate_pages(all_documentation_pages, documentation_url)
 
-# Step 2: Initialize CodeDocsSearchTool for each page
+# Step 2: Index each crawled page from the page cache
 scrape_tools = [
-    CodeDocsSearchTool(
-        config=dict(
-            llm=dict(
-                provider="google",
-                config=dict(
-                    model="gemini/gemini-1.5-flash-latest",
-                ),
-            ),
-            embedder=dict(
-                provider="google",
-                config=dict(
-                    model="models/embedding-001",
-                    task_type="retrieval_document",
-                ),
-            ),
-        ),
-        docs_url=page_url
-    )
+    build_docs_search_tool(page_url)
     for page_url in all_documentation_pages
 ]
+page_cache.report()
 
 # Define Agents
 crawler_agent = Agent(
@@ -168,14 +278,8 @@ assist_task = Task(
     verbose=True
 )
 
-# Updated embedder configuration
-embedder_config = {
-    "provider": "google",
-    "config": {
-        "api_key": gapi_key,
-        "model": "models/embedding-001"
-    }
-}
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
 
 # Create and configure the crew
 crew = Crew(
@@ -195,5 +299,7 @@ if __name__ == "__main__":
         }
     }
     
-    result = crew.kickoff(inputs=inputs)
-    print(result)
+    result = streaming.kickoff(crew, inputs)
+    # In streaming mode the answer has already been printed as it arrived
+    if not streaming.STREAM:
+        print(result)
@@ -1,7 +1,10 @@
-import requests
 import urllib.parse
 from dotenv import load_dotenv
-from typing import Dict, List, Optional
+import block_store
+import http_client
+import markdown_ast
+import telemetry
+from typing import Dict, Iterator, List, Optional
 import json
 from datetime import datetime
 import os
@@ -9,16 +12,19 @@ import os
 load_dotenv()
 
 class GitLabRAGProcessor:
-    def __init__(self, repo_url: str, output_dir: str = "rag_data"):
+    def __init__(self, repo_url: str, output_dir: str = "rag_data",
+                 budget: Optional[http_client.RequestBudget] = None):
         """
         Initialize the RAG processor with a public GitLab repository URL.
         
         Args:
             repo_url (str): Full URL to the GitLab repository
             output_dir (str): Directory to store the processed RAG data
+            budget (RequestBudget): Request allowance shared with other processors, if any
         """
         self.repo_url = repo_url.rstrip('/')
         self.output_dir = output_dir
+        self.budget = budget
         
         # Extract repository information
         parts = self.repo_url.split('gitlab.com/')[-1].split('/')
@@ -32,10 +38,16 @@ class GitLabRAGProcessor:
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
 
+    def _get(self, url: str, **kwargs):
+        """GET a GitLab API URL, charging it to the shared request budget."""
+        if self.budget:
+            self.budget.spend()
+        return http_client.get(url, source="gitlab", **kwargs)
+
     def fetch_project_info(self) -> Optional[dict]:
         """Fetch basic project information."""
         try:
-            response = requests.get(self.api_url)
+            response = self._get(self.api_url)
             if response.status_code == 200:
                 return response.json()
             print(f"Warning: Could not fetch project info. Status code: {response.status_code}")
@@ -45,6 +57,8 @@ class GitLabRAGProcessor:
                 'web_url': self.repo_url,
                 'default_branch': 'main'
             }
+        except http_client.RequestBudgetExhausted:
+            raise
         except Exception as e:
             print(f"Warning: Error fetching project info: {e}")
             return {
@@ -61,37 +75,44 @@ class GitLabRAGProcessor:
         Returns:
             List[Dict]: List of dictionaries containing file info and content
         """
-        files_data = []
+        return list(self.iter_markdown_files(project_id, path))
+
+    def iter_markdown_files(self, project_id: int, path: str = "") -> Iterator[Dict[str, str]]:
+        """
+        Recursively yield markdown files one at a time as they are downloaded.
+        
+        Yields:
+            Dict: File path, content and title
+        """
         tree_url = f"https://gitlab.com/api/v4/projects/{project_id}/repository/tree"
         params = {"path": path} if path else {}
         
         try:
-            response = requests.get(tree_url, params=params)
+            response = self._get(tree_url, params=params)
             response.raise_for_status()
             items = response.json()
-            
-            for item in items:
-                item_path = f"{path}/{item['name']}" if path else item['name']
-                
-                if item['type'] == 'tree':
-                    # Recursively process directories
-                    files_data.extend(self.fetch_markdown_files(project_id, item_path))
-                    
-                elif item['type'] == 'blob' and item['name'].endswith('.md'):
-                    # Fetch file content
-                    content = self.fetch_file_content(project_id, item_path)
-                    if content:
-                        files_data.append({
-                            'path': item_path,
-                            'content': content,
-                            'title': self.extract_title(content) or item['name']
-                        })
-            
-            return files_data
-            
+        except http_client.RequestBudgetExhausted:
+            raise
         except Exception as e:
             print(f"Error fetching files: {e}")
-            return files_data
+            return
+        
+        for item in items:
+            item_path = f"{path}/{item['name']}" if path else item['name']
+            
+            if item['type'] == 'tree':
+                # Recursively process directories
+                yield from self.iter_markdown_files(project_id, item_path)
+                
+            elif item['type'] == 'blob' and item['name'].endswith('.md'):
+                # Fetch file content
+                content = self.fetch_file_content(project_id, item_path)
+                if content:
+                    yield {
+                        'path': item_path,
+                        'content': content,
+                        'title': self.extract_title(content) or item['name']
+                    }
 
     def fetch_file_content(self, project_id: int, file_path: str) -> Optional[str]:
         """Fetch content of a specific file."""
@@ -99,74 +120,94 @@ class GitLabRAGProcessor:
         url = f"https://gitlab.com/api/v4/projects/{project_id}/repository/files/{encoded_path}/raw"
         
         try:
-            response = requests.get(url)
+            response = self._get(url)
             response.raise_for_status()
             return response.text
+        except http_client.RequestBudgetExhausted:
+            raise
         except Exception as e:
             print(f"Error downloading {file_path}: {e}")
             return None
 
+    def fetch_last_commit_sha(self, branch: Optional[str] = None) -> Optional[str]:
+        """Return the SHA of the latest commit (on the default branch unless given), or None."""
+        params = {'per_page': 1}
+        if branch:
+            params['ref_name'] = branch
+        try:
+            response = self._get(f"{self.api_url}/repository/commits", params=params)
+            response.raise_for_status()
+            commits = response.json()
+            return commits[0]['id'] if commits else None
+        except http_client.RequestBudgetExhausted:
+            raise
+        except Exception as e:
+            print(f"Warning: Could not fetch last commit of {self.repo_url}: {e}")
+            return None
+
     def extract_title(self, content: str) -> Optional[str]:
-        """Extract title from markdown content."""
-        lines = content.split('\n')
-        for line in lines:
-            # Look for # or ## headers
-            if line.startswith('# '):
-                return line.replace('# ', '').strip()
-            if line.startswith('## '):
-                return line.replace('## ', '').strip()
-        return None
-
-    def process_for_rag(self) -> bool:
+        """Extract title (the first # or ## heading) from markdown content."""
+        return markdown_ast.parsed_markdown(content)['title']
+
+    def project_id_for(self, project_info: dict):
+        """Numeric project ID, falling back to the URL-encoded project path."""
+        project_id = project_info.get('id')
+        if not project_id:
+            print("Warning: Could not get project ID, trying with URL path...")
+            project_id = urllib.parse.quote(f'{self.namespace}/{self.project_name}', safe='')
+        return project_id
+
+    def build_rag_document(self, project_info: dict, project_id, commit_sha: Optional[str] = None) -> dict:
+        """
+        Download every markdown file of the repository into a RAG document.
+        
+        Returns:
+            dict: Project info and the list of processed documents
+        """
+        rag_document = {
+            'project_info': {
+                'name': project_info['name'],
+                'url': project_info['web_url'],
+                'commit_sha': commit_sha,
+                'processed_date': datetime.now().isoformat()
+            },
+            'documents': []
+        }
+        
+        # Process each markdown file as soon as it is downloaded
+        print(f"Fetching markdown files from {self.repo_url}...")
+        for file_data in self.iter_markdown_files(project_id):
+            rag_document['documents'].append({
+                'title': file_data['title'],
+                'content': file_data['content'],
+                'source_file': file_data['path'],
+                'repository': self.repo_url
+            })
+        return rag_document
+
+    def process_for_rag(self, output_name: str = 'rag_processed.json') -> bool:
         """
         Process repository content into RAG-friendly format.
         
+        Args:
+            output_name (str): File name of the RAG document inside output_dir
+        
         Returns:
             bool: True if processing was successful
         """
         try:
-            # Fetch project information
             project_info = self.fetch_project_info()
-            project_id = project_info.get('id')
-            
-            if not project_id:
-                print("Warning: Could not get project ID, trying with URL path...")
-                project_id = urllib.parse.quote(f'{self.namespace}/{self.project_name}', safe='')
+            rag_document = self.build_rag_document(project_info, self.project_id_for(project_info))
             
-            # Fetch all markdown files
-            print("Fetching markdown files...")
-            markdown_files = self.fetch_markdown_files(project_id)
-            
-            if not markdown_files:
+            if not rag_document['documents']:
                 print("No markdown files found in the repository")
                 return False
             
-            # Prepare RAG document
-            rag_document = {
-                'project_info': {
-                    'name': project_info['name'],
-                    'url': project_info['web_url'],
-                    'processed_date': datetime.now().isoformat()
-                },
-                'documents': []
-            }
-            
-            # Process each markdown file
-            for file_data in markdown_files:
-                document = {
-                    'title': file_data['title'],
-                    'content': file_data['content'],
-                    'source_file': file_data['path'],
-                    'repository': self.repo_url
-                }
-                rag_document['documents'].append(document)
-            
             # Save processed data
-            output_path = os.path.join(self.output_dir, 'rag_processed.json')
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(rag_document, f, ensure_ascii=False, indent=2)
+            output_path = block_store.store_path(os.path.join(self.output_dir, output_name))
+            save_rag_document(rag_document, output_path)
             
-            print(f"\nSuccessfully processed {len(markdown_files)} markdown files")
+            print(f"\nSuccessfully processed {len(rag_document['documents'])} markdown files")
             print(f"RAG document saved to: {output_path}")
             
             # Print found documents
@@ -180,13 +221,44 @@ class GitLabRAGProcessor:
             print(f"Error processing repository: {e}")
             return False
 
+def save_rag_document(rag_document: dict, output_path: str):
+    """
+    Write a RAG document as indented JSON or, for a .blocks path, as a block store.
+    
+    In a block store the project info is kept as metadata and every document is
+    a record keyed by its source file, so one file can be read without loading
+    the rest.
+    """
+    if output_path.endswith(block_store.BLOCK_EXTENSION):
+        block_store.write_records(
+            output_path,
+            ((document['source_file'], document) for document in rag_document['documents']),
+            meta=rag_document['project_info']
+        )
+        return
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(rag_document, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_path)
+
+
+def load_rag_document(path: str) -> dict:
+    """Read a RAG document written by save_rag_document, in either format."""
+    if path.endswith(block_store.BLOCK_EXTENSION):
+        project_info, documents = block_store.read_records(path)
+        return {'project_info': project_info, 'documents': list(documents.values())}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 def main():
 
     repo_url = os.getenv("GITLAB_REPO_BASE")  # Replace with actual repository URL
     
     try:
         processor = GitLabRAGProcessor(repo_url)
-        success = processor.process_for_rag()
+        with telemetry.span("gitlab.process", repository=repo_url):
+            success = processor.process_for_rag()
         
         if success:
             print("\nRepository successfully processed for RAG")
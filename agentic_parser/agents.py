@@ -1,114 +1,13 @@
-from bs4 import BeautifulSoup
-from typing import Dict, Type
-import requests
-from dataclasses import Field
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
-from urllib.parse import urljoin
-from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
-import os
+from embedding_service import crew_embedder_config
+from documentation_tool import EnhancedDocumentationTool
+from fast_path import FAST_PATH, kickoff_with_context
+from focused_crawl import FOCUSED_CRAWL
+import streaming
 
 load_dotenv()
 
-gapi_key = os.getenv('GEMINI_API_KEY')
-
-class EnhancedDocumentationToolInput(BaseModel):
-    """Input schema for EnhancedDocumentationTool."""
-    url: str = Field(..., description="The starting URL to crawl for documentation content.")
-
-class EnhancedDocumentationTool(BaseTool):
-    name: str = "enhanced_documentation_tool"
-    description: str = "A tool to crawl and extract content from documentation pages."
-    args_schema: Type[BaseModel] = EnhancedDocumentationToolInput
-
-    def __init__(self, base_url: str):
-        # Explicitly set the name and description for BaseTool constructor
-        super().__init__(name=self.name, description=self.description)
-        self.base_url = base_url
-        self.visited_urls = set()
-        self.content_store = {}
-
-    def _run(self, input_data: EnhancedDocumentationToolInput) -> Dict:
-        """Implements the tool's primary logic."""
-        url = input_data.url  # Extract URL from the input schema
-        if not url:
-            return {"error": "No URL provided"}
-        return self.crawl(url)
-
-    def crawl(self, url: str) -> Dict:
-        """Recursively crawl documentation pages."""
-        if url in self.visited_urls:
-            return {}
-
-        try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            self.visited_urls.add(url)
-
-            # Extract content
-            content = self._extract_content(soup)
-            # Find documentation links
-            links = self._find_doc_links(soup, url)
-
-            # Store current page content
-            self.content_store[url] = {
-                'title': content['title'],
-                'content': content['content'],
-                'links': links,
-                'metadata': content['metadata']
-            }
-
-            # Recursively crawl linked pages
-            for link in links:
-                if link not in self.visited_urls:
-                    self.crawl(link)
-
-            return self.content_store
-
-        except Exception as e:
-            return {'error': f'Failed to crawl {url}: {str(e)}'}
-
-    def _extract_content(self, soup: BeautifulSoup) -> Dict:
-        """Extract content from page."""
-        main_content = (
-            soup.find('article') or
-            soup.find('main') or
-            soup.find('div', class_='content') or
-            soup.find('div', class_='document')
-        )
-
-        sections = []
-        if main_content:
-            for header in main_content.find_all(['h1', 'h2', 'h3']):
-                sections.append({
-                    'level': int(header.name[1]),
-                    'text': header.get_text(strip=True)
-                })
-
-        return {
-            'title': soup.title.string if soup.title else '',
-            'content': main_content.get_text('\n', strip=True) if main_content else '',
-            'metadata': {
-                'sections': sections
-            }
-        }
-
-    def _find_doc_links(self, soup: BeautifulSoup, current_url: str) -> list[str]:
-        """Find documentation-related links."""
-        links = []
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            full_url = urljoin(current_url, href)
-            if (
-                full_url.startswith(self.base_url) and
-                not href.startswith('#') and
-                full_url not in self.visited_urls
-            ):
-                links.append(full_url)
-        return links
-    
-
 # Initialize tools
 doc_tool = EnhancedDocumentationTool('https://documentation-using-ai-agent.readthedocs.io/en/latest/')
 
@@ -210,14 +109,8 @@ assist_task = Task(
     verbose=True
 )
 
-# Updated embedder configuration with correct model name format
-embedder_config = {
-    "provider": "google",
-    "config": {
-        "api_key": gapi_key,
-        "model": "models/embedding-001"
-    }
-}
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
 
 # Create and configure the crew
 crew = Crew(
@@ -235,5 +128,19 @@ if __name__ == "__main__":
                   
     }
     
-    result = crew.kickoff(inputs=inputs)
-    print(result)
\ No newline at end of file
+    def crawl_docs():
+        # Only the pages relevant to the query when the focused crawl is on
+        if FAST_PATH and FOCUSED_CRAWL:
+            doc_tool.focused_crawl(doc_tool.base_url, inputs["query"])
+        else:
+            doc_tool.collect(doc_tool.base_url)
+        return doc_tool.content_store
+
+    # Answers from precomputed summaries, a map-reduce analysis and/or docs crawled
+    # and structured in code when enabled, running only the assist task
+    result = kickoff_with_context(
+        crew, user_assistant, embedder_config, crawl_docs, inputs, doc_tool.base_url
+    )
+    # In streaming mode the answer has already been printed as it arrived
+    if not streaming.STREAM:
+        print(result)
\ No newline at end of file
@@ -1,12 +1,12 @@
 from crewai_tools import CodeDocsSearchTool
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
+from embedding_service import crew_embedder_config
+import streaming
 
-import os
 
 load_dotenv()
 
-gapi_key = os.getenv('GEMINI_API_KEY')
 # Initialize tools
 
 documentation_url = 'https://documentation-using-ai-agent.readthedocs.io/en/latest/'
@@ -124,14 +124,8 @@ assist_task = Task(
     verbose=True
 )
 
-# Updated embedder configuration with correct model name format
-embedder_config = {
-    "provider": "google",
-    "config": {
-        "api_key": gapi_key,
-        "model": "models/embedding-001"
-    }
-}
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
 
 # Create and configure the crew
 crew = Crew(
@@ -151,5 +145,7 @@ if __name__ == "__main__":
         }
     }
     
-    result = crew.kickoff(inputs=inputs)
-    print(result)
\ No newline at end of file
+    result = streaming.kickoff(crew, inputs)
+    # In streaming mode the answer has already been printed as it arrived
+    if not streaming.STREAM:
+        print(result)
\ No newline at end of file
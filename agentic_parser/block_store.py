@@ -0,0 +1,320 @@
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from dotenv import load_dotenv
+from output_dir import output_path
+
+load_dotenv()
+
+# "json" keeps the indented JSON files; "blocks" writes compressed block stores instead
+STORE_FORMAT = os.getenv("AGENTIC_STORE_FORMAT", "json").lower()
+# Uncompressed bytes of records grouped into one compressed block
+BLOCK_SIZE = int(os.getenv("AGENTIC_BLOCK_SIZE", str(64 * 1024)))
+BLOCK_EXTENSION = '.blocks'
+
+# File layout:
+#   block 0 | block 1 | ... | index | footer
+# Every block is an independent compressed frame holding a JSON list of records,
+# so one record is read by seeking to its block and decompressing only that block.
+# The index (compressed the same way) lists the offset, length and keys of every
+# block plus free-form metadata. The fixed-size footer points at the index.
+MAGIC = b'AGBLK01'
+FOOTER = struct.Struct('<QQB7s')
+CODECS = {1: 'zstd', 2: 'zlib'}
+
+
+def _default_codec() -> str:
+    """zstd when the zstandard package is installed, otherwise zlib from the standard library."""
+    try:
+        import zstandard  # noqa: F401
+        return 'zstd'
+    except ImportError:
+        return 'zlib'
+
+
+def _compressor(codec: str):
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=9).compress
+    return lambda data: zlib.compress(data, 6)
+
+
+def _decompressor(codec: str):
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+class BlockWriter:
+    def __init__(self, path: str, meta: Optional[Dict] = None, codec: Optional[str] = None,
+                 block_size: int = BLOCK_SIZE):
+        """
+        Write keyed JSON records into a compressed block store.
+
+        The file is written next to its final path and moved into place on close,
+        so readers never see a partial store.
+
+        Args:
+            path (str): Destination file.
+            meta (dict): Free-form metadata stored in the index.
+            codec (str): "zstd" or "zlib"; defaults to zstd when available.
+            block_size (int): Uncompressed bytes of records per block.
+        """
+        self.path = path
+        self.meta = meta or {}
+        self.codec = codec or _default_codec()
+        self.block_size = block_size
+        self._compress = _compressor(self.codec)
+        self._blocks = []
+        self._keys = set()
+        self._pending = []
+        self._pending_bytes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = path + '.tmp'
+        self._file = open(self._tmp_path, 'wb')
+
+    def add(self, key: str, record):
+        """Append one record; keys must be unique within the store."""
+        if key in self._keys:
+            raise ValueError(f"Duplicate key in block store: {key}")
+        self._keys.add(key)
+        encoded = json.dumps(record, ensure_ascii=False)
+        self._pending.append((key, encoded))
+        self._pending_bytes += len(encoded)
+        if self._pending_bytes >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        data = ('[' + ','.join(encoded for _, encoded in self._pending) + ']').encode('utf-8')
+        frame = self._compress(data)
+        self._blocks.append({
+            'offset': self._file.tell(),
+            'length': len(frame),
+            'keys': [key for key, _ in self._pending]
+        })
+        self._file.write(frame)
+        self._pending = []
+        self._pending_bytes = 0
+
+    def close(self):
+        """Write the index and footer and move the store into place."""
+        self._flush_block()
+        index = self._compress(json.dumps({'meta': self.meta, 'blocks': self._blocks}).encode('utf-8'))
+        index_offset = self._file.tell()
+        self._file.write(index)
+        codec_id = next(codec_id for codec_id, name in CODECS.items() if name == self.codec)
+        self._file.write(FOOTER.pack(index_offset, len(index), codec_id, MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BlockReader:
+    def __init__(self, path: str):
+        """
+        Random access to a block store.
+
+        Opening reads only the footer and the index; records are decompressed
+        one block at a time on demand. The most recently read block is kept, so
+        reading neighbouring keys in order decompresses each block once.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+
+        self._file.seek(-FOOTER.size, os.SEEK_END)
+        index_offset, index_length, codec_id, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+        if magic != MAGIC or codec_id not in CODECS:
+            raise ValueError(f"Not a block store: {path}")
+        self.codec = CODECS[codec_id]
+        self._decompress = _decompressor(self.codec)
+
+        self._file.seek(index_offset)
+        index = json.loads(self._decompress(self._file.read(index_length)))
+        self.meta: Dict = index['meta']
+        self._blocks = index['blocks']
+        self._locations = {
+            key: (block_no, position)
+            for block_no, block in enumerate(self._blocks)
+            for position, key in enumerate(block['keys'])
+        }
+        self._cached_block: Tuple[int, list] = (-1, [])
+
+    def _read_block(self, block_no: int) -> list:
+        with self._lock:
+            if self._cached_block[0] != block_no:
+                block = self._blocks[block_no]
+                self._file.seek(block['offset'])
+                records = json.loads(self._decompress(self._file.read(block['length'])))
+                self._cached_block = (block_no, records)
+            return self._cached_block[1]
+
+    def get(self, key: str, default=None):
+        """Return one record, decompressing only the block that holds it."""
+        location = self._locations.get(key)
+        if location is None:
+            return default
+        block_no, position = location
+        return self._read_block(block_no)[position]
+
+    def keys(self):
+        return self._locations.keys()
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """Yield every (key, record) in write order, one block in memory at a time."""
+        for block_no, block in enumerate(self._blocks):
+            yield from zip(block['keys'], self._read_block(block_no))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_records(path: str, records: Iterable[Tuple[str, object]], meta: Optional[Dict] = None,
+                  codec: Optional[str] = None, block_size: int = BLOCK_SIZE):
+    """Write (key, record) pairs to a block store."""
+    with BlockWriter(path, meta=meta, codec=codec, block_size=block_size) as writer:
+        for key, record in records:
+            writer.add(key, record)
+
+
+def read_records(path: str) -> Tuple[Dict, Dict[str, object]]:
+    """Load a whole block store as (meta, {key: record})."""
+    with BlockReader(path) as reader:
+        return reader.meta, dict(reader.items())
+
+
+def store_path(json_path: str) -> str:
+    """The path an artefact is stored under in the configured STORE_FORMAT."""
+    if STORE_FORMAT != 'blocks':
+        return json_path
+    root, ext = os.path.splitext(json_path)
+    return root + BLOCK_EXTENSION if ext == '.json' else json_path + BLOCK_EXTENSION
+
+
+def benchmark(records: Dict[str, object], directory: str, lookups: int = 100) -> Dict[str, Dict]:
+    """
+    Compare indented JSON with a block store for one set of records.
+
+    Measures file size, write time, full load time and the time to read single
+    records from a cold open (the JSON file has to be parsed whole every time).
+
+    Args:
+        records (dict): Key mapped to a JSON-serialisable record.
+        directory (str): Where the benchmark files are written.
+        lookups (int): Random single-record reads to average over.
+
+    Returns:
+        dict: Format name mapped to size_bytes, write_seconds, load_seconds and lookup_seconds.
+    """
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, 'benchmark.json')
+    blocks_path = os.path.join(directory, 'benchmark' + BLOCK_EXTENSION)
+    keys = random.Random(0).choices(list(records), k=lookups) if records else []
+    results = {}
+
+    start = time.perf_counter()
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    write_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(json_path, 'r', encoding='utf-8') as f:
+        json.load(f)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            json.load(f)[key]
+    results['json'] = {
+        'size_bytes': os.path.getsize(json_path),
+        'write_seconds': write_seconds,
+        'load_seconds': load_seconds,
+        'lookup_seconds': (time.perf_counter() - start) / max(len(keys), 1)
+    }
+
+    for codec in ('zstd', 'zlib') if _default_codec() == 'zstd' else ('zlib',):
+        start = time.perf_counter()
+        write_records(blocks_path, records.items(), codec=codec)
+        write_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        read_records(blocks_path)
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for key in keys:
+            with BlockReader(blocks_path) as reader:
+                reader.get(key)
+        results[f'blocks-{codec}'] = {
+            'size_bytes': os.path.getsize(blocks_path),
+            'write_seconds': write_seconds,
+            'load_seconds': load_seconds,
+            'lookup_seconds': (time.perf_counter() - start) / max(len(keys), 1)
+        }
+    return results
+
+
+def main():
+    """
+    Benchmark the block store against JSON.
+
+    Usage:
+        python block_store.py <rag_processed.json | docs_dir> [work_dir]
+
+    work_dir defaults to block_benchmark/ under the output directory.
+    """
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    source = sys.argv[1]
+    if os.path.isdir(source):
+        from document_source import iter_local_markdown
+        records = {document['path']: document for document in iter_local_markdown(source)}
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            records = {document['source_file']: document for document in json.load(f)['documents']}
+
+    results = benchmark(records, sys.argv[2] if len(sys.argv) > 2 else output_path('block_benchmark'))
+    print(f"{len(records)} records")
+    print(f"{'format':<14}{'size':>12}{'write ms':>12}{'load ms':>12}{'lookup ms':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<14}{result['size_bytes']:>12,}{result['write_seconds'] * 1000:>12.2f}"
+            f"{result['load_seconds'] * 1000:>12.2f}{result['lookup_seconds'] * 1000:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
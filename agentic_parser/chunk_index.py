@@ -0,0 +1,133 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Passages retrieved for each query and placed ahead of the rendered documentation; 0 disables retrieval
+RETRIEVAL_PASSAGES = int(os.getenv("AGENTIC_RETRIEVAL_PASSAGES", "5"))
+# BM25 term-frequency saturation and document-length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Reciprocal rank fusion constant used to merge the lexical and vector rankings
+RRF_K = 60
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+def build_lexical_index(texts: Sequence[str]) -> Tuple[Dict[str, List[int]], np.ndarray, np.ndarray]:
+    """
+    BM25 index of texts as flat posting arrays.
+
+    Every posting stores the final BM25 weight of a term in a text, so a query
+    only adds up precomputed weights, and the arrays can be memory-mapped as they are.
+
+    Returns:
+        tuple: terms (term mapped to [start, count] in the posting arrays), rows
+        (int32 text row of each posting, grouped by term) and weights (float32).
+    """
+    counts = [Counter(tokenize(text)) for text in texts]
+    lengths = [sum(count.values()) for count in counts]
+    average = sum(lengths) / len(lengths) if lengths else 0
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for row, count in enumerate(counts):
+        for term, frequency in count.items():
+            postings.setdefault(term, []).append((row, frequency))
+
+    terms, rows, weights = {}, [], []
+    for term in sorted(postings):
+        entries = postings[term]
+        idf = math.log(1 + (len(texts) - len(entries) + 0.5) / (len(entries) + 0.5))
+        terms[term] = [len(rows), len(entries)]
+        for row, frequency in entries:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[row] / average) if average else BM25_K1
+            rows.append(row)
+            weights.append(idf * frequency * (BM25_K1 + 1) / (frequency + norm))
+    return terms, np.asarray(rows, dtype=np.int32), np.asarray(weights, dtype=np.float32)
+
+
+class ChunkIndex:
+    def __init__(self, chunks, size: int, terms: Dict[str, List[int]], rows: np.ndarray, weights: np.ndarray,
+                 vectors: Optional[np.ndarray] = None, vector_model: Optional[str] = None):
+        """
+        Lexical and vector search over the chunks of a corpus.
+
+        Both rankings are merged with reciprocal rank fusion. The arrays may be
+        memory-mapped from a snapshot, so only the postings of the query's
+        terms and the vectors are paged in.
+
+        Args:
+            chunks: Mapping of row (as a string) to chunk, e.g. a dict or a block_store.BlockReader.
+            size (int): Number of chunks.
+            terms (dict): Term mapped to [start, count] in rows and weights, from build_lexical_index.
+            rows (np.ndarray): Chunk row of every posting.
+            weights (np.ndarray): BM25 weight of every posting.
+            vectors (np.ndarray): (size, dim) chunk embeddings; None searches lexically only.
+            vector_model (str): Embedder the vectors came from; queries must be embedded with the same one.
+        """
+        self.chunks = chunks
+        self.size = size
+        self.terms = terms
+        self.rows = rows
+        self.weights = weights
+        self.vectors = vectors
+        self.vector_model = vector_model
+
+    @classmethod
+    def build(cls, chunks: List[Dict], vectors: Optional[np.ndarray] = None,
+              vector_model: Optional[str] = None) -> 'ChunkIndex':
+        """Index chunks from pipeline.chunk_documents held in memory."""
+        terms, rows, weights = build_lexical_index([chunk['content'] for chunk in chunks])
+        return cls({str(row): chunk for row, chunk in enumerate(chunks)}, len(chunks), terms, rows, weights,
+                   vectors, vector_model)
+
+    def lexical(self, query: str, k: int) -> List[int]:
+        """Rows of the k chunks with the highest BM25 score; chunks sharing no term are left out."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            entry = self.terms.get(term)
+            if entry:
+                start, count = entry
+                np.add.at(scores, self.rows[start:start + count], self.weights[start:start + count])
+        ranked = np.argsort(-scores, kind='stable')[:k]
+        return [int(row) for row in ranked if scores[row] > 0]
+
+    def semantic(self, query_vector: Sequence[float], k: int) -> List[int]:
+        """Rows of the k chunks whose embeddings are closest to the query's by cosine similarity."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norms = np.linalg.norm(self.vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (self.vectors @ query) / np.where(norms > 0, norms, 1.0)
+        return [int(row) for row in np.argsort(-scores, kind='stable')[:k]]
+
+    def search(self, query: str, k: int = RETRIEVAL_PASSAGES,
+               query_vector: Optional[Sequence[float]] = None) -> List[Dict]:
+        """The k chunks most relevant to a query, best first."""
+        if not self.size or k <= 0:
+            return []
+        rankings = [self.lexical(query, 2 * k)]
+        if self.vectors is not None and query_vector is not None:
+            rankings.append(self.semantic(query_vector, 2 * k))
+        fused = Counter()
+        for ranking in rankings:
+            for rank, row in enumerate(ranking):
+                fused[row] += 1 / (RRF_K + rank + 1)
+        return [self.chunks.get(str(row)) for row, _ in fused.most_common(k)]
+
+
+def render_passages(chunks: List[Dict]) -> str:
+    """Render retrieved chunks as prompt context."""
+    lines = ["Passages most relevant to the question:"]
+    for chunk in chunks:
+        heading = chunk.get('title') or chunk['path']
+        if chunk.get('section'):
+            heading += f" > {chunk['section']}"
+        lines.append(f"\n### {heading} ({chunk['path']})\n{chunk['content']}")
+    return '\n'.join(lines)
@@ -0,0 +1,362 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+import block_store
+from chunk_index import ChunkIndex
+import markdown_ast
+from output_dir import output_path
+
+load_dotenv()
+
+# Built corpora are kept here so a restarted worker restores one instead of rebuilding; empty disables snapshots
+SNAPSHOT_DIR = os.getenv("AGENTIC_SNAPSHOT_DIR", output_path("snapshots"))
+# Snapshots kept per corpus; older ones are deleted after a new one is written
+SNAPSHOT_KEEP = int(os.getenv("AGENTIC_SNAPSHOT_KEEP", "2"))
+# Bump when the snapshot layout changes so every existing snapshot is rebuilt
+SNAPSHOT_FORMAT = "2"
+
+# Snapshot layout, one directory per build under <SNAPSHOT_DIR>/<corpus>/:
+#   manifest.json   - versions, counts and build time; read on open
+#   doc_context.txt - rendered prompt context (UTF-8), read on first access
+#   pages.blocks    - content store, one record per page, read a block at a time
+#   graph.json      - link graph, loaded on first access
+#   summaries.json  - summary store, loaded on first access
+#   chunks.blocks   - chunk text and metadata keyed by row, read a block at a time
+#   terms.json      - lexical index vocabulary: term -> [start, count] in the posting arrays
+#   postings.rows.npy, postings.weights.npy - int32 chunk rows and float32 BM25 weights, memory-mapped
+#   vectors.npy     - float32 chunk embeddings, memory-mapped (absent when the build had none)
+# The manifest records the number of chunks, postings and vector dimensions, and
+# a snapshot whose arrays do not match it is not opened.
+# CURRENT in the corpus directory names the latest build and is replaced atomically,
+# so readers never see a half-written snapshot and keep their files after a newer build.
+CURRENT = 'CURRENT'
+MANIFEST = 'manifest.json'
+
+
+def corpus_directory(corpus_id: str, directory: Optional[str] = SNAPSHOT_DIR) -> str:
+    """Directory holding the snapshots of one corpus (a docs folder, repo URL or site)."""
+    if os.path.isdir(corpus_id):
+        corpus_id = os.path.abspath(corpus_id)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', corpus_id).strip('_')[:80]
+    digest = hashlib.sha256(corpus_id.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(directory, f"{slug}_{digest}")
+
+
+def _hash_files(digest, files: Iterable[str]):
+    for file_path in files:
+        digest.update(f"{os.path.basename(file_path)}\0".encode('utf-8'))
+        if os.path.isfile(file_path):
+            with open(file_path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+
+def directory_version(path: str, extensions: Iterable[str] = ('.md',), extra_files: Iterable[str] = ()) -> str:
+    """
+    Version of a local corpus from the bytes of its files, without parsing them.
+
+    Covers every file in `path` with one of the extensions plus any extra files
+    (e.g. the summary store), together with the snapshot format and markdown
+    parser versions, so any edit, addition, deletion or parser change gives a
+    new version.
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}\0{markdown_ast.PARSER_VERSION}\0".encode('utf-8'))
+    names = sorted(name for name in os.listdir(path) if name.endswith(tuple(extensions)))
+    _hash_files(digest, [os.path.join(path, name) for name in names] + [p for p in extra_files if p])
+    return digest.hexdigest()[:16]
+
+
+def versions_version(versions: Dict[str, Optional[str]], extra_files: Iterable[str] = ()) -> str:
+    """
+    Version of a corpus from the cheap per-document versions of source_versions.
+
+    Used for repositories and sites, whose files cannot be hashed locally: a
+    changed blob SHA, ETag or Last-Modified gives a new version, and so does a
+    change to any extra file (e.g. the summary store) or to the snapshot format.
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}\0{markdown_ast.PARSER_VERSION}\0".encode('utf-8'))
+    for name, version in sorted(versions.items()):
+        digest.update(f"{name}\0{version}\0".encode('utf-8'))
+    _hash_files(digest, [p for p in extra_files if p])
+    return digest.hexdigest()[:16]
+
+
+def write_snapshot(corpus_id: str, corpus: Dict, content_store: Dict[str, Dict],
+                   link_graph: Dict[str, Dict], summaries: Optional[Dict] = None,
+                   index: Optional[ChunkIndex] = None, source_version: Optional[str] = None,
+                   source_documents: Optional[List[str]] = None, directory: Optional[str] = SNAPSHOT_DIR) -> str:
+    """
+    Write the built state of a corpus as a new snapshot and make it the current one.
+
+    Args:
+        corpus_id (str): Docs folder, repository URL or site the corpus was built from.
+        corpus (dict): version, pages, built_at and doc_context from the build.
+        content_store (dict): Page id mapped to title, content, links and metadata.
+        link_graph (dict): Outgoing and incoming links per page.
+        summaries (dict): Summary store, if one was used.
+        index (ChunkIndex): Lexical index and vectors of the corpus chunks.
+        source_version (str): Version of the source files the build read, checked on restore.
+        source_documents (list): Pages a web corpus was versioned from, so a restore can check the same pages.
+        directory (str): Root snapshot directory.
+
+    Returns:
+        str: Directory of the new snapshot.
+    """
+    corpus_dir = corpus_directory(corpus_id, directory)
+    name = f"{corpus['version']}_{time.time_ns()}"
+    final_path = os.path.join(corpus_dir, name)
+    tmp_path = final_path + '.tmp'
+    os.makedirs(tmp_path)
+    try:
+        with open(os.path.join(tmp_path, 'doc_context.txt'), 'w', encoding='utf-8') as f:
+            f.write(corpus['doc_context'])
+        block_store.write_records(os.path.join(tmp_path, 'pages.blocks'), content_store.items())
+        with open(os.path.join(tmp_path, 'graph.json'), 'w', encoding='utf-8') as f:
+            json.dump(link_graph, f, separators=(',', ':'))
+        with open(os.path.join(tmp_path, 'summaries.json'), 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, separators=(',', ':'))
+        if index is not None:
+            block_store.write_records(os.path.join(tmp_path, 'chunks.blocks'),
+                                      ((str(row), index.chunks[str(row)]) for row in range(index.size)))
+            with open(os.path.join(tmp_path, 'terms.json'), 'w', encoding='utf-8') as f:
+                json.dump(index.terms, f, separators=(',', ':'))
+            np.save(os.path.join(tmp_path, 'postings.rows.npy'), np.asarray(index.rows, dtype=np.int32))
+            np.save(os.path.join(tmp_path, 'postings.weights.npy'), np.asarray(index.weights, dtype=np.float32))
+            if index.vectors is not None:
+                np.save(os.path.join(tmp_path, 'vectors.npy'), np.asarray(index.vectors, dtype=np.float32))
+
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'corpus_id': corpus_id,
+            'version': corpus['version'],
+            'source_version': source_version,
+            'source_documents': source_documents,
+            'pages': corpus['pages'],
+            'chunks': index.size if index is not None else None,
+            'postings': len(index.rows) if index is not None else None,
+            'vector_dim': int(index.vectors.shape[1]) if index is not None and index.vectors is not None else None,
+            'vector_model': index.vector_model if index is not None else None,
+            'built_at': corpus['built_at'],
+            'build_seconds': corpus.get('build_seconds'),
+            'written_at': datetime.now().isoformat()
+        }
+        with open(os.path.join(tmp_path, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    pointer_tmp = os.path.join(corpus_dir, f"{CURRENT}.{threading.get_ident()}.tmp")
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(corpus_dir, CURRENT))
+    _prune(corpus_dir, name)
+    return final_path
+
+
+def _prune(corpus_dir: str, current: str, keep: int = SNAPSHOT_KEEP):
+    """Delete all but the newest `keep` snapshots, never the current one."""
+    builds = sorted(
+        (entry for entry in os.listdir(corpus_dir)
+         if not entry.endswith('.tmp') and os.path.isfile(os.path.join(corpus_dir, entry, MANIFEST))),
+        key=lambda entry: int(entry.rsplit('_', 1)[-1]), reverse=True
+    )
+    for entry in builds[max(keep, 1):]:
+        if entry != current:
+            # Processes that still have the old files open or mapped keep reading them
+            shutil.rmtree(os.path.join(corpus_dir, entry), ignore_errors=True)
+
+
+class CorpusSnapshot:
+    def __init__(self, path: str):
+        """
+        Read-only view of a written snapshot that loads each part on first use.
+
+        Opening reads only the small manifest and the headers of the index
+        arrays. The posting arrays and the vectors are memory-mapped, so the OS
+        pages them in as queries touch them and several workers on one host
+        share the same pages. Pages and chunks are read a compressed block at a
+        time; the rendered context, the vocabulary, the link graph and the
+        summaries are read on first access.
+
+        Args:
+            path (str): Snapshot directory written by write_snapshot.
+        """
+        self.path = path
+        with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+            self.manifest: Dict = json.load(f)
+        self._lock = threading.RLock()
+        self._loaded: Dict[str, object] = {}
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version']
+
+    def _load(self, key: str, loader):
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = loader()
+            return self._loaded[key]
+
+    def _read_text(self, name: str) -> str:
+        with open(os.path.join(self.path, name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _array(self, name: str) -> Optional[np.ndarray]:
+        path = os.path.join(self.path, name)
+        return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    def valid(self) -> bool:
+        """Whether the index files are present and match the manifest, checked from the array headers."""
+        chunks = self.manifest.get('chunks')
+        if chunks is None:
+            return True
+        try:
+            rows, weights = self._array('postings.rows.npy'), self._array('postings.weights.npy')
+            vectors = self._array('vectors.npy')
+        except (OSError, ValueError):
+            return False
+        if rows is None or weights is None or not os.path.exists(os.path.join(self.path, 'chunks.blocks')):
+            return False
+        if not len(rows) == len(weights) == self.manifest['postings']:
+            return False
+        dim = self.manifest.get('vector_dim')
+        if dim is None:
+            return vectors is None
+        return vectors is not None and vectors.shape == (chunks, dim)
+
+    def current(self, source_version: Optional[str] = None, max_age: Optional[float] = None) -> bool:
+        """
+        Whether the snapshot was built from source_version or, when that is None, is younger than max_age seconds.
+        """
+        if source_version is not None:
+            return self.manifest.get('source_version') == source_version
+        if max_age is not None:
+            written_at = datetime.fromisoformat(self.manifest['written_at'])
+            return (datetime.now() - written_at).total_seconds() <= max_age
+        return True
+
+    def _read_json(self, name: str):
+        with open(os.path.join(self.path, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def doc_context(self) -> str:
+        return self._load('doc_context', lambda: self._read_text('doc_context.txt'))
+
+    @property
+    def pages(self) -> block_store.BlockReader:
+        """Content store as a lazy mapping of page id to page."""
+        return self._load('pages', lambda: block_store.BlockReader(os.path.join(self.path, 'pages.blocks')))
+
+    @property
+    def link_graph(self) -> Dict[str, Dict]:
+        return self._load('graph', lambda: self._read_json('graph.json'))
+
+    @property
+    def summaries(self) -> Optional[Dict]:
+        return self._load('summaries', lambda: self._read_json('summaries.json'))
+
+    @property
+    def index(self) -> Optional[ChunkIndex]:
+        """Lexical index and vectors over the corpus chunks, or None for a snapshot built without them."""
+        if self.manifest.get('chunks') is None:
+            return None
+        return self._load('index', lambda: ChunkIndex(
+            self._load('chunks', lambda: block_store.BlockReader(os.path.join(self.path, 'chunks.blocks'))),
+            self.manifest['chunks'], self._read_json('terms.json'),
+            self._array('postings.rows.npy'), self._array('postings.weights.npy'), self._array('vectors.npy'),
+            self.manifest.get('vector_model')
+        ))
+
+    def corpus(self) -> Dict:
+        """
+        The corpus dict query_service serves, restored from the snapshot.
+
+        It carries the snapshot itself instead of the rendered context, which
+        is read on the first query.
+        """
+        return {
+            'version': self.version,
+            'pages': self.manifest['pages'],
+            'built_at': self.manifest['built_at'],
+            'build_seconds': self.manifest['build_seconds'],
+            'snapshot': self
+        }
+
+    def close(self):
+        with self._lock:
+            for key in ('pages', 'chunks'):
+                if key in self._loaded:
+                    self._loaded.pop(key).close()
+            # Arrays handed out stay valid; their maps are released once nothing refers to them
+            self._loaded.pop('index', None)
+
+
+def open_snapshot(corpus_id: str, source_version: Optional[str] = None, max_age: Optional[float] = None,
+                  directory: Optional[str] = SNAPSHOT_DIR) -> Optional[CorpusSnapshot]:
+    """
+    Open the current snapshot of a corpus if it is still valid.
+
+    A snapshot is valid when it has the current format, its index arrays match
+    its manifest and it was built from the same source version. When the
+    source version cannot be computed, pass None and max_age instead: the
+    snapshot is then used if it is younger than max_age seconds. With neither,
+    only the format and the arrays are checked, e.g. to read the recorded
+    source_documents before versioning a web corpus.
+
+    Returns:
+        CorpusSnapshot: The snapshot, or None if there is none or it is out of date.
+    """
+    if not directory:
+        return None
+    corpus_dir = corpus_directory(corpus_id, directory)
+    try:
+        with open(os.path.join(corpus_dir, CURRENT), 'r', encoding='utf-8') as f:
+            snapshot = CorpusSnapshot(os.path.join(corpus_dir, f.read().strip()))
+    except (OSError, ValueError):
+        return None
+
+    manifest = snapshot.manifest
+    if manifest.get('format') != SNAPSHOT_FORMAT or not snapshot.valid():
+        return None
+    return snapshot if snapshot.current(source_version, max_age) else None
+
+
+def main():
+    """
+    Show the current snapshot of a corpus.
+
+    Usage:
+        python corpus_snapshot.py <corpus_id>
+    """
+    if len(sys.argv) != 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    snapshot = open_snapshot(sys.argv[1])
+    if snapshot is None:
+        print(f"No snapshot of {sys.argv[1]} in {SNAPSHOT_DIR}")
+        sys.exit(1)
+    context = snapshot.doc_context
+    elapsed = time.perf_counter() - start
+    manifest = snapshot.manifest
+    print(f"Snapshot {snapshot.path}")
+    print(f"  corpus version {manifest['version']}, source version {manifest['source_version']}")
+    print(f"  {manifest['pages']} pages, {manifest['chunks'] or 0} chunks "
+          f"({'with' if manifest.get('vector_dim') else 'without'} vectors), {len(context)} context characters")
+    print(f"  built {manifest['built_at']} in {manifest['build_seconds']:.2f}s, restored in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+import http_client
+import telemetry
+from page_cache import page_cache
+
+load_dotenv()
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _patterns(name: str) -> List[str]:
+    return [pattern.strip() for pattern in os.getenv(name, "").split(',') if pattern.strip()]
+
+
+# Link depth from the starting page, pages fetched and bytes downloaded per crawl; unset means unlimited
+CRAWL_MAX_DEPTH = _optional_int("AGENTIC_CRAWL_MAX_DEPTH")
+CRAWL_MAX_PAGES = _optional_int("AGENTIC_CRAWL_MAX_PAGES")
+CRAWL_MAX_BYTES = _optional_int("AGENTIC_CRAWL_MAX_BYTES")
+# Responses larger than this are abandoned mid-download
+CRAWL_MAX_PAGE_BYTES = int(os.getenv("AGENTIC_CRAWL_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+# Comma-separated regular expressions; a URL must match an include pattern (if any) and no exclude pattern
+CRAWL_INCLUDE = _patterns("AGENTIC_CRAWL_INCLUDE")
+CRAWL_EXCLUDE = _patterns("AGENTIC_CRAWL_EXCLUDE")
+# Send a HEAD request before each GET to check the content type without opening the body
+CRAWL_HEAD = os.getenv("AGENTIC_CRAWL_HEAD", "").lower() in ("1", "true")
+
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+ASSET_URL = re.compile(
+    r'(/_static/|/_images/|/_sources/|/_downloads/)'
+    r'|\.(pdf|png|jpe?g|gif|svg|ico|webp|css|js|map|json|xml|txt|zip|gz|tgz|bz2|xz|tar|whl|egg'
+    r'|woff2?|ttf|eot|mp3|mp4|webm|ipynb)$',
+    re.IGNORECASE
+)
+CHUNK_SIZE = 64 * 1024
+
+
+class CrawlScopeError(Exception):
+    """Raised for a page that is outside the crawl scope, e.g. not HTML or too large."""
+
+
+class CrawlBudgetExhausted(Exception):
+    """Raised once a crawl has used up its page or byte budget."""
+
+
+class CrawlScope:
+    def __init__(self, max_depth: Optional[int] = CRAWL_MAX_DEPTH,
+                 max_pages: Optional[int] = CRAWL_MAX_PAGES,
+                 max_bytes: Optional[int] = CRAWL_MAX_BYTES,
+                 max_page_bytes: Optional[int] = CRAWL_MAX_PAGE_BYTES,
+                 include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None,
+                 head_requests: bool = CRAWL_HEAD):
+        """
+        Scope rules and budget of one crawl.
+
+        Create one per crawl: the page and byte counters start at zero and are
+        shared by every fetch thread of that crawl.
+
+        Args:
+            max_depth (int): Links followed from the starting page (0 crawls only that page).
+            max_pages (int): Pages downloaded before the crawl stops; cache hits are free.
+            max_bytes (int): Bytes downloaded before the crawl stops.
+            max_page_bytes (int): Largest single response accepted.
+            include (list): Regular expressions; when given, URLs must match one.
+            exclude (list): Regular expressions; URLs matching any are skipped.
+            head_requests (bool): Check content type and length with HEAD before GET.
+        """
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_page_bytes = max_page_bytes
+        self.include = [re.compile(pattern) for pattern in (CRAWL_INCLUDE if include is None else include)]
+        self.exclude = [re.compile(pattern) for pattern in (CRAWL_EXCLUDE if exclude is None else exclude)]
+        self.head_requests = head_requests
+
+        self.pages = 0
+        self.bytes = 0
+        self.skipped = Counter()
+        self.skipped_urls = set()
+        self._lock = threading.Lock()
+
+    def allows(self, url: str, depth: int = 0) -> bool:
+        """Whether a URL at this link depth is inside the scope, judged from the URL alone."""
+        if self.max_depth is not None and depth > self.max_depth:
+            return self._skip(url, 'depth')
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return self._skip(url, 'scheme')
+        if ASSET_URL.search(parsed.path):
+            return self._skip(url, 'asset')
+        if self.include and not any(pattern.search(url) for pattern in self.include):
+            return self._skip(url, 'include')
+        if any(pattern.search(url) for pattern in self.exclude):
+            return self._skip(url, 'exclude')
+        return True
+
+    def _skip(self, url: str, reason: str) -> bool:
+        # Links are checked every time they are seen, so each URL is counted once
+        with self._lock:
+            if url in self.skipped_urls:
+                return False
+            self.skipped[reason] += 1
+            self.skipped_urls.add(url)
+        telemetry.add("agentic.crawl.skipped", reason=reason)
+        return False
+
+    @property
+    def exhausted(self) -> bool:
+        return (
+            (self.max_pages is not None and self.pages >= self.max_pages) or
+            (self.max_bytes is not None and self.bytes >= self.max_bytes)
+        )
+
+    def fetch(self, url: str, timeout: int = 10, extract: bool = True) -> Dict:
+        """
+        Fetch a page through the page cache; only a download is charged to this crawl's budget.
+
+        Raises:
+            CrawlBudgetExhausted: The page is not cached and the page or byte budget is used up.
+            CrawlScopeError: The response is not HTML or is larger than max_page_bytes.
+        """
+        return page_cache.fetch(url, timeout=timeout, extract=extract, scope=self)
+
+    def download(self, url: str, timeout: int = 10) -> Tuple[int, str, Dict]:
+        """
+        Download one page, checking its headers before reading the body.
+
+        The body is streamed and abandoned as soon as it exceeds max_page_bytes.
+        Called by the page cache on a miss, so cached pages never use the budget.
+        Only an accepted response is charged as a page; a rejected or failed one
+        is charged only for the bytes it read.
+
+        Returns:
+            tuple: HTTP status code, decoded body and response headers.
+        """
+        with self._lock:
+            if self.exhausted:
+                raise CrawlBudgetExhausted(
+                    f"Crawl budget used up after {self.pages} pages and {self.bytes:,} bytes"
+                )
+            # Held while downloading so parallel fetches cannot overshoot max_pages
+            self.pages += 1
+        try:
+            return self._download(url, timeout)
+        except Exception:
+            with self._lock:
+                self.pages -= 1
+            raise
+
+    def _download(self, url: str, timeout: int) -> Tuple[int, str, Dict]:
+        if self.head_requests:
+            head = http_client.head(url, timeout=timeout)
+            if head.status_code == 200:
+                self._check_headers(url, head.headers)
+
+        response = http_client.get(url, timeout=timeout, stream=True)
+        body = bytearray()
+        try:
+            if response.status_code == 200:
+                self._check_headers(url, response.headers)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                body.extend(chunk)
+                if self.max_page_bytes is not None and len(body) > self.max_page_bytes:
+                    self._skip(url, 'size')
+                    raise CrawlScopeError(f"{url} is larger than {self.max_page_bytes:,} bytes")
+        finally:
+            response.close()
+            # Abandoned downloads still count towards the byte budget
+            with self._lock:
+                self.bytes += len(body)
+        return response.status_code, body.decode(response.encoding or 'utf-8', errors='replace'), response.headers
+
+    def _check_headers(self, url: str, headers):
+        content_type = headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type and content_type not in HTML_TYPES:
+            self._skip(url, 'content_type')
+            raise CrawlScopeError(f"{url} is {content_type}, not HTML")
+        length = headers.get('Content-Length')
+        if self.max_page_bytes is not None and length and length.isdigit() and int(length) > self.max_page_bytes:
+            self._skip(url, 'size')
+            raise CrawlScopeError(f"{url} is {int(length):,} bytes, over {self.max_page_bytes:,}")
+
+    def report(self):
+        """Print what the crawl used and what it skipped."""
+        print(f"Crawl scope: {self.pages} pages, {self.bytes:,} bytes downloaded")
+        if self.skipped:
+            print(f"Skipped URLs by reason: {dict(self.skipped)}")
+        if self.exhausted:
+            print("Warning: the crawl stopped because its budget was used up")
@@ -0,0 +1,362 @@
+import argparse
+import gc
+import importlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from output_dir import output_path
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_MODEL = "openai/fake-model"
+# Must be set before crewai and litellm are imported: no telemetry, no model price download, no shared memory store
+OFFLINE_ENVIRONMENT = {
+    "OTEL_SDK_DISABLED": "true",
+    "CREWAI_DISABLE_TELEMETRY": "true",
+    "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+}
+
+
+def _busy_time(intervals: List[Tuple[float, float]], start: float, end: float) -> float:
+    """Seconds of the window [start, end] covered by the intervals, counting overlapping ones once."""
+    busy, covered_to = 0.0, start
+    for interval_start, interval_end in sorted(intervals):
+        interval_start, interval_end = max(interval_start, covered_to), min(interval_end, end)
+        if interval_end > interval_start:
+            busy += interval_end - interval_start
+            covered_to = interval_end
+    return busy
+
+
+def _fill_schema(schema: Dict, definitions: Dict) -> object:
+    """Smallest value matching a JSON schema, used to answer structured-output (tool) calls."""
+    if '$ref' in schema:
+        return _fill_schema(definitions[schema['$ref'].rsplit('/', 1)[-1]], definitions)
+    if 'anyOf' in schema:
+        return _fill_schema(schema['anyOf'][0], definitions)
+    kind = schema.get('type')
+    if kind == 'object':
+        return {
+            name: _fill_schema(prop, definitions)
+            for name, prop in schema.get('properties', {}).items()
+            if name in schema.get('required', schema.get('properties', {}))
+        }
+    return {'array': [], 'string': 'fake', 'integer': 0, 'number': 0.0, 'boolean': False}.get(kind)
+
+
+class FakeLLMServer:
+    def __init__(self, latency: float = 0.5, output_words: int = 150):
+        """
+        Local OpenAI-compatible chat completions endpoint for offline crew runs.
+
+        Agents pointed at it go through the normal crewai/litellm path (prompt
+        assembly, HTTP, response parsing), but every reply takes `latency`
+        seconds and ends with a "Final Answer:" of `output_words` words, so the
+        time spent in the model is known exactly. Structured-output calls (tool
+        calls, e.g. crew memory's task evaluation) get the smallest arguments
+        matching the requested schema.
+
+        Args:
+            latency (float): Seconds each completion takes.
+            output_words (int): Words in each answer.
+        """
+        self.latency = latency
+        self.output_words = output_words
+        self.calls: List[Tuple[float, float]] = []
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _reply(self, body: Dict) -> Dict:
+        prompt_chars = sum(len(str(message.get('content') or '')) for message in body.get('messages', []))
+        with self._lock:
+            self.prompt_chars += prompt_chars
+        message = {'role': 'assistant', 'content': None}
+        tools = body.get('tools') or []
+        if tools:
+            function = tools[0]['function']
+            parameters = function.get('parameters', {})
+            arguments = _fill_schema(parameters, parameters.get('$defs', {}))
+            message['tool_calls'] = [{
+                'id': 'call_fake', 'type': 'function',
+                'function': {'name': function['name'], 'arguments': json.dumps(arguments)}
+            }]
+            finish_reason = 'tool_calls'
+        else:
+            words = ' '.join(f"word{i % 100}" for i in range(self.output_words))
+            message['content'] = f"Thought: I now can give a great answer\nFinal Answer: {words}"
+            finish_reason = 'stop'
+        completion_tokens = self.output_words + 10
+        return {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', FAKE_MODEL),
+            'choices': [{'index': 0, 'message': message, 'finish_reason': finish_reason}],
+            'usage': {
+                'prompt_tokens': prompt_chars // 4,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_chars // 4 + completion_tokens
+            }
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                started = time.perf_counter()
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                time.sleep(server.latency)
+                payload = json.dumps(server._reply(body)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.calls.append((started, time.perf_counter()))
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, read from /proc on Linux; None elsewhere."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _slope(values: List[float]) -> float:
+    """Least-squares growth per step of a series."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, sum(values) / n
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    return covariance / sum((x - mean_x) ** 2 for x in range(n))
+
+
+def _quiet(crew):
+    crew.verbose = False
+    for agent in crew.agents:
+        agent.verbose = False
+    for task in crew.tasks:
+        task.verbose = False
+
+
+def run_benchmark(crew_module: str = "localmd", queries: int = 20, fast: bool = False,
+                  llm_latency: float = 0.5, output_words: int = 150, embed_latency: float = 0.05,
+                  quiet: bool = True, trace_memory: bool = False) -> Dict:
+    """
+    Run a crew repeatedly against the fake LLM and a local embedder and measure our own overhead.
+
+    Per task, orchestration overhead is the wall time minus the time the fake
+    model, the embedder and tools were busy. Memory is sampled after every
+    query, after a garbage collection, to show growth across queries.
+
+    Args:
+        crew_module (str): Entry script whose crew is benchmarked, "localmd" or "agents".
+        queries (int): Kickoffs of the same crew, as in a long-running process.
+        fast (bool): Benchmark the single-task fast-path crew instead of the three-task crew.
+        llm_latency (float): Seconds per fake completion.
+        output_words (int): Words per fake answer.
+        embed_latency (float): Seconds per embedding batch.
+        quiet (bool): Turn off verbose agent logging, which would otherwise count as overhead.
+        trace_memory (bool): Also track Python allocations with tracemalloc (slows the run).
+
+    Returns:
+        dict: Settings, per-query and per-task timings, and memory samples.
+    """
+    for name, value in OFFLINE_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    os.environ.setdefault("CREWAI_STORAGE_DIR", tempfile.mkdtemp(prefix="crew_benchmark_"))
+    os.environ.setdefault("AGENTIC_DOCS_DIR", os.path.join(os.path.dirname(SCRIPT_DIR), "docs"))
+
+    import embedding_service
+    from embedding_service import EmbeddingService, HashedNgramEmbedder
+
+    embed_calls: List[Tuple[float, float]] = []
+    embed_lock = threading.Lock()
+
+    class LatencyEmbedder(HashedNgramEmbedder):
+        def embed(self, texts):
+            started = time.perf_counter()
+            time.sleep(embed_latency)
+            vectors = super().embed(texts)
+            with embed_lock:
+                embed_calls.append((started, time.perf_counter()))
+            return vectors
+
+    embedding_service.set_service(EmbeddingService(LatencyEmbedder(), requests_per_minute=None))
+
+    from crewai import LLM
+    from fast_path import build_doc_context, build_fast_crew, markdown_content_store
+    from profiling import CrewProfiler
+
+    module = importlib.import_module(crew_module)
+    if fast:
+        from document_source import iter_local_markdown
+        from pipeline import collect_content
+
+        content = collect_content(iter_local_markdown(os.environ["AGENTIC_DOCS_DIR"]))
+        crew = build_fast_crew(module.user_assistant, module.embedder_config)
+        doc_context = build_doc_context(markdown_content_store(content))
+    else:
+        crew, doc_context = module.crew, None
+    if quiet:
+        _quiet(crew)
+
+    results = {
+        'settings': {
+            'crew': crew_module, 'fast': fast, 'queries': queries, 'llm_latency': llm_latency,
+            'output_words': output_words, 'embed_latency': embed_latency
+        },
+        'queries': [],
+        'tasks': {}
+    }
+    if trace_memory:
+        tracemalloc.start()
+
+    with FakeLLMServer(llm_latency, output_words) as server:
+        llm = LLM(model=FAKE_MODEL, base_url=server.base_url, api_key="fake", temperature=0)
+        for agent in crew.agents:
+            agent.llm = llm
+
+        for query in range(queries):
+            inputs = {
+                "query": f"Benchmark question {query}: how do I set up the project?",
+                "user_context": "experience_level: intermediate"
+            }
+            if doc_context is not None:
+                inputs["doc_context"] = doc_context
+
+            profiler = CrewProfiler(crew)
+            task_start = time.perf_counter()
+            profiler.run(inputs)
+            for task in profiler.tasks:
+                task_end = task_start + task['wall_time']
+                llm_time = _busy_time(server.calls, task_start, task_end)
+                embed_time = _busy_time(embed_calls, task_start, task_end)
+                totals = results['tasks'].setdefault(task['task'], {
+                    'agent': task['agent'], 'runs': 0, 'wall_time': 0.0, 'llm_time': 0.0,
+                    'embed_time': 0.0, 'tool_time': 0.0, 'overhead': 0.0, 'llm_calls': 0
+                })
+                totals['runs'] += 1
+                totals['wall_time'] += task['wall_time']
+                totals['llm_time'] += llm_time
+                totals['embed_time'] += embed_time
+                totals['tool_time'] += task['tool_time']
+                totals['overhead'] += max(task['wall_time'] - llm_time - embed_time - task['tool_time'], 0.0)
+                totals['llm_calls'] += task['llm_calls']
+                task_start = task_end
+
+            gc.collect()
+            results['queries'].append({
+                'wall_time': profiler.total_wall_time,
+                'rss_bytes': _rss_bytes(),
+                'python_bytes': tracemalloc.get_traced_memory()[0] if trace_memory else None
+            })
+            print(f"Query {query + 1}/{queries}: {profiler.total_wall_time:.2f}s")
+
+        results['llm_requests'] = len(server.calls)
+        results['embed_requests'] = len(embed_calls)
+
+    if trace_memory:
+        tracemalloc.stop()
+    for totals in results['tasks'].values():
+        for key in ('wall_time', 'llm_time', 'embed_time', 'tool_time', 'overhead'):
+            totals[key] /= totals['runs']
+        totals['llm_calls'] /= totals['runs']
+
+    rss = [sample['rss_bytes'] for sample in results['queries'] if sample['rss_bytes'] is not None]
+    python_bytes = [sample['python_bytes'] for sample in results['queries'] if sample['python_bytes'] is not None]
+    results['memory'] = {
+        'rss_first': rss[0] if rss else None,
+        'rss_last': rss[-1] if rss else None,
+        'rss_growth_per_query': _slope(rss) if rss else None,
+        'python_growth_per_query': _slope(python_bytes) if python_bytes else None
+    }
+    return results
+
+
+def print_results(results: Dict):
+    """Print the per-task overhead table and the memory summary."""
+    header = f"{'Task':<62}{'Wall s':>9}{'LLM s':>9}{'Embed s':>9}{'Tool s':>9}{'Ours s':>9}{'Ours %':>8}{'Calls':>7}"
+    print(f"\nOrchestration benchmark: {results['settings']}")
+    print(header)
+    print('-' * len(header))
+    for name, task in results['tasks'].items():
+        share = task['overhead'] / task['wall_time'] * 100 if task['wall_time'] else 0.0
+        print(
+            f"{name:<62}{task['wall_time']:>9.3f}{task['llm_time']:>9.3f}{task['embed_time']:>9.3f}"
+            f"{task['tool_time']:>9.3f}{task['overhead']:>9.3f}{share:>7.1f}%{task['llm_calls']:>7.1f}"
+        )
+    print('-' * len(header))
+    print(f"{results['llm_requests']} LLM requests, {results['embed_requests']} embedding requests")
+
+    memory = results['memory']
+    if memory['rss_first'] is not None:
+        print(f"RSS: {memory['rss_first'] / 2**20:.1f} MiB after the first query, "
+              f"{memory['rss_last'] / 2**20:.1f} MiB after the last, "
+              f"{memory['rss_growth_per_query'] / 2**10:+.1f} KiB per query")
+    if memory['python_growth_per_query'] is not None:
+        print(f"Python allocations: {memory['python_growth_per_query'] / 2**10:+.1f} KiB per query")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure crew orchestration overhead and memory growth offline, "
+                    "against a local fake LLM and embedder."
+    )
+    parser.add_argument('--crew', choices=('localmd', 'agents'), default='localmd',
+                        help="entry script whose crew is benchmarked")
+    parser.add_argument('--queries', type=int, default=20, help="kickoffs of the same crew")
+    parser.add_argument('--fast', action='store_true', help="benchmark the single-task fast-path crew")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="seconds per fake completion")
+    parser.add_argument('--output-words', type=int, default=150, help="words per fake answer")
+    parser.add_argument('--embed-latency', type=float, default=0.05, help="seconds per embedding batch")
+    parser.add_argument('--verbose', action='store_true', help="keep verbose agent logging")
+    parser.add_argument('--tracemalloc', action='store_true', help="also track Python allocations")
+    parser.add_argument('--output', default=os.path.join(os.getenv("AGENTIC_PROFILE_DIR") or output_path("profile"),
+                                                         'benchmark_report.json'))
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPT_DIR)
+    results = run_benchmark(
+        args.crew, args.queries, args.fast, args.llm_latency, args.output_words,
+        args.embed_latency, quiet=not args.verbose, trace_memory=args.tracemalloc
+    )
+    print_results(results)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
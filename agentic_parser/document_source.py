@@ -0,0 +1,127 @@
+import os
+from typing import Dict, Iterator
+import http_client
+import telemetry
+from git_source import GIT_REV, iter_repository_markdown
+
+# Every source yields documents as dicts with the same keys:
+#   source   - "local", "git" or "github"
+#   path     - path or URL that identifies the document
+#   name     - file name, used as the key by the older dict APIs
+#   title    - title when known, otherwise None
+#   content  - document text, or an error message when error is set
+#   error    - error message if the document could not be read, otherwise None
+
+
+def _document(source: str, path: str, name: str, content: str, title: str = None, error: str = None) -> Dict:
+    return {
+        'source': source,
+        'path': path,
+        'name': name,
+        'title': title,
+        'content': content,
+        'error': error
+    }
+
+
+def iter_local_markdown(directory: str) -> Iterator[Dict]:
+    """
+    Yield markdown (.md) files from a local directory one at a time.
+
+    Args:
+        directory (str): Path to the documentation directory.
+    """
+    for filename in os.listdir(directory):
+        if not filename.endswith(".md"):  # Only process markdown files
+            continue
+        file_path = os.path.join(directory, filename)
+        try:
+            with telemetry.span("read", path=file_path):
+                with open(file_path, "r", encoding="utf-8") as file:
+                    content = file.read()
+            telemetry.add("agentic.bytes", len(content), source="local")
+            yield _document('local', file_path, filename, content)
+        except Exception as e:
+            yield _document('local', file_path, filename, f"Error reading file: {e}", error=str(e))
+
+
+def iter_git_markdown(repo_path: str, rev: str = GIT_REV) -> Iterator[Dict]:
+    """
+    Yield markdown files from a local git clone or bare repository, read at a commit.
+
+    Args:
+        repo_path (str): Working copy or bare repository.
+        rev (str): Commit, branch or tag to read.
+    """
+    for entry in iter_repository_markdown(repo_path, rev):
+        yield _document('git', entry['source_file'], os.path.basename(entry['source_file']),
+                        entry['content'], title=entry['title'])
+
+
+def iter_github_markdown(repo_url: str, folder_path: str = "") -> Iterator[Dict]:
+    """
+    Yield markdown files from a GitHub repository, walking folders recursively.
+
+    Args:
+        repo_url (str): GitHub API URL of the repository.
+        folder_path (str): Folder to start from (used for recursion).
+    """
+    # Construct the GitHub API URL to list files in the current folder
+    current_repo_url = f"{repo_url}/contents/{folder_path}" if folder_path else f"{repo_url}/contents"
+    print(f"Fetching contents from: {current_repo_url}")
+
+    response = http_client.get(current_repo_url, source="github")
+
+    # Handle rate limiting if reached
+    if response.status_code == 403:  # Rate limit error
+        reset_time = response.headers.get('X-RateLimit-Reset')
+        print(f"Rate limit reached, try again after: {reset_time}")
+        return
+
+    # Check for successful response
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch files from GitHub: {response.status_code} - {response.text}")
+
+    for file_info in response.json():
+        # If it's a directory, recursively walk that folder
+        if file_info['type'] == 'dir':
+            new_folder_path = os.path.join(folder_path, file_info['name']) if folder_path else file_info['name']
+            yield from iter_github_markdown(repo_url, new_folder_path)
+
+        # If it's a markdown file, download it
+        elif file_info['name'].endswith(".md"):
+            print(f"Downloading markdown file: {file_info['name']}")
+            yield _download_github_file(file_info)
+
+
+def iter_github_listing(repo_url: str) -> Iterator[Dict]:
+    """
+    Yield markdown files from a single GitHub contents listing, without recursion.
+
+    Args:
+        repo_url (str): GitHub API URL that lists the files.
+    """
+    response = http_client.get(repo_url, source="github")
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch files from GitHub: {response.status_code}")
+
+    for file_info in response.json():
+        if file_info['name'].endswith(".md"):  # Only process markdown files
+            yield _download_github_file(file_info)
+
+
+def _download_github_file(file_info: Dict) -> Dict:
+    file_name = file_info['name']
+    try:
+        file_response = http_client.get(file_info['download_url'], source="github")
+        if file_response.status_code == 200:
+            return _document('github', file_info['path'], file_name, file_response.text)
+        error = f"Error downloading file: {file_response.status_code}"
+    except Exception as e:
+        error = f"Error reading file: {e}"
+    return _document('github', file_info['path'], file_name, error, error=error)
+
+
+def to_content_dict(documents: Iterator[Dict]) -> Dict[str, str]:
+    """Collect documents into the {name: content} dict the crews were built around."""
+    return {document['name']: document['content'] for document in documents}
@@ -0,0 +1,290 @@
+from bs4 import BeautifulSoup
+from typing import Dict, Iterator, Optional, Tuple, Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+import telemetry
+from crawl_scope import CrawlBudgetExhausted, CrawlScope, CrawlScopeError
+from focused_crawl import FOCUS_CONFIDENCE, FOCUS_MAX_PAGES, FocusedFrontier, rank_indexed_pages, scored_links
+from near_duplicates import NEAR_DUP_THRESHOLD, NearDuplicateFilter, prefer_url_key
+from page_cache import page_cache
+from parse_pool import PARSE_WORKERS, crawl_with_pool, extract_content, find_doc_links
+from site_index import discover_site_pages
+
+class EnhancedDocumentationToolInput(BaseModel):
+    """Input schema for EnhancedDocumentationTool."""
+    url: str = Field(..., description="The starting URL to crawl for documentation content.")
+    query: Optional[str] = Field(None, description="The user's question; when given, only the pages most relevant to it are crawled.")
+
+class EnhancedDocumentationTool(BaseTool):
+    name: str = "enhanced_documentation_tool"
+    description: str = "A tool to crawl and extract content from documentation pages."
+    args_schema: Type[BaseModel] = EnhancedDocumentationToolInput
+
+    def __init__(self, base_url: str, scope: CrawlScope = None):
+        # Explicitly set the name and description for BaseTool constructor
+        super().__init__(name=self.name, description=self.description)
+        self.base_url = base_url
+        # Scope rules and budget; a fresh CrawlScope from the environment is used per crawl when None
+        self.scope = scope
+        # Results of the latest crawl; every crawl starts with empty ones (see _start_crawl)
+        self.visited_urls = set()
+        self.content_store = {}
+        self.near_duplicates = {}
+
+    def _start_crawl(self):
+        """
+        Reset visit tracking and the content store for a new crawl.
+
+        Repeated calls on the same URL crawl it again, and pages that are still
+        fresh in the page cache are reused without a download. Memory held by
+        the tool is limited to the latest crawl.
+        """
+        self.visited_urls = set()
+        self.content_store = {}
+        self.near_duplicates = {}
+
+    def _run(self, input_data: EnhancedDocumentationToolInput) -> Dict:
+        """Implements the tool's primary logic."""
+        url = input_data.url  # Extract URL from the input schema
+        if not url:
+            return {"error": "No URL provided"}
+        if getattr(input_data, 'query', None):
+            return self.focused_crawl(url, input_data.query)
+        return self.collect(url)
+
+    def collect(self, url: str) -> Dict:
+        """Fill the content store from the site index, or by crawling when there is none."""
+        indexed_pages = discover_site_pages(url)
+        if indexed_pages:
+            result = self.load_indexed_pages(indexed_pages)
+        elif PARSE_WORKERS > 1:
+            result = self.crawl_parallel(url)
+        else:
+            result = self.crawl(url)
+        if result is self.content_store and NEAR_DUP_THRESHOLD > 0:
+            self.drop_near_duplicates()
+        return result
+
+    def drop_near_duplicates(self, threshold: float = NEAR_DUP_THRESHOLD) -> Dict[str, str]:
+        """
+        Keep one page per cluster of near-identical pages in the content store.
+
+        Pages under base_url, then /latest/ and /stable/ builds, are preferred as
+        the representative. Dropped pages are recorded in near_duplicates.
+
+        Returns:
+            dict: Dropped page URL mapped to the page it duplicates.
+        """
+        detector = NearDuplicateFilter(threshold)
+        for page_url in sorted(self.content_store, key=lambda page_url: prefer_url_key(page_url, self.base_url)):
+            page = self.content_store[page_url]
+            if 'error' not in page and detector.check(page_url, page['content']):
+                del self.content_store[page_url]
+        self.near_duplicates.update(detector.duplicates)
+        if detector.duplicates:
+            print(f"Dropped {len(detector.duplicates)} near-duplicate pages")
+        return detector.duplicates
+
+    def load_indexed_pages(self, indexed_pages: Dict[str, Dict]) -> Dict:
+        """Fill the content store from a site index, fetching only pages without text."""
+        for _ in self.iter_indexed_pages(indexed_pages):
+            pass
+        return self.content_store
+
+    def iter_indexed_pages(self, indexed_pages: Dict[str, Dict]) -> Iterator[Tuple[str, Dict]]:
+        """Yield (url, page) for each page of a site index as soon as it is stored."""
+        self._start_crawl()
+        scope = self.scope or CrawlScope()
+        for page_url, entry in indexed_pages.items():
+            if page_url in self.visited_urls or not scope.allows(page_url):
+                continue
+            if entry['text'] is None:
+                try:
+                    yield page_url, self._store_page(page_url, scope)
+                except CrawlBudgetExhausted as e:
+                    print(f"Stopping: {e}")
+                    return
+                except Exception as e:
+                    self.content_store[page_url] = {'error': f'Failed to fetch {page_url}: {str(e)}'}
+                continue
+
+            self.visited_urls.add(page_url)
+            self.content_store[page_url] = {
+                'title': entry['title'],
+                'content': entry['text'],
+                'links': [],
+                'metadata': {
+                    'sections': entry['sections']
+                }
+            }
+            yield page_url, self.content_store[page_url]
+
+    def focused_crawl(self, url: str, query: str, max_pages: int = FOCUS_MAX_PAGES,
+                      confidence: float = FOCUS_CONFIDENCE) -> Dict:
+        """Fill the content store with the pages most relevant to a query."""
+        for _ in self.iter_focused_crawl(url, query, max_pages, confidence):
+            pass
+        return self.content_store
+
+    def iter_focused_crawl(self, url: str, query: str, max_pages: int = FOCUS_MAX_PAGES,
+                           confidence: float = FOCUS_CONFIDENCE) -> Iterator[Tuple[str, Dict]]:
+        """
+        Crawl best-first towards the pages that answer a query, yielding (url, page).
+
+        Links are scored by how well their anchor text, URL and surrounding text
+        match the query, and the best one is fetched next. The crawl stops after
+        max_pages pages or once the most relevant pages cover the query well
+        enough (see FocusedFrontier). With a site index, the best-matching
+        index entries are loaded instead.
+        """
+        self._start_crawl()
+        indexed_pages = discover_site_pages(url)
+        if indexed_pages:
+            yield from self.iter_indexed_pages(rank_indexed_pages(indexed_pages, query, max_pages))
+            return
+
+        scope = self.scope or CrawlScope()
+        frontier = FocusedFrontier(query, max_pages, confidence)
+        frontier.push(url, 0.0)
+        while True:
+            next_page = frontier.pop()
+            if next_page is None:
+                break
+            current, depth = next_page
+            if not scope.allows(current, depth):
+                continue
+            try:
+                page = scope.fetch(current)
+                soup = BeautifulSoup(page['html'], 'html.parser')
+                stored = self._store_soup(current, soup)
+            except CrawlBudgetExhausted as e:
+                print(f"Stopping crawl: {e}")
+                break
+            except Exception as e:
+                if current == url:
+                    raise
+                print(f"Failed to crawl {current}: {e}")
+                continue
+
+            score = frontier.record_page(current, f"{stored['title']}\n{stored['content']}")
+            yield current, stored
+            frontier.extend(scored_links(soup, current, self.base_url, frontier.query_terms, score), depth + 1)
+
+        print(f"Focused crawl: {len(frontier.page_scores)} pages, confidence {frontier.confidence:.2f}")
+
+    def crawl(self, url: str) -> Dict:
+        """Recursively crawl documentation pages."""
+        try:
+            for _ in self.iter_crawl(url):
+                pass
+            return self.content_store
+
+        except Exception as e:
+            return {'error': f'Failed to crawl {url}: {str(e)}'}
+
+    def iter_crawl(self, url: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Crawl documentation pages depth-first, yielding (url, page) as each page is stored.
+
+        A failure on the starting URL is raised; failures on linked pages are skipped.
+        The crawl stops early once its scope's page or byte budget is used up.
+        """
+        self._start_crawl()
+        scope = self.scope or CrawlScope()
+        stack = [(url, 0)]
+        while stack:
+            current, depth = stack.pop()
+            if current in self.visited_urls or not scope.allows(current, depth):
+                continue
+            try:
+                page = self._store_page(current, scope)
+            except CrawlBudgetExhausted as e:
+                print(f"Stopping crawl: {e}")
+                break
+            except CrawlScopeError as e:
+                self.visited_urls.add(current)
+                print(f"Skipping {current}: {e}")
+                continue
+            except Exception as e:
+                if current == url:
+                    raise
+                print(f"Failed to crawl {current}: {e}")
+                continue
+
+            yield current, page
+
+            # Push links in reverse so they are visited in document order
+            stack.extend((link, depth + 1) for link in reversed(page['links']) if link not in self.visited_urls)
+        scope.report()
+
+    def _store_page(self, url: str, scope: CrawlScope = None) -> Dict:
+        """Fetch, parse and store a single page."""
+        page = scope.fetch(url) if scope else page_cache.fetch(url)
+        soup = BeautifulSoup(page['html'], 'html.parser')
+        return self._store_soup(url, soup)
+
+    def _store_soup(self, url: str, soup: BeautifulSoup) -> Dict:
+        """Extract and store a parsed page."""
+        self.visited_urls.add(url)
+
+        # Extract content
+        content = self._extract_content(soup)
+        # Find documentation links
+        links = self._find_doc_links(soup, url)
+
+        # Store current page content
+        self.content_store[url] = {
+            'title': content['title'],
+            'content': content['content'],
+            'links': links,
+            'metadata': content['metadata']
+        }
+        return self.content_store[url]
+
+    def _extract_content(self, soup: BeautifulSoup) -> Dict:
+        """Extract content from page."""
+        with telemetry.span("parse"):
+            return extract_content(soup)
+
+    def _find_doc_links(self, soup: BeautifulSoup, current_url: str) -> list[str]:
+        """Find documentation-related links."""
+        return [
+            link for link in find_doc_links(soup, current_url, self.base_url)
+            if link not in self.visited_urls
+        ]
+
+    def crawl_parallel(self, url: str, parse_workers: int = None) -> Dict:
+        """Crawl with concurrent fetching and a process pool for HTML parsing."""
+        for _ in self.iter_crawl_parallel(url, parse_workers):
+            pass
+        return self.content_store
+
+    def iter_crawl_parallel(self, url: str, parse_workers: int = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield (url, page) as pages come back from the parse pool."""
+        self._start_crawl()
+        scope = self.scope or CrawlScope()
+        records = crawl_with_pool(
+            url,
+            self.base_url,
+            fetch=lambda page_url: scope.fetch(page_url, extract=False),
+            parse_workers=parse_workers or PARSE_WORKERS,
+            skip=lambda page_url: page_url in self.visited_urls,
+            scope=scope
+        )
+        for record in records:
+            page_url = record['url']
+            self.visited_urls.add(page_url)
+            if 'error' in record:
+                print(record['error'])
+                continue
+            cached = page_cache.get(page_url)
+            if cached is not None and cached['text'] is None:
+                page_cache.set_text(page_url, record['content'])
+            self.content_store[page_url] = {
+                'title': record['title'],
+                'content': record['content'],
+                'links': record['links'],
+                'metadata': record['metadata']
+            }
+            yield page_url, self.content_store[page_url]
+        scope.report()
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+import http_client
+import telemetry
+
+try:
+    from chromadb.api.types import EmbeddingFunction
+except ImportError:  # Only needed to hand the service to a crew's memory
+    EmbeddingFunction = object
+try:
+    from embedchain.embedder.base import BaseEmbedder
+except ImportError:  # Only needed to index pages with an embedchain app
+    BaseEmbedder = object
+
+load_dotenv()
+
+# "google" embeds with Gemini; "local" uses the offline hashed n-gram embedder
+EMBEDDER = os.getenv("AGENTIC_EMBEDDER", "google").lower()
+EMBED_MODEL = os.getenv("AGENTIC_EMBED_MODEL", "models/embedding-001")
+# Texts and estimated tokens per embedding request
+EMBED_BATCH_SIZE = int(os.getenv("AGENTIC_EMBED_BATCH_SIZE", "64"))
+EMBED_BATCH_TOKENS = int(os.getenv("AGENTIC_EMBED_BATCH_TOKENS", "16000"))
+# Embedding requests in flight at once, and their rate limit; unset means no pacing
+EMBED_CONCURRENCY = int(os.getenv("AGENTIC_EMBED_CONCURRENCY", "4"))
+EMBED_REQUESTS_PER_MINUTE = float(os.getenv("AGENTIC_EMBED_REQUESTS_PER_MINUTE", "0")) or None
+EMBED_RETRIES = int(os.getenv("AGENTIC_EMBED_RETRIES", "3"))
+# Dimensions of the local embedder's vectors
+LOCAL_EMBED_DIM = int(os.getenv("AGENTIC_LOCAL_EMBED_DIM", "384"))
+
+WORD = re.compile(r'\w+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used to size batches."""
+    return len(text) // 4 + 1
+
+
+class HashedNgramEmbedder:
+    max_batch_size = None
+
+    def __init__(self, dim: int = LOCAL_EMBED_DIM, ngram_sizes: Sequence[int] = (3, 4, 5)):
+        """
+        Offline, deterministic embedder for tests and air-gapped runs.
+
+        Words and character n-grams are hashed into a fixed number of signed
+        buckets (the hashing trick) and the vector is L2-normalised, so texts
+        sharing vocabulary and spelling get a high cosine similarity. The same
+        text always gets the same vector, on any machine.
+        """
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def _features(self, text: str) -> List[str]:
+        words = WORD.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"<{word}>"
+            for size in self.ngram_sizes:
+                features.extend(f"c:{padded[i:i + size]}" for i in range(len(padded) - size + 1))
+        return features
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text)
+        if features:
+            digests = [
+                int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                for feature in features
+            ]
+            hashes = np.array(digests, dtype=np.uint64)
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+            np.add.at(vector, (hashes % np.uint64(self.dim)).astype(np.int64), signs)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+        return vector.tolist()
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+
+class GeminiEmbedder:
+    # Gemini accepts at most 100 texts per batch request
+    max_batch_size = 100
+
+    def __init__(self, model: str = EMBED_MODEL, task_type: str = "retrieval_document",
+                 api_key: Optional[str] = None):
+        """Gemini embeddings, one batch request per call."""
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self._genai = genai
+        self.model = model
+        self.task_type = task_type
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        result = self._genai.embed_content(model=self.model, content=list(texts), task_type=self.task_type)
+        return result['embedding']
+
+
+class EmbeddingService:
+    def __init__(self, embedder, batch_size: int = EMBED_BATCH_SIZE, max_batch_tokens: int = EMBED_BATCH_TOKENS,
+                 concurrency: int = EMBED_CONCURRENCY, requests_per_minute: Optional[float] = EMBED_REQUESTS_PER_MINUTE,
+                 retries: int = EMBED_RETRIES):
+        """
+        Batched, concurrent and rate-limited access to an embedder.
+
+        Texts are grouped into batches bounded by count and estimated tokens,
+        identical texts are embedded once, and batches run on a thread pool. One
+        request budget paces every batch sent by this service.
+
+        Args:
+            embedder: Object with embed(texts) -> vectors and a max_batch_size (None for no limit).
+            batch_size (int): Most texts per request.
+            max_batch_tokens (int): Most estimated tokens per request; a longer text goes alone.
+            concurrency (int): Requests in flight at once.
+            requests_per_minute (float): Rate limit across all threads; None disables pacing.
+            retries (int): Retries per batch, with exponential backoff.
+        """
+        self.embedder = embedder
+        limit = getattr(embedder, 'max_batch_size', None)
+        self.batch_size = min(batch_size, limit) if limit else batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.concurrency = max(concurrency, 1)
+        self.retries = retries
+        self.budget = http_client.RequestBudget(per_minute=requests_per_minute)
+        self.requests = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def batches(self, texts: Sequence[str]) -> List[List[str]]:
+        """Split texts into request-sized batches, keeping their order."""
+        batches, batch, tokens = [], [], 0
+        for text in texts:
+            text_tokens = estimate_tokens(text)
+            if batch and (len(batch) >= self.batch_size or tokens + text_tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch, tokens = [], 0
+            batch.append(text)
+            tokens += text_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        for attempt in range(self.retries + 1):
+            self.budget.spend()
+            try:
+                with telemetry.span("embed", texts=len(batch)):
+                    vectors = self.embedder.embed(batch)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = 2 ** attempt
+                print(f"Embedding batch failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+        with self._lock:
+            self.requests += 1
+            self.texts += len(batch)
+        telemetry.add("agentic.embed.texts", len(batch))
+        return vectors
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts, returning one vector per input text in input order."""
+        unique = list(dict.fromkeys(texts))
+        batches = self.batches(unique)
+        if len(batches) <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+
+        vectors = {}
+        for batch, batch_vectors in zip(batches, results):
+            vectors.update(zip(batch, batch_vectors))
+        return [vectors[text] for text in texts]
+
+
+class ServiceEmbeddingFunction(EmbeddingFunction):
+    def __init__(self, service: EmbeddingService):
+        """Chroma embedding function that sends a crew's memory embeddings through the service."""
+        self.service = service
+
+    def __call__(self, input):
+        return self.service.embed(list(input))
+
+
+class ServiceEmbedder(BaseEmbedder):
+    def __init__(self, service: Optional[EmbeddingService] = None):
+        """
+        Embedchain embedder that sends an app's document and query embeddings through the service.
+
+        Args:
+            service (EmbeddingService): Defaults to the process-wide service.
+        """
+        super().__init__()
+        service = service or get_service()
+        self.set_embedding_fn(ServiceEmbeddingFunction(service))
+        # Embedchain needs the dimensions up front; the local embedder knows them, others are asked once
+        self.set_vector_dimension(getattr(service.embedder, 'dim', None) or len(service.embed(["dimensions"])[0]))
+
+
+def build_embedder(name: str = EMBEDDER):
+    if name == "local":
+        return HashedNgramEmbedder()
+    if name == "google":
+        return GeminiEmbedder()
+    raise ValueError(f"Unknown AGENTIC_EMBEDDER: {name}")
+
+
+def embedder_id(name: str = EMBEDDER) -> str:
+    """Identifies the vectors an embedder produces, so stored vectors are only compared with compatible ones."""
+    if name == "local":
+        return f"local:{LOCAL_EMBED_DIM}"
+    return f"{name}:{EMBED_MODEL}"
+
+
+_service: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> EmbeddingService:
+    """Return the process-wide embedding service configured from the environment."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService(build_embedder())
+    return _service
+
+
+def set_service(service: EmbeddingService):
+    """Replace the process-wide service, e.g. with an offline embedder for benchmarks."""
+    global _service
+    with _service_lock:
+        _service = service
+
+
+def crew_embedder_config() -> Dict:
+    """Embedder config for Crew(embedder=...) that routes memory embeddings through the service."""
+    return {
+        "provider": "custom",
+        "config": {
+            "embedder": ServiceEmbeddingFunction(get_service())
+        }
+    }
@@ -0,0 +1,227 @@
+import os
+from typing import Callable, Dict, List
+from urllib.parse import urlparse
+from crewai import Crew, Task
+from dotenv import load_dotenv
+from map_reduce import MAP_REDUCE, analyze_corpus, render_analysis
+from markdown_ast import parsed_markdown
+import streaming
+from summaries import load_current_summaries, render_summaries
+
+load_dotenv()
+
+# When set, the crawl and analyze LLM tasks are replaced by the code below
+FAST_PATH = os.getenv("AGENTIC_FAST_PATH", "").lower() in ("1", "true")
+# Upper bound on the characters of page text placed in the prompt
+CONTEXT_CHARS = int(os.getenv("AGENTIC_CONTEXT_CHARS", "60000"))
+
+
+def markdown_content_store(documentation_content: Dict[str, str]) -> Dict[str, Dict]:
+    """
+    Build a content store, in the shape EnhancedDocumentationTool produces, from markdown files.
+
+    Args:
+        documentation_content (dict): Filenames mapped to markdown content.
+
+    Returns:
+        dict: Filename mapped to title, content, links and h1-h3 sections.
+    """
+    content_store = {}
+    for name, content in documentation_content.items():
+        parsed = parsed_markdown(content)
+        sections = [
+            {'level': heading['level'], 'text': heading['text']}
+            for heading in parsed['headings'] if heading['level'] <= 3
+        ]
+        local_links = [
+            link.split('#', 1)[0] for link in parsed['links']
+            if not urlparse(link).scheme and not link.startswith('#')
+        ]
+        content_store[name] = {
+            'title': sections[0]['text'] if sections else name,
+            'content': content,
+            'links': [os.path.basename(link) for link in local_links if link],
+            'metadata': {
+                'sections': sections
+            }
+        }
+    return content_store
+
+
+def build_hierarchy(content_store: Dict[str, Dict]) -> Dict:
+    """Nest pages under the folders of their URL or file path, below the common root."""
+    paths = {}
+    for page_id in content_store:
+        path = urlparse(page_id).path if urlparse(page_id).scheme else page_id
+        paths[page_id] = [part for part in path.split('/') if part]
+    common = os.path.commonprefix(list(paths.values())) if paths else []
+
+    tree = {}
+    for page_id in sorted(paths):
+        node = tree
+        # The last segment names the page itself, so only its parents become folders
+        for segment in paths[page_id][len(common):-1]:
+            node = node.setdefault(segment, {})
+        node.setdefault('_pages', []).append(page_id)
+    return tree
+
+
+def build_link_graph(content_store: Dict[str, Dict]) -> Dict[str, Dict[str, List[str]]]:
+    """Outgoing and incoming links between stored pages."""
+    graph = {page_id: {'outgoing': [], 'incoming': []} for page_id in content_store}
+    for page_id, page in content_store.items():
+        for link in dict.fromkeys(page.get('links', [])):
+            if link in graph and link != page_id:
+                graph[page_id]['outgoing'].append(link)
+                graph[link]['incoming'].append(page_id)
+    return graph
+
+
+def build_page_metadata(content_store: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Per-page title, word count, section outline and link counts."""
+    graph = build_link_graph(content_store)
+    metadata = {}
+    for page_id, page in content_store.items():
+        if 'error' in page:
+            metadata[page_id] = {'error': page['error']}
+            continue
+        metadata[page_id] = {
+            'title': page['title'],
+            'words': len(page['content'].split()),
+            'sections': [section['text'] for section in page['metadata']['sections']],
+            'outgoing_links': len(graph[page_id]['outgoing']),
+            'incoming_links': len(graph[page_id]['incoming'])
+        }
+    return metadata
+
+
+def _render_hierarchy(node: Dict, metadata: Dict[str, Dict], depth: int = 0) -> List[str]:
+    lines = []
+    for page_id in node.get('_pages', []):
+        lines.append(f"{'  ' * depth}- {metadata[page_id].get('title') or page_id} ({page_id})")
+    for segment, child in node.items():
+        if segment == '_pages':
+            continue
+        lines.append(f"{'  ' * depth}- {segment}/")
+        lines.extend(_render_hierarchy(child, metadata, depth + 1))
+    return lines
+
+
+def build_doc_context(content_store: Dict[str, Dict], max_chars: int = CONTEXT_CHARS) -> str:
+    """
+    Render the hierarchy, link graph, page metadata and page text as prompt context.
+
+    Page text is shared out evenly across pages so that no single page can use up
+    the whole max_chars budget.
+    """
+    metadata = build_page_metadata(content_store)
+    graph = build_link_graph(content_store)
+    pages = [page_id for page_id, page in content_store.items() if 'error' not in page]
+
+    lines = ["Documentation structure:"]
+    lines.extend(_render_hierarchy(build_hierarchy(content_store), metadata))
+
+    lines.append("\nPage metadata and links:")
+    for page_id in pages:
+        info = metadata[page_id]
+        lines.append(
+            f"- {page_id}: {info['words']} words, sections: {', '.join(info['sections']) or 'none'}; "
+            f"links to: {', '.join(graph[page_id]['outgoing']) or 'none'}"
+        )
+
+    errors = [page_id for page_id, page in content_store.items() if 'error' in page]
+    if errors:
+        lines.append("\nPages that failed to load: " + ', '.join(errors))
+
+    lines.append("\nPage content:")
+    per_page = max_chars // max(len(pages), 1)
+    for page_id in pages:
+        content = content_store[page_id]['content']
+        excerpt = content if len(content) <= per_page else content[:per_page] + "\n[...]"
+        lines.append(f"\n## {metadata[page_id]['title']} ({page_id})\n{excerpt}")
+
+    return '\n'.join(lines)
+
+
+def build_fast_crew(user_assistant, embedder_config: Dict, memory: bool = True) -> Crew:
+    """
+    Build a single-task crew that answers directly from precomputed documentation context.
+
+    The crawl and analyze tasks are skipped; their output is replaced by the
+    {doc_context} input built with build_doc_context. Pass memory=False for
+    short-lived per-request crews that should not build their own memory stores.
+    """
+    fast_assist_task = Task(
+        description="""
+        1. Understand user {query} about the documentation and {user_context}
+        2. Use the documentation context below, which lists the documentation hierarchy,
+           links between pages, page metadata and page content
+        3. Provide step-by-step solutions
+        4. Explain concepts clearly
+        5. Guide users through implementation
+
+        Documentation context:
+        {doc_context}
+        """,
+        expected_output="""
+        Clear and actionable responses including:
+        - Direct answers to user {query}
+        - Step-by-step implementation of the answer
+        - Relevant documentation references
+        - Troubleshooting suggestions if needed
+        """,
+        agent=user_assistant,
+        verbose=True
+    )
+
+    return Crew(
+        agents=[user_assistant],
+        tasks=[fast_assist_task],
+        verbose=True,
+        memory=memory,
+        embedder=embedder_config
+    )
+
+
+def _page_texts(content_store: Dict[str, Dict]) -> Dict[str, str]:
+    return {page_id: page['content'] for page_id, page in content_store.items() if 'error' not in page}
+
+
+def kickoff_with_context(crew, user_assistant, embedder_config: Dict,
+                         load_content_store: Callable[[], Dict[str, Dict]], inputs: Dict, corpus_id: str):
+    """
+    Kick off the full crew, or answer with only the assist task from context built in code.
+
+    The single-task crew runs when the fast path or map-reduce analysis is
+    enabled, or when the corpus has precomputed summaries. Its {doc_context}
+    holds the summaries (or else a map-reduce analysis) and, on the fast path,
+    the structured documentation from build_doc_context. Summaries are only
+    used if the corpus has not changed since they were built, which is checked
+    from cheap document versions; the corpus itself is only loaded when the fast
+    path or the map-reduce analysis needs its text.
+
+    Args:
+        crew (Crew): The entry script's full crawl/analyze/assist crew.
+        user_assistant (Agent): Agent that answers in the single-task crew.
+        embedder_config (dict): Crew memory embedder configuration.
+        load_content_store (Callable): Returns the corpus as a content store; only
+            called when the documents themselves are needed.
+        inputs (dict): query and user_context for the crew.
+        corpus_id (str): Docs folder, repository or site whose summaries are used.
+
+    Returns:
+        The crew result.
+    """
+    summaries = load_current_summaries(corpus_id)
+    if not (FAST_PATH or summaries or MAP_REDUCE):
+        return streaming.kickoff(crew, inputs)
+
+    context = [render_summaries(summaries)] if summaries else []
+    if FAST_PATH or (MAP_REDUCE and not summaries):
+        content_store = load_content_store()
+        if MAP_REDUCE and not summaries:
+            context.append(render_analysis(analyze_corpus(_page_texts(content_store))))
+        if FAST_PATH:
+            context.append(build_doc_context(content_store))
+    inputs = dict(inputs, doc_context="\n\n".join(context))
+    return streaming.kickoff(build_fast_crew(user_assistant, embedder_config), inputs)
@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urldefrag, urljoin, urlparse
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Answer on-demand queries with a focused crawl instead of crawling the whole site
+FOCUSED_CRAWL = os.getenv("AGENTIC_FOCUSED_CRAWL", "").lower() in ("1", "true")
+# Pages fetched before a focused crawl stops
+FOCUS_MAX_PAGES = int(os.getenv("AGENTIC_FOCUS_MAX_PAGES", "30"))
+# Mean query coverage of the best FOCUS_TOP_PAGES pages at which the crawl stops
+FOCUS_CONFIDENCE = float(os.getenv("AGENTIC_FOCUS_CONFIDENCE", "0.8"))
+FOCUS_TOP_PAGES = int(os.getenv("AGENTIC_FOCUS_TOP_PAGES", "3"))
+
+WORD = re.compile(r'[a-z0-9]+')
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how',
+    'i', 'in', 'is', 'it', 'my', 'of', 'on', 'or', 'the', 'this', 'to', 'use', 'using', 'what',
+    'when', 'where', 'which', 'who', 'why', 'with', 'you', 'your', 'html', 'htm', 'index', 'en',
+    'latest', 'stable'
+}
+# Characters of text around a link considered part of its context
+LINK_CONTEXT_CHARS = 200
+
+
+def terms(text: str) -> Set[str]:
+    """Lower-cased content words with a light plural/verb suffix stemming."""
+    result = set()
+    for word in WORD.findall(text.lower()):
+        if word in STOP_WORDS or len(word) < 2:
+            continue
+        for suffix in ('ing', 'ed', 'es', 's'):
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        result.add(word)
+    return result
+
+
+def coverage(query_terms: Set[str], text_terms: Set[str]) -> float:
+    """Fraction of the query's terms that appear in a text."""
+    if not query_terms:
+        return 0.0
+    return len(query_terms & text_terms) / len(query_terms)
+
+
+def score_link(query_terms: Set[str], url: str, anchor_text: str, context_text: str,
+               parent_score: float) -> float:
+    """
+    Estimate how likely a link leads to an answer before fetching it.
+
+    Anchor text counts most, then the words in the URL path and the text around
+    the link. A share of the linking page's own relevance is inherited, so links
+    from on-topic pages are preferred over links from navigation-only pages.
+    """
+    path_text = unquote(urlparse(url).path).replace('-', ' ').replace('_', ' ').replace('/', ' ')
+    return (
+        2.0 * coverage(query_terms, terms(anchor_text)) +
+        1.0 * coverage(query_terms, terms(path_text)) +
+        1.0 * coverage(query_terms, terms(context_text)) +
+        0.5 * parent_score
+    )
+
+
+def scored_links(soup: BeautifulSoup, current_url: str, base_url: str, query_terms: Set[str],
+                 parent_score: float) -> List[Tuple[float, str]]:
+    """Links under base_url with their scores, keeping the best score of repeated links."""
+    best = {}
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        if href.startswith('#'):
+            continue
+        url = urldefrag(urljoin(current_url, href))[0]
+        if not url.startswith(base_url):
+            continue
+        context = a.parent.get_text(' ', strip=True)[:LINK_CONTEXT_CHARS] if a.parent else ''
+        score = score_link(query_terms, url, a.get_text(' ', strip=True), context, parent_score)
+        best[url] = max(score, best.get(url, 0.0))
+    return [(score, url) for url, score in best.items()]
+
+
+class FocusedFrontier:
+    def __init__(self, query: str, max_pages: int = FOCUS_MAX_PAGES,
+                 confidence: float = FOCUS_CONFIDENCE, top_pages: int = FOCUS_TOP_PAGES):
+        """
+        Priority queue of links and stopping rule for a query-focused crawl.
+
+        The most promising link is fetched next. The crawl stops when max_pages
+        pages were fetched or when the top_pages most relevant pages cover, on
+        average, at least `confidence` of the query terms.
+        """
+        self.query_terms = terms(query)
+        self.max_pages = max_pages
+        self.confidence_target = confidence
+        self.top_pages = top_pages
+        self.page_scores: Dict[str, float] = {}
+        self._queue = []
+        self._queued = set()
+        self._order = itertools.count()
+
+    def push(self, url: str, score: float, depth: int = 0):
+        if url in self._queued:
+            return
+        self._queued.add(url)
+        heapq.heappush(self._queue, (-score, next(self._order), url, depth))
+
+    def extend(self, links: Iterable[Tuple[float, str]], depth: int):
+        for score, url in links:
+            self.push(url, score, depth)
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Next (url, depth) to fetch, or None when the crawl should stop."""
+        if not self._queue or self.done:
+            return None
+        _, _, url, depth = heapq.heappop(self._queue)
+        return url, depth
+
+    def record_page(self, url: str, text: str) -> float:
+        """Score a fetched page by the share of query terms it contains."""
+        score = coverage(self.query_terms, terms(text))
+        self.page_scores[url] = score
+        return score
+
+    @property
+    def confidence(self) -> float:
+        best = sorted(self.page_scores.values(), reverse=True)[:self.top_pages]
+        return sum(best) / self.top_pages if best else 0.0
+
+    @property
+    def done(self) -> bool:
+        return len(self.page_scores) >= self.max_pages or self.confidence >= self.confidence_target
+
+    def ranked_pages(self) -> List[str]:
+        """Fetched pages, most relevant first."""
+        return sorted(self.page_scores, key=self.page_scores.get, reverse=True)
+
+
+def rank_indexed_pages(indexed_pages: Dict[str, Dict], query: str, limit: int = FOCUS_MAX_PAGES) -> Dict[str, Dict]:
+    """
+    Keep the `limit` site-index entries most relevant to a query.
+
+    Entries with text are scored on title and text; entries without text (from a
+    sitemap) are scored on title and URL only.
+    """
+    query_terms = terms(query)
+
+    def score(item):
+        url, entry = item
+        title = entry.get('title') or ''
+        path = unquote(urlparse(url).path).replace('-', ' ').replace('_', ' ').replace('/', ' ')
+        return (
+            2.0 * coverage(query_terms, terms(title)) +
+            1.0 * coverage(query_terms, terms(path)) +
+            1.0 * coverage(query_terms, terms(entry.get('text') or ''))
+        )
+
+    return dict(sorted(indexed_pages.items(), key=score, reverse=True)[:limit])
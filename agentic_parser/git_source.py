@@ -0,0 +1,257 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+import block_store
+import markdown_ast
+import telemetry
+from GitLabScrappper import load_rag_document, save_rag_document
+
+load_dotenv()
+
+# Commit or branch to ingest from the local repository
+GIT_REV = os.getenv("AGENTIC_GIT_REV", "HEAD")
+
+MARKDOWN_EXTENSION = '.md'
+
+
+class GitError(Exception):
+    """Raised when a git command fails, e.g. the path is not a repository or the revision is unknown."""
+
+
+class GitRepository:
+    def __init__(self, path: str):
+        """
+        Read markdown straight from the object database of a local clone or bare repository.
+
+        Files are read at a commit, not from the working tree, so a clone and a
+        bare mirror of the same repository give the same documents and
+        uncommitted edits are never ingested. Needs the git executable only; no
+        network access.
+
+        Args:
+            path (str): Working copy or bare repository.
+        """
+        self.path = os.path.abspath(path)
+
+    def _git(self, *args: str, input: Optional[bytes] = None) -> bytes:
+        result = subprocess.run(
+            ['git', '-C', self.path, *args], input=input, capture_output=True
+        )
+        if result.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed in {self.path}: "
+                           f"{result.stderr.decode('utf-8', errors='replace').strip()}")
+        return result.stdout
+
+    def resolve(self, rev: str = GIT_REV) -> str:
+        """Full SHA of the commit a revision points to."""
+        return self._git('rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}").decode().strip()
+
+    def has_commit(self, sha: str) -> bool:
+        try:
+            self.resolve(sha)
+            return True
+        except GitError:
+            return False
+
+    def markdown_blobs(self, commit: str) -> Dict[str, str]:
+        """Paths of the markdown files in a commit mapped to their blob SHAs."""
+        blobs = {}
+        for entry in self._git('ls-tree', '-r', '-z', commit).split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            _, kind, sha = info.split()
+            path = path.decode('utf-8', errors='replace')
+            if kind == b'blob' and path.endswith(MARKDOWN_EXTENSION):
+                blobs[path] = sha.decode()
+        return blobs
+
+    def changed_markdown(self, old: str, new: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Markdown files that differ between two commits, with renames detected.
+
+        Returns:
+            list: (status, old_path, new_path) tuples where status is "added",
+            "modified", "renamed" or "deleted"; the path that does not apply is None.
+        """
+        fields = self._git('diff-tree', '-r', '-z', '-M', '--name-status', old, new).split(b'\0')
+        changes = []
+        i = 0
+        while i < len(fields) and fields[i]:
+            status = fields[i].decode()[0]
+            if status in 'RC':
+                old_path, new_path = (fields[i + 1].decode('utf-8', errors='replace'),
+                                      fields[i + 2].decode('utf-8', errors='replace'))
+                i += 3
+            else:
+                old_path = new_path = fields[i + 1].decode('utf-8', errors='replace')
+                i += 2
+            old_md = old_path.endswith(MARKDOWN_EXTENSION) and status not in 'AC'
+            new_md = new_path.endswith(MARKDOWN_EXTENSION) and status != 'D'
+            if status == 'R' and old_md and new_md:
+                changes.append(('renamed', old_path, new_path))
+            elif old_md and new_md:
+                changes.append(('modified', old_path, new_path))
+            elif new_md:
+                changes.append(('added', None, new_path))
+            elif old_md:
+                changes.append(('deleted', old_path, None))
+        return changes
+
+    def read_blobs(self, shas: Iterable[str]) -> Dict[str, str]:
+        """
+        Contents of many blobs, read through a single git cat-file process.
+
+        A blob the object database does not have (e.g. in a partial clone) is
+        left out with a warning.
+        """
+        shas = list(dict.fromkeys(shas))
+        if not shas:
+            return {}
+        output = self._git('cat-file', '--batch', input=''.join(f"{sha}\n" for sha in shas).encode())
+        contents = {}
+        position = 0
+        for _ in shas:
+            header_end = output.index(b'\n', position)
+            header = output[position:header_end].decode().split()
+            if len(header) != 3:
+                # "<sha> missing" or "<sha> ambiguous" has no size and no content
+                print(f"Warning: skipping blob {header[0]}, which git reports as {' '.join(header[1:])}")
+                position = header_end + 1
+                continue
+            sha, kind, size = header
+            start = header_end + 1
+            contents[sha] = output[start:start + int(size)].decode('utf-8', errors='replace')
+            position = start + int(size) + 1
+        return contents
+
+
+def _rag_entry(repo_path: str, path: str, content: str, blob_sha: str) -> Dict:
+    return {
+        'title': markdown_ast.parsed_markdown(content)['title'] or os.path.basename(path),
+        'content': content,
+        'source_file': path,
+        'repository': repo_path,
+        'blob_sha': blob_sha
+    }
+
+
+def iter_repository_markdown(repo_path: str, rev: str = GIT_REV) -> Iterator[Dict]:
+    """
+    Yield every markdown file of a local repository at a revision as a RAG document entry.
+
+    Args:
+        repo_path (str): Working copy or bare repository.
+        rev (str): Commit, branch or tag to read.
+    """
+    repository = GitRepository(repo_path)
+    blobs = repository.markdown_blobs(repository.resolve(rev))
+    contents = repository.read_blobs(blobs.values())
+    for path, sha in blobs.items():
+        if sha in contents:
+            yield _rag_entry(repository.path, path, contents[sha], sha)
+
+
+def sync_repository(repo_path: str, output_path: str, rev: str = GIT_REV) -> Dict:
+    """
+    Bring a RAG document up to date with a local repository.
+
+    The first run reads every markdown file at `rev`. Later runs diff the commit
+    recorded in the RAG document against `rev` and only read the added,
+    modified and renamed files, dropping deleted ones. When the recorded commit
+    is no longer in the repository (e.g. after a force push) every file is read
+    again.
+
+    Args:
+        repo_path (str): Working copy or bare repository.
+        output_path (str): RAG document to update, JSON or a .blocks store.
+        rev (str): Commit, branch or tag to ingest.
+
+    Returns:
+        dict: The commit ingested and the changed paths by kind of change.
+    """
+    repository = GitRepository(repo_path)
+    commit = repository.resolve(rev)
+    previous = load_rag_document(output_path) if os.path.exists(output_path) else None
+    last_commit = previous['project_info'].get('commit_sha') if previous else None
+    changes = {'added': [], 'modified': [], 'renamed': [], 'deleted': []}
+
+    with telemetry.span("git.sync", repository=repository.path):
+        if last_commit == commit:
+            return {'commit': commit, 'previous_commit': last_commit, 'full': False, **changes}
+
+        full = not (last_commit and repository.has_commit(last_commit))
+        if full:
+            blobs = repository.markdown_blobs(commit)
+            documents = {}
+            changes['added'] = list(blobs)
+            to_read = blobs
+        else:
+            documents = {document['source_file']: document for document in previous['documents']}
+            to_read = {}
+            for status, old_path, new_path in repository.changed_markdown(last_commit, commit):
+                changes[status].append(f"{old_path} -> {new_path}" if status == 'renamed' else new_path or old_path)
+                if old_path:
+                    documents.pop(old_path, None)
+                if new_path:
+                    to_read[new_path] = None
+            if to_read:
+                blobs = repository.markdown_blobs(commit)
+                to_read = {path: blobs[path] for path in to_read}
+
+        contents = repository.read_blobs(to_read.values())
+        for path, sha in to_read.items():
+            if sha in contents:
+                documents[path] = _rag_entry(repository.path, path, contents[sha], sha)
+
+        rag_document = {
+            'project_info': {
+                'name': os.path.basename(repository.path.rstrip(os.sep)),
+                'url': repository.path,
+                'commit_sha': commit,
+                'processed_date': datetime.now().isoformat()
+            },
+            'documents': [documents[path] for path in sorted(documents)]
+        }
+        save_rag_document(rag_document, output_path)
+    telemetry.add("agentic.git.files", len(to_read))
+    return {'commit': commit, 'previous_commit': last_commit, 'full': full, **changes}
+
+
+def main():
+    """
+    Ingest the markdown files of a local git repository, incrementally after the first run.
+
+    Usage:
+        python git_source.py <repository> [output_path] [rev]
+    """
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    repo_path = sys.argv[1]
+    name = os.path.basename(os.path.abspath(repo_path).rstrip(os.sep))
+    output_path = sys.argv[2] if len(sys.argv) > 2 else block_store.store_path(
+        os.path.join("rag_data", f"{name}_git.json")
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    started = datetime.now()
+    result = sync_repository(repo_path, output_path, sys.argv[3] if len(sys.argv) > 3 else GIT_REV)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    if result['commit'] == result['previous_commit']:
+        print(f"{output_path} is up to date with {repo_path} at {result['commit'][:12]}")
+        return
+    kind = "Full sync" if result['full'] else "Incremental sync"
+    print(f"{kind} of {repo_path} to {result['commit'][:12]} in {elapsed * 1000:.0f} ms")
+    for status in ('added', 'modified', 'renamed', 'deleted'):
+        for path in result[status]:
+            print(f"  {status}: {path}")
+    print(f"RAG document saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+import block_store
+import http_client
+import telemetry
+from GitLabScrappper import GitLabRAGProcessor, load_rag_document, save_rag_document
+
+load_dotenv()
+
+# Repositories processed at the same time
+GITLAB_WORKERS = int(os.getenv("AGENTIC_GITLAB_WORKERS", "8"))
+# Total GitLab API requests allowed per run; unset means unlimited
+GITLAB_MAX_REQUESTS = int(os.getenv("AGENTIC_GITLAB_MAX_REQUESTS", "0")) or None
+# Upper bound on the GitLab API request rate across all workers; unset means no pacing
+GITLAB_REQUESTS_PER_MINUTE = float(os.getenv("AGENTIC_GITLAB_REQUESTS_PER_MINUTE", "0")) or None
+
+MANIFEST_NAME = 'manifest.json'
+SHARD_DIR = 'shards'
+
+
+def shard_name(repo_url: str) -> str:
+    """File name of a repository's shard, readable and unique per URL."""
+    path = repo_url.rstrip('/').split('gitlab.com/')[-1]
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')[:80]
+    digest = hashlib.sha256(repo_url.rstrip('/').encode('utf-8')).hexdigest()[:8]
+    return f"{slug}_{digest}.json"
+
+
+def load_manifest(output_dir: str) -> Dict:
+    """Load the manifest of the previous run, or an empty one."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {'repositories': {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Dict):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def ingest_repository(repo_url: str, output_dir: str, previous: Optional[Dict],
+                      budget: http_client.RequestBudget) -> Dict:
+    """
+    Process one repository into its shard unless its last commit is unchanged.
+
+    Args:
+        repo_url (str): Full URL to the GitLab repository.
+        output_dir (str): Directory holding the manifest and the shards folder.
+        previous (dict): Manifest entry of the previous run, if any.
+        budget (RequestBudget): Request allowance shared by every repository.
+
+    Returns:
+        dict: The repository's manifest entry.
+    """
+    shard = block_store.store_path(os.path.join(SHARD_DIR, shard_name(repo_url)))
+    shard_path = os.path.join(output_dir, shard)
+    checked_at = datetime.now().isoformat()
+
+    try:
+        processor = GitLabRAGProcessor(repo_url, output_dir=os.path.dirname(shard_path), budget=budget)
+        commit_sha = processor.fetch_last_commit_sha()
+        if (commit_sha and previous and previous.get('commit_sha') == commit_sha
+                and os.path.exists(shard_path)):
+            print(f"Unchanged since {commit_sha[:12]}: {repo_url}")
+            return dict(previous, status='unchanged', checked_at=checked_at)
+
+        with telemetry.span("gitlab.process", repository=repo_url):
+            project_info = processor.fetch_project_info()
+            rag_document = processor.build_rag_document(
+                project_info, processor.project_id_for(project_info), commit_sha
+            )
+        save_rag_document(rag_document, shard_path)
+        print(f"Processed {len(rag_document['documents'])} markdown files: {repo_url}")
+        return {
+            'name': project_info['name'],
+            'shard': shard,
+            'commit_sha': commit_sha,
+            'documents': len(rag_document['documents']),
+            'processed_date': rag_document['project_info']['processed_date'],
+            'checked_at': checked_at,
+            'status': 'processed'
+        }
+    except Exception as e:
+        status = 'skipped' if isinstance(e, http_client.RequestBudgetExhausted) else 'failed'
+        print(f"{status.capitalize()}: {repo_url}: {e}")
+        # Keep serving the last good shard; the next run retries this repository
+        entry = dict(previous) if previous else {'shard': None, 'commit_sha': None, 'documents': 0}
+        return dict(entry, status=status, error=str(e), checked_at=checked_at)
+
+
+def ingest_repositories(repo_urls: List[str], output_dir: str = "rag_data",
+                        workers: int = GITLAB_WORKERS,
+                        max_requests: Optional[int] = GITLAB_MAX_REQUESTS,
+                        per_minute: Optional[float] = GITLAB_REQUESTS_PER_MINUTE) -> Dict:
+    """
+    Ingest many GitLab repositories in parallel under one request budget.
+
+    Each repository is written to its own shard in <output_dir>/shards, and
+    <output_dir>/manifest.json lists every repository with its shard, last
+    commit SHA and status. Repositories whose last commit matches the previous
+    manifest cost a single request and keep their shard.
+
+    Args:
+        repo_urls (list): Full URLs of the GitLab repositories.
+        output_dir (str): Directory for the manifest and shards.
+        workers (int): Repositories processed concurrently.
+        max_requests (int): Total API requests allowed for the run; None means unlimited.
+        per_minute (float): Request rate limit shared by all workers; None means no pacing.
+
+    Returns:
+        dict: The merged manifest.
+    """
+    os.makedirs(os.path.join(output_dir, SHARD_DIR), exist_ok=True)
+    previous = load_manifest(output_dir)['repositories']
+    budget = http_client.RequestBudget(max_requests, per_minute)
+    repo_urls = list(dict.fromkeys(url.rstrip('/') for url in repo_urls))
+
+    def ingest(repo_url):
+        return repo_url, ingest_repository(repo_url, output_dir, previous.get(repo_url), budget)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        repositories = dict(executor.map(ingest, repo_urls))
+
+    statuses = [entry['status'] for entry in repositories.values()]
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'requests_used': budget.used,
+        'summary': {status: statuses.count(status) for status in dict.fromkeys(statuses)},
+        'documents': sum(entry['documents'] for entry in repositories.values()),
+        'repositories': repositories
+    }
+    _write_json(os.path.join(output_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def load_documents(output_dir: str = "rag_data") -> List[Dict]:
+    """Read the documents of every repository in the manifest from their shards."""
+    documents = []
+    for entry in load_manifest(output_dir)['repositories'].values():
+        if entry.get('shard'):
+            documents.extend(load_rag_document(os.path.join(output_dir, entry['shard']))['documents'])
+    return documents
+
+
+def read_repo_list(path: str) -> List[str]:
+    """Read repository URLs from a file, one per line; blank lines and # comments are ignored."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.split('#', 1)[0].strip() for line in f]
+    return [line for line in lines if line]
+
+
+def main():
+    """
+    Ingest a list of GitLab repositories.
+
+    Usage:
+        python gitlab_batch.py <repos.txt> [output_dir]
+
+    Without arguments the comma-separated GITLAB_REPOS variable is used.
+    """
+    if len(sys.argv) > 1:
+        repo_urls = read_repo_list(sys.argv[1])
+    else:
+        repo_urls = [url.strip() for url in os.getenv("GITLAB_REPOS", "").split(',') if url.strip()]
+    if not repo_urls:
+        print(main.__doc__)
+        sys.exit(1)
+
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "rag_data"
+    manifest = ingest_repositories(repo_urls, output_dir)
+    print(f"\n{len(manifest['repositories'])} repositories, {manifest['documents']} documents, "
+          f"{manifest['requests_used']} requests: {manifest['summary']}")
+    print(f"Manifest saved to: {os.path.join(output_dir, MANIFEST_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import telemetry
+
+load_dotenv()
+
+HTTP_TIMEOUT = float(os.getenv("AGENTIC_HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("AGENTIC_HTTP_RETRIES", "3"))
+HTTP_POOL_SIZE = int(os.getenv("AGENTIC_HTTP_POOL_SIZE", "32"))
+# Adapt the number of requests in flight per host to its latency and errors (AIMD)
+HTTP_ADAPTIVE = os.getenv("AGENTIC_HTTP_ADAPTIVE", "1").lower() in ("1", "true")
+# Starting and highest per-host concurrency; a host never drops below one request in flight
+HTTP_HOST_CONCURRENCY = int(os.getenv("AGENTIC_HTTP_HOST_CONCURRENCY", "4"))
+HTTP_HOST_MAX_CONCURRENCY = int(os.getenv("AGENTIC_HTTP_HOST_MAX_CONCURRENCY", str(HTTP_POOL_SIZE)))
+# Smoothed latency above this multiple of the host's best recent latency counts as overload
+HTTP_LATENCY_FACTOR = float(os.getenv("AGENTIC_HTTP_LATENCY_FACTOR", "2.0"))
+OVERLOAD_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = "agentic-parser/1.0 (+https://github.com/M-E-U-E/Documentation-Using-AI-Agent)"
+
+
+def _accept_encoding() -> str:
+    """Advertise brotli and zstd only when urllib3 can decode them."""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    try:
+        import zstandard  # noqa: F401
+        encodings.append("zstd")
+    except ImportError:
+        pass
+    return ", ".join(encodings)
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        status_forcelist=OVERLOAD_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": _accept_encoding()
+    })
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide session shared by every fetcher.
+
+    The session keeps connections alive per host, negotiates compression and
+    retries connection errors and 429/5xx responses with jittered backoff.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+class AdaptiveLimit:
+    def __init__(self, host: str, initial: int = HTTP_HOST_CONCURRENCY, maximum: int = HTTP_HOST_MAX_CONCURRENCY,
+                 latency_factor: float = HTTP_LATENCY_FACTOR, decrease: float = 0.5, window: int = 500):
+        """
+        Per-host concurrency limit adjusted by additive increase, multiplicative decrease.
+
+        Every successful request while the host is at its limit raises the limit
+        by 1/limit, about one more request in flight per round of requests. A
+        429 or 5xx response (including ones retried away by the session), a
+        connection error or timeout, or a smoothed latency above latency_factor
+        times the best of the last `window` latencies multiplies the limit by
+        `decrease`, at most once per round trip so that the requests already in
+        flight do not cut it again.
+
+        Args:
+            host (str): Host name, used as the metric attribute.
+            initial (int): Requests in flight allowed before any feedback.
+            maximum (int): Highest limit; keep it at or below the connection pool size.
+            latency_factor (float): Latency increase that counts as overload.
+            decrease (float): Factor applied to the limit on overload.
+            window (int): Recent latencies the baseline is taken from.
+        """
+        self.host = host
+        self.limit = float(max(min(initial, maximum), 1))
+        self.maximum = max(maximum, 1)
+        self.latency_factor = latency_factor
+        self.decrease = decrease
+        self.in_flight = 0
+        self.smoothed_latency: Optional[float] = None
+        self._latencies = deque(maxlen=window)
+        self._samples_since_decrease = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._reported = int(self.limit)
+        telemetry.adjust("agentic.http.concurrency_limit", self._reported, host=host)
+
+    def acquire(self) -> bool:
+        """Wait for a free slot; returns whether the host is now at its limit."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return self.in_flight >= int(self.limit)
+
+    def release(self, saturated: bool, latency: Optional[float] = None, overloaded: bool = False):
+        """
+        Free a slot and adjust the limit from the request's outcome.
+
+        Args:
+            saturated (bool): What acquire returned; only requests sent at the limit raise it.
+            latency (float): Seconds until the response headers arrived; None if the request failed.
+            overloaded (bool): The host answered 429/5xx or the connection failed.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            # Error responses come back fast, so they would drag the latency baseline down
+            if latency is not None and not overloaded:
+                self._latencies.append(latency)
+                self._samples_since_decrease += 1
+                # Restarted after each decrease, so it reflects only the reduced load
+                self.smoothed_latency = latency if self.smoothed_latency is None else (
+                    0.8 * self.smoothed_latency + 0.2 * latency
+                )
+                # Judge latency only on requests sent after the last decrease
+                if (self._samples_since_decrease >= int(self.limit) and len(self._latencies) >= 5
+                        and self.smoothed_latency > self.latency_factor * min(self._latencies)):
+                    overloaded = True
+
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= (self.smoothed_latency or min(self._latencies, default=0.0)):
+                    self.limit = max(self.limit * self.decrease, 1.0)
+                    self._last_decrease = now
+                    self._samples_since_decrease = 0
+                    self.smoothed_latency = None
+            elif saturated:
+                self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+            self._condition.notify_all()
+            change = int(self.limit) - self._reported
+            self._reported = int(self.limit)
+        if change:
+            telemetry.adjust("agentic.http.concurrency_limit", change, host=self.host)
+
+
+_limits: Dict[str, AdaptiveLimit] = {}
+_limits_lock = threading.Lock()
+
+
+def host_limit(url: str) -> Optional[AdaptiveLimit]:
+    """The adaptive limit of a URL's host, or None when AGENTIC_HTTP_ADAPTIVE is off."""
+    if not HTTP_ADAPTIVE:
+        return None
+    host = urlparse(url).netloc.lower()
+    limit = _limits.get(host)
+    if limit is None:
+        with _limits_lock:
+            limit = _limits.setdefault(host, AdaptiveLimit(host))
+    return limit
+
+
+def concurrency_limits() -> Dict[str, int]:
+    """Current concurrency limit of every host contacted so far."""
+    return {host: int(limit.limit) for host, limit in _limits.items()}
+
+
+def _retried_overload(response: requests.Response) -> bool:
+    """Whether the session retried past a 429/5xx or connection error before this response."""
+    retries = getattr(response.raw, "retries", None)
+    return any(
+        entry.status in OVERLOAD_STATUSES or entry.error is not None
+        for entry in getattr(retries, "history", ())
+    )
+
+
+def request(method: str, url: str, source: str = "web", timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session with the default timeout.
+
+    Requests wait for a slot under their host's adaptive concurrency limit. A
+    streamed response frees its slot once the headers have arrived.
+
+    Args:
+        method (str): HTTP method, e.g. "GET" or "HEAD".
+        url (str): Request URL.
+        source (str): Label used for telemetry, e.g. "web", "github" or "gitlab".
+        timeout (float): Overrides AGENTIC_HTTP_TIMEOUT for this request.
+        **kwargs: Passed to requests.Session.request (params, headers, stream...).
+
+    Returns:
+        requests.Response: The response, whatever its status code.
+    """
+    limit = host_limit(url)
+    saturated = limit.acquire() if limit else False
+    try:
+        with telemetry.span("fetch", url=url, source=source):
+            response = get_session().request(method, url, timeout=timeout or HTTP_TIMEOUT, **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+        if limit:
+            limit.release(saturated, overloaded=True)
+        raise
+    except Exception:
+        if limit:
+            limit.release(saturated)
+        raise
+    if limit:
+        limit.release(
+            saturated,
+            latency=response.elapsed.total_seconds(),
+            overloaded=response.status_code in OVERLOAD_STATUSES or _retried_overload(response)
+        )
+
+    if kwargs.get("stream") or method == "HEAD":
+        # Reading .content would consume a streamed body, so count the advertised size
+        telemetry.record_response(response, source, size=int(response.headers.get("Content-Length") or 0))
+    else:
+        telemetry.record_response(response, source)
+    return response
+
+
+def get(url: str, source: str = "web", timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """GET a URL through the shared session."""
+    return request("GET", url, source=source, timeout=timeout, **kwargs)
+
+
+def head(url: str, source: str = "web", timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """HEAD a URL through the shared session."""
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, source=source, timeout=timeout, **kwargs)
+
+
+class RequestBudgetExhausted(Exception):
+    """Raised when a RequestBudget has no requests left."""
+
+
+class RequestBudget:
+    def __init__(self, max_requests: Optional[int] = None, per_minute: Optional[float] = None):
+        """
+        A request allowance shared by several threads.
+
+        Args:
+            max_requests (int): Total requests allowed; None means unlimited.
+            per_minute (float): Spread requests out to at most this rate; None means no pacing.
+        """
+        self.max_requests = max_requests
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.used = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.max_requests is None else max(self.max_requests - self.used, 0)
+
+    def spend(self):
+        """Take one request from the budget, waiting for its slot when paced."""
+        with self._lock:
+            if self.max_requests is not None and self.used >= self.max_requests:
+                raise RequestBudgetExhausted(f"Request budget of {self.max_requests} exhausted")
+            self.used += 1
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
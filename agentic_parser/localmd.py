@@ -1,16 +1,17 @@
 import os
-import requests
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
+from embedding_service import crew_embedder_config
+from fast_path import kickoff_with_context, markdown_content_store
+from document_source import iter_local_markdown
+from pipeline import collect_content
 
 # Load environment variables
 load_dotenv()
 
-gapi_key = os.getenv("GEMINI_API_KEY")
-
 # Dynamically get the correct absolute path of the `docs/` directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # Get the script's directory
-DOCS_DIR = os.path.join(SCRIPT_DIR, "docs")  # Construct the absolute path to 'docs'
+DOCS_DIR = os.getenv("AGENTIC_DOCS_DIR") or os.path.join(SCRIPT_DIR, "docs")  # 'docs' next to this script unless AGENTIC_DOCS_DIR is set
 
 # Check if the directory exists before proceeding
 if not os.path.exists(DOCS_DIR):
@@ -27,18 +28,7 @@ def read_markdown_files(directory: str):
     Returns:
         dict: A dictionary with filenames as keys and their content as values.
     """
-    docs_content = {}
-    
-    for filename in os.listdir(directory):
-        if filename.endswith(".md"):  # Only process markdown files
-            file_path = os.path.join(directory, filename)
-            try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    docs_content[filename] = file.read()
-            except Exception as e:
-                docs_content[filename] = f"Error reading file: {e}"
-    
-    return docs_content
+    return collect_content(iter_local_markdown(directory))
 
 
 # Initialize the custom tool for reading Markdown files
@@ -133,14 +123,8 @@ assist_task = Task(
     verbose=True
 )
 
-# Updated embedder configuration
-embedder_config = {
-    "provider": "google",
-    "config": {
-        "api_key": gapi_key,
-        "model": "models/embedding-001"
-    }
-}
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
 
 # Create and configure the crew
 crew = Crew(
@@ -158,7 +142,12 @@ if __name__ == "__main__":
     }
 
     # Kick off the Crew
-    result = crew.kickoff(inputs=inputs)
+    # Answers from precomputed summaries, a map-reduce analysis and/or markdown
+    # structured in code when enabled, running only the assist task
+    result = kickoff_with_context(
+        crew, user_assistant, embedder_config, lambda: markdown_content_store(documentation_content),
+        inputs, DOCS_DIR
+    )
 
     # Output the extracted documentation content for verification
     print("\nExtracted Documentation Content:")
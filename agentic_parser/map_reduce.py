@@ -0,0 +1,238 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from pipeline import chunk_documents, collect_content
+from summaries import SUMMARY_MODEL
+
+load_dotenv()
+
+# Analyse the corpus with concurrent per-chunk LLM calls merged in a tree, instead of the analyze task
+MAP_REDUCE = os.getenv("AGENTIC_MAP_REDUCE", "").lower() in ("1", "true")
+# Model used for the analysis; "fake" uses the offline FakeLLM
+MAP_REDUCE_MODEL = os.getenv("AGENTIC_MAP_REDUCE_MODEL", SUMMARY_MODEL)
+# LLM calls in flight at once
+LLM_CONCURRENCY = int(os.getenv("AGENTIC_LLM_CONCURRENCY", "4"))
+# Characters of a document analysed per map call, and analyses merged per reduce call
+MAP_CHUNK_CHARS = int(os.getenv("AGENTIC_MAP_CHUNK_CHARS", "24000"))
+REDUCE_FAN_IN = int(os.getenv("AGENTIC_REDUCE_FAN_IN", "8"))
+
+MAP_PROMPT = """Analyse this part of a documentation page for a knowledge base.
+List its key points, the key concepts with a one-sentence definition each, and
+how the concepts relate. Be concise.
+
+Page: {name} (part {part} of {parts})
+
+{content}
+"""
+
+REDUCE_PROMPT = """Merge these analyses of documentation into one analysis.
+Keep every distinct key point, concept definition and relationship, drop
+repetition, and stay concise.
+
+{analyses}
+"""
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.05, words: int = 40):
+        """
+        Offline stand-in for an LLM, for tests and benchmarks.
+
+        Each call sleeps for `latency` seconds and returns the first `words`
+        words of the prompt's content, so results are deterministic and runs
+        need no network or API key. Counts calls and the most calls seen in
+        flight at once.
+        """
+        self.latency = latency
+        self.words = words
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            # Skip the instructions, which end at the first blank line
+            content = prompt.split('\n\n', 1)[-1]
+            return ' '.join(content.split()[:self.words])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def build_llm(model: str = MAP_REDUCE_MODEL) -> Callable[[str], str]:
+    """Return a prompt -> text callable for the model, or a FakeLLM for "fake"."""
+    if model == "fake":
+        return FakeLLM()
+
+    from crewai import LLM
+
+    llm = LLM(model=model, temperature=0)
+    return lambda prompt: llm.call([{"role": "user", "content": prompt}])
+
+
+def _merge_prompt(analyses: List[str], labels: List[Tuple[str, str]]) -> str:
+    return REDUCE_PROMPT.format(analyses='\n\n'.join(
+        f"### {first if first == last else f'{first} to {last}'}\n{analysis}"
+        for (first, last), analysis in zip(labels, analyses)
+    ))
+
+
+class MapReduceAnalyzer:
+    def __init__(self, llm: Optional[Callable[[str], str]] = None, concurrency: int = LLM_CONCURRENCY,
+                 chunk_chars: int = MAP_CHUNK_CHARS, fan_in: int = REDUCE_FAN_IN):
+        """
+        Analyse a corpus with many small LLM calls run concurrently.
+
+        Map: every document is split into chunks of at most chunk_chars and each
+        chunk is analysed on its own. Reduce: the analyses of a document are
+        merged fan_in at a time, level by level, into one analysis per document,
+        and those are merged the same way into one corpus analysis. Every call
+        of a phase runs on one pool of `concurrency` threads, so wall time grows
+        with calls / concurrency plus one call per reduce level, and no prompt
+        grows with the size of the corpus.
+
+        Args:
+            llm (Callable): Takes a prompt and returns text; defaults to build_llm().
+            concurrency (int): LLM calls in flight at once.
+            chunk_chars (int): Most characters of a document per map call.
+            fan_in (int): Analyses merged per reduce call (at least 2).
+        """
+        self.llm = llm or build_llm()
+        self.concurrency = max(concurrency, 1)
+        self.chunk_chars = chunk_chars
+        self.fan_in = max(fan_in, 2)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        return self.llm(prompt).strip()
+
+    def _run(self, executor: ThreadPoolExecutor, prompts: List[str]) -> List[str]:
+        return list(executor.map(self._call, prompts))
+
+    def _reduce(self, executor: ThreadPoolExecutor, groups: Dict[str, List[str]],
+                labels: Dict[str, List[Tuple[str, str]]]) -> Dict[str, str]:
+        """
+        Merge each key's analyses down to one, running every merge of a level concurrently.
+
+        Labels are (first, last) names of the parts an analysis covers.
+        """
+        groups, labels = dict(groups), dict(labels)
+        while any(len(items) > 1 for items in groups.values()):
+            batches = [
+                (key, groups[key][start:start + self.fan_in], labels[key][start:start + self.fan_in])
+                for key in groups if len(groups[key]) > 1
+                for start in range(0, len(groups[key]), self.fan_in)
+            ]
+            merged = iter(self._run(executor, [
+                _merge_prompt(items, item_labels) for _, items, item_labels in batches if len(items) > 1
+            ]))
+            next_groups, next_labels = {}, {}
+            for key, items, item_labels in batches:
+                # A batch of one, left over at the end of a level, moves up unchanged
+                if len(items) > 1:
+                    item, label = next(merged), (item_labels[0][0], item_labels[-1][1])
+                else:
+                    item, label = items[0], item_labels[0]
+                next_groups.setdefault(key, []).append(item)
+                next_labels.setdefault(key, []).append(label)
+            groups.update(next_groups)
+            labels.update(next_labels)
+        return {key: items[0] if items else '' for key, items in groups.items()}
+
+    def analyze(self, documents: Dict[str, str]) -> Dict:
+        """
+        Analyse a corpus.
+
+        Args:
+            documents (dict): Document name mapped to its content.
+
+        Returns:
+            dict: 'documents' (name mapped to its merged analysis), 'corpus' (the
+            analysis of the whole corpus), 'llm_calls' and 'seconds'.
+        """
+        started = time.perf_counter()
+        chunks = list(chunk_documents(
+            ({'source': 'corpus', 'path': name, 'title': None, 'content': content}
+             for name, content in documents.items() if content),
+            chunk_size=self.chunk_chars, overlap=min(200, self.chunk_chars // 10)
+        ))
+        parts = {}
+        for chunk in chunks:
+            parts[chunk['path']] = parts.get(chunk['path'], 0) + 1
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            mapped = self._run(executor, [
+                MAP_PROMPT.format(name=chunk['path'], part=chunk['chunk_index'] + 1,
+                                  parts=parts[chunk['path']], content=chunk['content'])
+                for chunk in chunks
+            ])
+            by_document: Dict[str, List[str]] = {}
+            labels: Dict[str, List[str]] = {}
+            for chunk, analysis in zip(chunks, mapped):
+                by_document.setdefault(chunk['path'], []).append(analysis)
+                label = f"{chunk['path']} part {chunk['chunk_index'] + 1}"
+                labels.setdefault(chunk['path'], []).append((label, label))
+
+            document_analyses = self._reduce(executor, by_document, labels)
+            corpus = self._reduce(
+                executor, {'corpus': list(document_analyses.values())}, {'corpus': [(name, name) for name in document_analyses]}
+            )['corpus']
+
+        return {
+            'documents': document_analyses,
+            'corpus': corpus,
+            'llm_calls': self.calls,
+            'seconds': time.perf_counter() - started
+        }
+
+
+def analyze_corpus(documents: Dict[str, str], llm: Optional[Callable[[str], str]] = None) -> Dict:
+    """Analyse a corpus with the map-reduce settings from the environment."""
+    analysis = MapReduceAnalyzer(llm).analyze(documents)
+    print(f"Map-reduce analysis: {len(documents)} documents, {analysis['llm_calls']} LLM calls, "
+          f"{analysis['seconds']:.1f}s")
+    return analysis
+
+
+def render_analysis(analysis: Dict) -> str:
+    """Render a map-reduce analysis as prompt context for the assist task."""
+    lines = ["Knowledge base overview:", analysis['corpus'], "\nPer-document analysis:"]
+    for name, text in analysis['documents'].items():
+        lines.append(f"\n## {name}\n{text}")
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Analyse a local docs folder and report calls and wall time.
+
+    Usage:
+        python map_reduce.py <docs_dir>
+
+    Set AGENTIC_MAP_REDUCE_MODEL=fake to run offline.
+    """
+    if len(sys.argv) != 2:
+        print(main.__doc__)
+        sys.exit(1)
+
+    from document_source import iter_local_markdown
+
+    documents = collect_content(iter_local_markdown(sys.argv[1]))
+    print(render_analysis(analyze_corpus(documents)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from markdown_it import MarkdownIt
+from output_dir import output_path
+
+load_dotenv()
+
+# Parsed documents are stored here by content hash; set to an empty value to keep them in memory only
+MARKDOWN_CACHE_DIR = os.getenv("AGENTIC_MARKDOWN_CACHE_DIR", output_path("markdown"))
+# Parsed documents kept in memory
+MARKDOWN_CACHE_ENTRIES = int(os.getenv("AGENTIC_MARKDOWN_CACHE_ENTRIES", "1024"))
+# Bump when the parsed structure changes so every cached parse is rebuilt
+PARSER_VERSION = "1"
+
+_markdown = MarkdownIt('commonmark').enable('table')
+_markdown_lock = threading.Lock()
+
+
+def _plain_text(inline) -> str:
+    """Text of an inline token without markup: emphasis, links and images reduced to their text."""
+    parts = []
+    for child in inline.children or ():
+        if child.type in ('text', 'code_inline'):
+            parts.append(child.content)
+        elif child.type in ('softbreak', 'hardbreak'):
+            parts.append(' ')
+        elif child.type == 'image':
+            parts.append(_plain_text(child))
+    return ''.join(parts).strip()
+
+
+def parse_markdown(content: str) -> Dict:
+    """
+    Parse a markdown document once into the structure every consumer reads.
+
+    Args:
+        content (str): Markdown source.
+
+    Returns:
+        dict: title (first h1 or h2, else None); headings as a flat tree where
+        each entry has level, text, line, character offset and the index of its
+        parent heading; links in document order; code blocks with their
+        language and line; and plain-text spans (paragraphs, list items, table
+        cells) with the index of the heading they fall under.
+    """
+    with _markdown_lock:
+        tokens = _markdown.parse(content)
+    line_offsets = [0, *accumulate(len(line) for line in content.splitlines(keepends=True))]
+
+    headings: List[Dict] = []
+    links: List[str] = []
+    code_blocks: List[Dict] = []
+    spans: List[Dict] = []
+    open_headings: List[int] = []
+
+    for index, token in enumerate(tokens):
+        line = token.map[0] if token.map else None
+        if token.type == 'heading_open':
+            level = int(token.tag[1])
+            while open_headings and headings[open_headings[-1]]['level'] >= level:
+                open_headings.pop()
+            headings.append({
+                'level': level,
+                'text': _plain_text(tokens[index + 1]),
+                'line': line,
+                'offset': line_offsets[min(line, len(line_offsets) - 1)],
+                'parent': open_headings[-1] if open_headings else None
+            })
+            open_headings.append(len(headings) - 1)
+        elif token.type in ('fence', 'code_block'):
+            code_blocks.append({
+                'language': token.info.strip().split(' ', 1)[0] if token.info else '',
+                'code': token.content,
+                'line': line
+            })
+        elif token.type == 'inline':
+            links.extend(
+                child.attrs['href'] for child in token.children or ()
+                if child.type == 'link_open' and child.attrs.get('href')
+            )
+            if tokens[index - 1].type == 'heading_open':
+                continue
+            text = _plain_text(token)
+            if text:
+                spans.append({
+                    'text': text,
+                    'line': line,
+                    'heading': open_headings[-1] if open_headings else None
+                })
+
+    return {
+        'title': next((h['text'] for h in headings if h['level'] <= 2 and h['text']), None),
+        'headings': headings,
+        'links': links,
+        'code_blocks': code_blocks,
+        'spans': spans
+    }
+
+
+def content_hash(content: str) -> str:
+    """Hash a document together with the parser version that parses it."""
+    digest = hashlib.sha256()
+    digest.update(f"{PARSER_VERSION}\0".encode('utf-8'))
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MarkdownCache:
+    def __init__(self, directory: Optional[str] = MARKDOWN_CACHE_DIR, max_entries: int = MARKDOWN_CACHE_ENTRIES):
+        """
+        Parsed markdown keyed by content hash, in memory and on disk.
+
+        A document is parsed once per version: an unchanged file hashes to the
+        same key in every later run and is read back instead of re-parsed. The
+        in-memory layer keeps the most recently used max_entries parses.
+
+        Args:
+            directory (str): Where parses are stored, one JSON file per hash; None keeps them in memory only.
+            max_entries (int): Parses kept in memory.
+        """
+        self.directory = directory or None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, parsed: Dict):
+        with self._lock:
+            self._entries[key] = parsed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, content: str) -> Dict:
+        """Return the parse of content, parsing it only if this version was never seen."""
+        key = content_hash(content)
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parsed
+
+        if self.directory and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    parsed = json.load(f)
+            except (OSError, ValueError):
+                parsed = None
+            if parsed is not None:
+                self.hits += 1
+                self._remember(key, parsed)
+                return parsed
+
+        self.misses += 1
+        parsed = parse_markdown(content)
+        self._remember(key, parsed)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(parsed, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        return parsed
+
+
+markdown_cache = MarkdownCache()
+
+
+def parsed_markdown(content: str) -> Dict:
+    """Parse of content from the process-wide markdown cache."""
+    return markdown_cache.get(content)
+
+
+def section_at(parsed: Dict, offset: int) -> Optional[str]:
+    """Text of the heading whose section contains the character offset, or None before the first heading."""
+    section = None
+    for heading in parsed['headings']:
+        if heading['offset'] > offset:
+            break
+        section = heading['text']
+    return section
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Estimated Jaccard similarity above which two pages count as the same page; 0 disables
+NEAR_DUP_THRESHOLD = float(os.getenv("AGENTIC_NEAR_DUP_THRESHOLD", "0.9"))
+# Words per shingle and number of MinHash permutations
+SHINGLE_WORDS = int(os.getenv("AGENTIC_SHINGLE_WORDS", "5"))
+NUM_PERM = int(os.getenv("AGENTIC_MINHASH_PERMUTATIONS", "128"))
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD = re.compile(r'\w+')
+VERSION_SEGMENT = re.compile(r'/(latest|stable)/')
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> Set[str]:
+    """Overlapping runs of `size` lower-cased words; short texts become a single shingle."""
+    words = WORD.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) so pages around the threshold collide in at least one band.
+
+    Two signatures with similarity s share a band with probability
+    1 - (1 - s**rows)**bands, which rises steeply around (1/bands)**(1/rows).
+    The steepest point is kept about 0.1 below the threshold: extra candidates
+    are filtered by comparing signatures, while missed ones are lost for good.
+    """
+    target = max(threshold - 0.1, 0.0)
+    best, best_midpoint = (num_perm, 1), 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if best_midpoint < midpoint <= target:
+            best, best_midpoint = (bands, rows), midpoint
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, shingle_words: int = SHINGLE_WORDS, seed: int = 1):
+        """MinHash signatures from word shingles, using num_perm universal hash functions."""
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Minimum of each permuted shingle hash; equal entries estimate Jaccard similarity.
+
+        Returns None for text without any words, which has no shingles to compare.
+        """
+        hashes = np.array([
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+            for shingle in shingles(text, self.shingle_words)
+        ], dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+
+class NearDuplicateFilter:
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, num_perm: int = NUM_PERM,
+                 shingle_words: int = SHINGLE_WORDS):
+        """
+        Online near-duplicate detection with MinHash and LSH banding.
+
+        Documents are checked one at a time. The first document of each cluster
+        becomes its representative, and only representatives are indexed, so a
+        later document is compared with at most a handful of band-mates instead
+        of every earlier document. Feed documents in order of preference to
+        control which one represents a cluster.
+        """
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_words)
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.duplicates: Dict[str, str] = {}
+
+    def check(self, key: str, text: str) -> Optional[str]:
+        """
+        Return the representative `key` duplicates, or register it as a new one and return None.
+
+        Args:
+            key (str): Identifier of the document, e.g. its URL or path.
+            text (str): Document text.
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            # Empty pages are never near-duplicates, and are not indexed
+            return None
+        band_keys = [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+        candidates = dict.fromkeys(
+            representative
+            for band, band_key in enumerate(band_keys)
+            for representative in self.buckets[band].get(band_key, ())
+        )
+        for representative in candidates:
+            if np.mean(self.signatures[representative] == signature) >= self.threshold:
+                self.duplicates[key] = representative
+                return representative
+
+        self.signatures[key] = signature
+        for band, band_key in enumerate(band_keys):
+            self.buckets[band].setdefault(band_key, []).append(key)
+        return None
+
+    def clusters(self) -> Dict[str, List[str]]:
+        """Representatives mapped to the documents dropped as their duplicates."""
+        clusters = {}
+        for key, representative in self.duplicates.items():
+            clusters.setdefault(representative, []).append(key)
+        return clusters
+
+
+def prefer_url_key(url: str, base_url: Optional[str] = None) -> Tuple:
+    """
+    Sort key that puts the page that should represent a cluster first.
+
+    Pages under base_url come first, then /latest/ and /stable/ builds over pinned
+    versions, then shorter URLs.
+    """
+    version = VERSION_SEGMENT.search(url)
+    return (
+        0 if base_url and url.startswith(base_url) else 1,
+        {'latest': 0, 'stable': 1}[version.group(1)] if version else 2,
+        len(url),
+        url
+    )
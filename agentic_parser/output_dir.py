@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Everything the tools generate (caches, snapshots, summaries, profiles, telemetry) goes under this directory
+OUTPUT_DIR = os.getenv("AGENTIC_OUTPUT_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "agentic_parser"
+)
+
+
+def output_path(*parts: str) -> str:
+    """Path of a generated file or directory under OUTPUT_DIR."""
+    return os.path.join(OUTPUT_DIR, *parts)
@@ -0,0 +1,235 @@
+import atexit
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Dict, Optional
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+import block_store
+import http_client
+import telemetry
+
+load_dotenv()
+
+# Block store the page cache is loaded from and saved to at exit; unset keeps it in memory only
+PAGE_CACHE_PATH = os.getenv("AGENTIC_PAGE_CACHE_PATH")
+# Seconds a page stays fresh; 0 keeps pages until they are evicted
+PAGE_CACHE_TTL = float(os.getenv("AGENTIC_PAGE_CACHE_TTL", "3600"))
+# Characters of HTML and text kept in memory before the least recently used pages are evicted; 0 is unbounded
+PAGE_CACHE_MAX_BYTES = int(os.getenv("AGENTIC_PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _page_size(page: Dict) -> int:
+    return len(page['html'] or '') + len(page['text'] or '')
+
+
+def response_validator(headers) -> Optional[str]:
+    """ETag or Last-Modified of a response, which changes whenever the page does; None if the server sends neither."""
+    if headers.get('ETag'):
+        return f"etag:{headers['ETag']}"
+    if headers.get('Last-Modified'):
+        return f"modified:{headers['Last-Modified']}"
+    return None
+
+
+class PageCache:
+    def __init__(self, path: Optional[str] = None, ttl: float = PAGE_CACHE_TTL,
+                 max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        """
+        Shared cache of crawled pages so every URL is downloaded at most once while it is fresh.
+
+        Each entry keeps the raw HTML and the extracted text, so the crawler that
+        discovers links and the tools that index content can share one download.
+        Entries older than ttl seconds are fetched again, and the least recently
+        used entries are evicted once the cache holds more than max_bytes. With a
+        path, pages saved by earlier runs are read from that block store one at a
+        time as they are requested.
+        """
+        self.pages: Dict[str, Dict] = OrderedDict()
+        self.fetch_counts = Counter()
+        self.stats = Counter()
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.RLock()
+        self._disk = block_store.BlockReader(path) if path and os.path.exists(path) else None
+
+    def _fresh(self, page: Dict) -> bool:
+        return not self.ttl or time.time() - page.get('fetched_at', 0) < self.ttl
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached page for a URL, or None if it was never fetched or has expired."""
+        with self._lock:
+            page = self.pages.get(url)
+            if page is None and self._disk is not None:
+                page = self._disk.get(url)
+                if page is not None:
+                    self._insert(url, page)
+            if page is None:
+                return None
+            if not self._fresh(page):
+                self._remove(url)
+                self.stats['expired'] += 1
+                return None
+            self.pages.move_to_end(url)
+            return page
+
+    def put(self, url: str, html: str, status_code: int = 200, text: Optional[str] = None,
+            extract: bool = True, validator: Optional[str] = None) -> Dict:
+        """Store a page, extracting its text unless it was provided or extract is False."""
+        if text is None and extract:
+            text = extract_text(html)
+        page = {
+            'url': url,
+            'status_code': status_code,
+            'html': html,
+            'text': text,
+            'validator': validator,
+            'fetched_at': time.time()
+        }
+        with self._lock:
+            self._insert(url, page)
+        return page
+
+    def set_text(self, url: str, text: str):
+        """Fill in the text of a page stored with extract=False, in memory or only on disk so far."""
+        with self._lock:
+            page = self.pages.get(url)
+            if page is None:
+                page = self._disk.get(url) if self._disk is not None else None
+                if page is not None:
+                    # Records read from disk may be shared with the reader's block cache
+                    self._insert(url, dict(page, text=text))
+                return
+            self.bytes -= _page_size(page)
+            page['text'] = text
+            self.bytes += _page_size(page)
+            self._evict(keep=url)
+
+    def _insert(self, url: str, page: Dict):
+        if url in self.pages:
+            self._remove(url)
+        self.pages[url] = page
+        self.bytes += _page_size(page)
+        self._evict(keep=url)
+
+    def _remove(self, url: str):
+        self.bytes -= _page_size(self.pages.pop(url))
+
+    def _evict(self, keep: str):
+        # Never evict the page being stored, even if it alone exceeds the limit
+        while self.max_bytes and self.bytes > self.max_bytes and len(self.pages) > 1:
+            oldest = next(iter(self.pages))
+            if oldest == keep:
+                self.pages.move_to_end(keep)
+                continue
+            self._remove(oldest)
+            self.stats['evicted'] += 1
+
+    def fetch(self, url: str, timeout: int = 10, extract: bool = True, scope=None) -> Dict:
+        """
+        Fetch a page through the cache.
+
+        Args:
+            url (str): Page URL.
+            timeout (int): Request timeout in seconds.
+            extract (bool): Extract the text now; pass False when a parse pool
+                will extract it from the raw HTML instead.
+            scope (CrawlScope): Downloads through the crawl's scope checks and byte budget.
+
+        Returns:
+            dict: Cached page with url, status_code, html, text and validator.
+        """
+        page = self.get(url)
+        if page is not None:
+            telemetry.add("agentic.cache_hits", source="page_cache")
+            return page
+
+        return self._download(url, timeout, extract, scope)
+
+    def refresh(self, url: str, timeout: int = 10) -> Dict:
+        """Download a page again, replacing any cached copy however fresh it is."""
+        return self._download(url, timeout, extract=True)
+
+    def _download(self, url: str, timeout: int, extract: bool, scope=None) -> Dict:
+        with self._lock:
+            self.fetch_counts[url] += 1
+        if scope is not None:
+            status_code, html, headers = scope.download(url, timeout)
+        else:
+            response = http_client.get(url, timeout=timeout)
+            status_code, html, headers = response.status_code, response.text, response.headers
+        validator = response_validator(headers)
+        if not extract:
+            return self.put(url, html, status_code, extract=False, validator=validator)
+        with telemetry.span("parse", url=url):
+            return self.put(url, html, status_code, validator=validator)
+
+    def clear(self):
+        """Drop all cached pages, e.g. before refreshing a long-running process."""
+        with self._lock:
+            self.pages.clear()
+            self.fetch_counts.clear()
+            self.stats.clear()
+            self.bytes = 0
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def save(self, path: Optional[str] = None):
+        """Write every fresh page, including those only on disk so far, to a block store."""
+        path = path or self.path
+        if not path:
+            return
+        # Held throughout, so no fetch changes the pages or swaps the disk store mid-write
+        with self._lock:
+            memory_pages = [(url, page) for url, page in self.pages.items() if self._fresh(page)]
+            disk_pages = (
+                (url, page) for url, page in self._disk.items()
+                if url not in self.pages and self._fresh(page)
+            ) if self._disk is not None else ()
+            block_store.write_records(path, chain(memory_pages, disk_pages))
+            if self._disk is not None:
+                self._disk.close()
+            self._disk = block_store.BlockReader(path)
+
+    def refetched_urls(self) -> Dict[str, int]:
+        """URLs that were downloaded more than once; empty when fetch-once holds."""
+        return {url: count for url, count in self.fetch_counts.items() if count > 1}
+
+    def total_fetches(self) -> int:
+        """Number of HTTP downloads performed through this cache."""
+        return sum(self.fetch_counts.values())
+
+    def report(self):
+        """Print fetch counters so a run can confirm each URL was fetched once."""
+        refetched = self.refetched_urls()
+        print(
+            f"Page cache: {len(self.pages)} pages ({self.bytes:,} chars), {self.total_fetches()} fetches, "
+            f"{self.stats['evicted']} evicted, {self.stats['expired']} expired"
+        )
+        if refetched:
+            print(f"Warning: {len(refetched)} URLs were fetched more than once: {refetched}")
+
+
+def extract_text(html: str) -> str:
+    """Extract readable text from an HTML page."""
+    soup = BeautifulSoup(html, "html.parser")
+    main_content = (
+        soup.find('article') or
+        soup.find('main') or
+        soup.find('div', class_='content') or
+        soup.find('div', class_='document') or
+        soup.body or
+        soup
+    )
+    return main_content.get_text('\n', strip=True)
+
+
+# Process-wide cache shared by the crawlers and indexing tools
+page_cache = PageCache(PAGE_CACHE_PATH)
+if PAGE_CACHE_PATH:
+    atexit.register(page_cache.save)
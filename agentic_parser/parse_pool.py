@@ -0,0 +1,227 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Number of parser processes; 0 or 1 keeps parsing in the crawling process
+PARSE_WORKERS = int(os.getenv("AGENTIC_PARSE_WORKERS", "0"))
+PARSE_BATCH_SIZE = int(os.getenv("AGENTIC_PARSE_BATCH_SIZE", "8"))
+
+
+def extract_content(soup: BeautifulSoup) -> Dict:
+    """Extract title, main text and h1-h3 sections from a parsed page."""
+    main_content = (
+        soup.find('article') or
+        soup.find('main') or
+        soup.find('div', class_='content') or
+        soup.find('div', class_='document')
+    )
+
+    sections = []
+    if main_content:
+        for header in main_content.find_all(['h1', 'h2', 'h3']):
+            sections.append({
+                'level': int(header.name[1]),
+                'text': header.get_text(strip=True)
+            })
+
+    return {
+        'title': soup.title.string if soup.title else '',
+        'content': main_content.get_text('\n', strip=True) if main_content else '',
+        'metadata': {
+            'sections': sections
+        }
+    }
+
+
+def find_doc_links(soup: BeautifulSoup, current_url: str, base_url: str) -> List[str]:
+    """Find links under base_url, skipping in-page anchors."""
+    links = []
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        # Drop the fragment so page.html#section is not crawled as a separate page
+        full_url = urldefrag(urljoin(current_url, href))[0]
+        if full_url.startswith(base_url) and not href.startswith('#') and full_url not in links:
+            links.append(full_url)
+    return links
+
+
+def extract_page(url: str, html: str, base_url: str) -> Dict:
+    """
+    Parse one raw page into a compact record.
+
+    Only the record crosses the process boundary, never the BeautifulSoup tree.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    content = extract_content(soup)
+    return {
+        'url': url,
+        'title': content['title'],
+        'content': content['content'],
+        'links': find_doc_links(soup, url, base_url),
+        'metadata': content['metadata']
+    }
+
+
+def parse_batch(batch: List[Tuple[str, str]], base_url: str) -> List[Dict]:
+    """Parse a batch of (url, html) pairs; batching amortises the IPC round-trip."""
+    records = []
+    for url, html in batch:
+        try:
+            records.append(extract_page(url, html, base_url))
+        except Exception as e:
+            records.append({'url': url, 'error': f'Failed to parse {url}: {str(e)}'})
+    return records
+
+
+class ParsePool:
+    def __init__(self, base_url: str, workers: Optional[int] = None, batch_size: int = PARSE_BATCH_SIZE,
+                 max_pending_batches: Optional[int] = None):
+        """
+        Process pool that turns raw HTML into extracted page records.
+
+        Workers are started from a forkserver (spawned on platforms without
+        one), never forked from the crawling process: that process runs fetch
+        threads and holds HTTP session and telemetry locks, which a forked child
+        could inherit in a locked state. Workers only receive (url, html) pairs
+        and import this module, but like any non-fork start method they also
+        re-import the main script, so start crawls under
+        `if __name__ == "__main__":`.
+
+        Args:
+            base_url (str): Only links under this URL are kept in each record.
+            workers (int): Number of parser processes (defaults to the CPU count).
+            batch_size (int): Pages sent to a worker per task.
+            max_pending_batches (int): Batches allowed in flight before submit blocks
+                (defaults to twice the worker count).
+        """
+        self.base_url = base_url
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches or self.workers * 2
+        self._executor = None
+
+    def __enter__(self):
+        import multiprocessing
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+            # The server imports the parser once; each worker is forked from it
+            context.set_forkserver_preload(['parse_pool'])
+        else:
+            context = multiprocessing.get_context('spawn')
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+
+    def submit(self, batch: List[Tuple[str, str]]):
+        """Submit one batch and return its future."""
+        return self._executor.submit(parse_batch, batch, self.base_url)
+
+    def imap(self, pages: Iterable[Tuple[str, str]]) -> Iterator[Dict]:
+        """
+        Parse (url, html) pairs, yielding records as batches complete.
+
+        Input is pulled lazily and no more than max_pending_batches are queued,
+        so a fast producer is held back instead of buffering every page.
+        """
+        pending = set()
+        batch = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) < self.batch_size:
+                continue
+            pending.add(self.submit(batch))
+            batch = []
+            while len(pending) >= self.max_pending_batches:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        if batch:
+            pending.add(self.submit(batch))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def crawl_with_pool(start_url: str, base_url: str, fetch: Callable[[str], Dict], fetch_workers: int = 16,
+                    parse_workers: Optional[int] = None, batch_size: int = PARSE_BATCH_SIZE,
+                    skip: Callable[[str], bool] = lambda url: False, scope=None) -> Iterator[Dict]:
+    """
+    Crawl a site breadth-first with threaded fetching and process-pool parsing.
+
+    Fetched pages are grouped into batches for the parse pool, and fetching pauses
+    while the parse backlog is full. Links from parsed records feed the frontier.
+
+    Args:
+        start_url (str): First page to crawl.
+        base_url (str): Only links under this URL are followed.
+        fetch (Callable): Returns a page dict with status_code and html for a URL.
+        fetch_workers (int): Concurrent fetches.
+        parse_workers (int): Parser processes (defaults to the CPU count).
+        batch_size (int): Pages per parse task.
+        skip (Callable): Returns True for URLs that were already crawled.
+        scope (CrawlScope): Depth limit and URL rules for links; the crawl stops
+            scheduling fetches once its budget is used up.
+
+    Yields:
+        dict: Extracted page record, or {'url', 'error'} for pages that failed.
+    """
+    frontier = deque([start_url])
+    seen = {start_url}
+    depths = {start_url: 0}
+    fetching = {}
+    parsing = set()
+    batch = []
+
+    with ParsePool(base_url, parse_workers, batch_size) as pool, \
+            ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+        while frontier or fetching or parsing or batch:
+            if scope is not None and scope.exhausted:
+                frontier.clear()
+
+            # Back-pressure: stop fetching while the parse backlog is full
+            while frontier and len(fetching) < fetch_workers and len(parsing) < pool.max_pending_batches:
+                url = frontier.popleft()
+                if skip(url) or (scope is not None and not scope.allows(url, depths[url])):
+                    continue
+                fetching[fetch_pool.submit(fetch, url)] = url
+
+            # Flush a partial batch when nothing else will fill it
+            if batch and (len(batch) >= batch_size or not fetching):
+                parsing.add(pool.submit(batch))
+                batch = []
+
+            if not fetching and not parsing:
+                continue
+
+            done, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    url = fetching.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        yield {'url': url, 'error': f'Failed to crawl {url}: {str(e)}'}
+                        continue
+                    if page['status_code'] == 200:
+                        batch.append((url, page['html']))
+                    else:
+                        yield {'url': url, 'error': f'Failed to crawl {url}: HTTP {page["status_code"]}'}
+                else:
+                    parsing.discard(future)
+                    for record in future.result():
+                        for link in record.get('links', []):
+                            if link not in seen:
+                                seen.add(link)
+                                depths[link] = depths[record['url']] + 1
+                                frontier.append(link)
+                        yield record
@@ -0,0 +1,218 @@
+import hashlib
+import os
+import queue
+import threading
+from typing import Dict, Iterable, Iterator
+from dotenv import load_dotenv
+from document_source import to_content_dict
+from markdown_ast import parsed_markdown, section_at
+from near_duplicates import NEAR_DUP_THRESHOLD, NearDuplicateFilter
+
+load_dotenv()
+
+# Drop unreadable, identical and near-duplicate files when collecting markdown; off keeps every file
+DEDUP_DOCUMENTS = os.getenv("AGENTIC_DEDUP_DOCUMENTS", "").lower() in ("1", "true")
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+
+_DONE = object()
+
+
+def prefetch(documents: Iterable[Dict], max_buffered: int = 16) -> Iterator[Dict]:
+    """
+    Pull documents from a source on a background thread.
+
+    Fetching continues while the caller processes earlier documents, and at most
+    max_buffered documents are held in memory at once. Errors raised by the
+    source are re-raised in the caller.
+
+    Args:
+        documents (Iterable[Dict]): Any document source generator.
+        max_buffered (int): Maximum number of documents waiting to be consumed.
+    """
+    buffer = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Wait for room, but give up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for document in documents:
+                if not put(document):
+                    return
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Let the producer exit if the consumer stopped early
+        stop.set()
+
+
+def skip_errors(documents: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop documents that could not be read, logging each one."""
+    for document in documents:
+        if document.get('error'):
+            print(f"Skipping {document['path']}: {document['error']}")
+            continue
+        yield document
+
+
+def dedup_documents(documents: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop documents whose content is byte-identical to one already seen."""
+    seen = set()
+    for document in documents:
+        digest = hashlib.sha256(document['content'].encode('utf-8')).digest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        yield document
+
+
+def near_dedup_documents(documents: Iterable[Dict], threshold: float = NEAR_DUP_THRESHOLD) -> Iterator[Dict]:
+    """
+    Drop documents that are near-duplicates of one already seen.
+
+    Catches pages that differ only in navigation, version banners or small edits,
+    such as the same page under /en/latest/ and /en/stable/, which exact hashing
+    misses. The first document of each cluster is kept.
+
+    Args:
+        documents (Iterable[Dict]): Documents from any source.
+        threshold (float): Estimated Jaccard similarity to count as a duplicate; 0 disables.
+    """
+    if threshold <= 0:
+        yield from documents
+        return
+    detector = NearDuplicateFilter(threshold)
+    for document in documents:
+        representative = detector.check(document['path'], document['content'])
+        if representative:
+            print(f"Skipping {document['path']}: near-duplicate of {representative}")
+            continue
+        yield document
+
+
+def chunk_documents(documents: Iterable[Dict], chunk_size: int = 2000, overlap: int = 200) -> Iterator[Dict]:
+    """
+    Split documents into overlapping character chunks, preferring section and paragraph breaks.
+
+    Markdown documents are split at headings where possible, using the cached
+    parse from markdown_ast, which also supplies their title when the source
+    did not.
+
+    Args:
+        documents (Iterable[Dict]): Documents from any source.
+        chunk_size (int): Maximum characters per chunk.
+        overlap (int): Characters repeated at the start of the next chunk.
+
+    Yields:
+        dict: Chunk with the parent document's source, path and title plus
+        chunk_index, content and section (the heading the chunk starts under,
+        None for non-markdown documents).
+    """
+    for document in documents:
+        content = document['content']
+        parsed = parsed_markdown(content) if document['path'].lower().endswith(MARKDOWN_EXTENSIONS) else None
+        title = document['title'] or (parsed and parsed['title'])
+        heading_offsets = [heading['offset'] for heading in parsed['headings']] if parsed else []
+        start = 0
+        index = 0
+        while start < len(content):
+            end = min(start + chunk_size, len(content))
+            if end < len(content):
+                # Break at the last heading in the second half of the window, else at
+                # the last paragraph or line boundary inside it
+                boundary = max((offset for offset in heading_offsets if (start + end) // 2 < offset < end), default=-1)
+                if boundary < 0:
+                    boundary = max(content.rfind('\n\n', start, end), content.rfind('\n', start, end))
+                if boundary > start + overlap:
+                    end = boundary
+            yield {
+                'source': document['source'],
+                'path': document['path'],
+                'title': title,
+                'chunk_index': index,
+                'content': content[start:end],
+                'section': section_at(parsed, start) if parsed else None
+            }
+            index += 1
+            if end >= len(content):
+                break
+            start = max(end - overlap, start + 1)
+
+
+def embed_chunks(chunks: Iterable[Dict], service=None, window: int = 512) -> Iterator[Dict]:
+    """
+    Attach an embedding to each chunk, embedding `window` chunks at a time.
+
+    Each window is split into batches and embedded concurrently by the embedding
+    service, so throughput is not limited to one request per chunk while memory
+    stays bounded for long streams.
+
+    Args:
+        chunks (Iterable[Dict]): Chunks from chunk_documents.
+        service (EmbeddingService): Defaults to the process-wide service.
+        window (int): Chunks collected before they are sent for embedding.
+
+    Yields:
+        dict: The chunk with an 'embedding' vector added.
+    """
+    from embedding_service import get_service
+
+    service = service or get_service()
+    pending = []
+    for chunk in chunks:
+        pending.append(chunk)
+        if len(pending) >= window:
+            yield from _embed_window(pending, service)
+            pending = []
+    if pending:
+        yield from _embed_window(pending, service)
+
+
+def _embed_window(chunks, service) -> Iterator[Dict]:
+    vectors = service.embed([chunk['content'] for chunk in chunks])
+    for chunk, vector in zip(chunks, vectors):
+        yield dict(chunk, embedding=vector)
+
+
+def collect_content(documents: Iterable[Dict], max_buffered: int = 16,
+                    dedup: bool = DEDUP_DOCUMENTS) -> Dict[str, str]:
+    """
+    Read documents from a source into the {name: content} dict the crews use.
+
+    The crews take the whole dict, so this returns only once every document
+    has been read; the source is fetched on a background thread so reading
+    overlaps with the checks below. By default every file is kept, including
+    "Error reading file" entries, as the entry scripts always did. With dedup,
+    unreadable, identical and near-duplicate documents are dropped as they arrive.
+
+    Args:
+        documents (Iterable[Dict]): Any document source generator.
+        max_buffered (int): Maximum number of fetched documents waiting to be checked.
+        dedup (bool): Drop unreadable and duplicate documents.
+    """
+    documents = prefetch(documents, max_buffered)
+    if dedup:
+        documents = near_dedup_documents(dedup_documents(skip_errors(documents)))
+    return to_content_dict(documents)
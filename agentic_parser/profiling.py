@@ -0,0 +1,192 @@
+import cProfile
+import json
+import os
+import time
+from collections import defaultdict
+from dotenv import load_dotenv
+from output_dir import output_path
+import telemetry
+
+load_dotenv()
+
+# Profiling is off unless AGENTIC_PROFILE is set; AGENTIC_PROFILE=cprofile also captures a cProfile dump
+PROFILE_MODE = os.getenv("AGENTIC_PROFILE", "").lower()
+PROFILE_DIR = os.getenv("AGENTIC_PROFILE_DIR") or output_path("profile")
+
+enabled = PROFILE_MODE in ("1", "true", "cprofile")
+
+
+def _token_summary(agent) -> dict:
+    """Read the token counters crewai keeps for each agent."""
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is None:
+        return {'prompt_tokens': 0, 'completion_tokens': 0, 'llm_calls': 0}
+    usage = token_process.get_summary()
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        'llm_calls': usage.successful_requests
+    }
+
+
+class CrewProfiler:
+    def __init__(self, crew):
+        """
+        Collect wall time, LLM calls, tokens and tool time per task and per agent.
+
+        Args:
+            crew (Crew): The crew to profile. Its tools and task callback are
+                wrapped for the duration of one kickoff.
+        """
+        self.crew = crew
+        self.tasks = []
+        self.tool_stats = defaultdict(lambda: {'tool_calls': 0, 'tool_time': 0.0})
+        self._wrapped_tools = []
+        self._task_start = None
+        self._token_snapshot = {}
+
+    def _wrap_tool(self, role: str, tool):
+        if any(wrapped is tool for wrapped in self._wrapped_tools):
+            return
+        original_run = tool._run
+        stats = self.tool_stats
+
+        def timed_run(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original_run(*args, **kwargs)
+            finally:
+                stats[role]['tool_calls'] += 1
+                stats[role]['tool_time'] += time.perf_counter() - start
+
+        # Tools are pydantic models, so bypass their attribute validation
+        object.__setattr__(tool, '_run', timed_run)
+        self._wrapped_tools.append(tool)
+
+    def _snapshot_tokens(self):
+        self._token_snapshot = {agent.role: _token_summary(agent) for agent in self.crew.agents}
+
+    def _on_task_complete(self, output):
+        now = time.perf_counter()
+        role = str(output.agent)
+        agent = next((a for a in self.crew.agents if a.role == role), None)
+        before = self._token_snapshot.get(role, {'prompt_tokens': 0, 'completion_tokens': 0, 'llm_calls': 0})
+        after = _token_summary(agent) if agent else before
+        tools = self.tool_stats.pop(role, {'tool_calls': 0, 'tool_time': 0.0})
+
+        self.tasks.append({
+            'task': ' '.join(output.description.split())[:60],
+            'agent': role,
+            'wall_time': now - self._task_start,
+            'llm_calls': after['llm_calls'] - before['llm_calls'],
+            'prompt_tokens': after['prompt_tokens'] - before['prompt_tokens'],
+            'completion_tokens': after['completion_tokens'] - before['completion_tokens'],
+            'tool_calls': tools['tool_calls'],
+            'tool_time': tools['tool_time']
+        })
+        self._task_start = now
+        self._snapshot_tokens()
+
+    def run(self, inputs: dict):
+        """Kick off the crew and return its result while recording per-task numbers."""
+        for agent in self.crew.agents:
+            for tool in agent.tools or []:
+                self._wrap_tool(agent.role, tool)
+        for task in self.crew.tasks:
+            for tool in task.tools or []:
+                self._wrap_tool(task.agent.role, tool)
+
+        previous_callback = self.crew.task_callback
+
+        def task_callback(output):
+            self._on_task_complete(output)
+            if previous_callback:
+                previous_callback(output)
+
+        self.crew.task_callback = task_callback
+        self._snapshot_tokens()
+        start = self._task_start = time.perf_counter()
+        try:
+            result = telemetry.kickoff(self.crew, inputs)
+        finally:
+            self.total_wall_time = time.perf_counter() - start
+            self.crew.task_callback = previous_callback
+            for tool in self._wrapped_tools:
+                del tool.__dict__['_run']
+        return result
+
+    def report(self) -> dict:
+        """Build the machine-readable report with per-task and per-agent totals."""
+        agents = {}
+        for task in self.tasks:
+            totals = agents.setdefault(task['agent'], {
+                'tasks': 0, 'wall_time': 0.0, 'llm_calls': 0, 'prompt_tokens': 0,
+                'completion_tokens': 0, 'tool_calls': 0, 'tool_time': 0.0
+            })
+            totals['tasks'] += 1
+            for key in ('wall_time', 'llm_calls', 'prompt_tokens', 'completion_tokens', 'tool_calls', 'tool_time'):
+                totals[key] += task[key]
+        return {
+            'total_wall_time': self.total_wall_time,
+            'tasks': self.tasks,
+            'agents': agents
+        }
+
+
+def print_report(report: dict):
+    """Print the per-task summary table."""
+    header = f"{'Task':<62}{'Agent':<24}{'Wall s':>9}{'LLM':>6}{'Prompt':>9}{'Compl.':>9}{'Tools':>7}{'Tool s':>9}"
+    print("\nProfiling report")
+    print(header)
+    print('-' * len(header))
+    for task in report['tasks']:
+        print(
+            f"{task['task']:<62}{task['agent'][:23]:<24}{task['wall_time']:>9.2f}{task['llm_calls']:>6}"
+            f"{task['prompt_tokens']:>9}{task['completion_tokens']:>9}{task['tool_calls']:>7}{task['tool_time']:>9.2f}"
+        )
+    print('-' * len(header))
+    print(f"Total wall time: {report['total_wall_time']:.2f}s")
+
+
+def kickoff(crew, inputs: dict):
+    """
+    Run the crew, profiling it when AGENTIC_PROFILE is set.
+
+    Writes profile_report.json (and crew.prof with AGENTIC_PROFILE=cprofile, readable
+    by snakeviz or flameprof) to AGENTIC_PROFILE_DIR and prints a summary table.
+
+    Args:
+        crew (Crew): The configured crew.
+        inputs (dict): Inputs interpolated into the task descriptions.
+
+    Returns:
+        CrewOutput: The crew result, unchanged.
+    """
+    if not enabled:
+        return telemetry.kickoff(crew, inputs)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler = CrewProfiler(crew)
+    python_profile = cProfile.Profile() if PROFILE_MODE == "cprofile" else None
+
+    if python_profile:
+        python_profile.enable()
+    try:
+        result = profiler.run(inputs)
+    finally:
+        if python_profile:
+            python_profile.disable()
+
+    report = profiler.report()
+    if python_profile:
+        profile_path = os.path.join(PROFILE_DIR, 'crew.prof')
+        python_profile.dump_stats(profile_path)
+        report['cprofile'] = profile_path
+
+    report_path = os.path.join(PROFILE_DIR, 'profile_report.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"Profile report saved to: {report_path}")
+    return result
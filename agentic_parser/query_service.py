@@ -0,0 +1,426 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+import numpy as np
+from crewai import Agent
+from dotenv import load_dotenv
+from chunk_index import RETRIEVAL_PASSAGES, ChunkIndex, render_passages
+from embedding_service import crew_embedder_config, embedder_id, get_service
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from corpus_snapshot import SNAPSHOT_DIR, directory_version, open_snapshot, versions_version, write_snapshot
+from document_source import iter_git_markdown, iter_github_markdown, iter_local_markdown
+from documentation_tool import EnhancedDocumentationTool
+from fast_path import build_doc_context, build_fast_crew, build_link_graph, markdown_content_store
+from page_cache import page_cache
+from pipeline import chunk_documents, collect_content, embed_chunks
+import profiling
+import source_versions
+from streaming import StreamStats, stream_answer
+from summaries import current_summaries, load_summaries, render_summaries, summary_store_path
+
+load_dotenv()
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Corpus to serve: "local" (markdown folder), "git" (local repository), "github" (API repo URL) or "web" (documentation site)
+SOURCE = os.getenv("AGENTIC_SOURCE", "local")
+DEFAULT_SOURCE_PATHS = {
+    "local": os.path.join(SCRIPT_DIR, "docs"),
+    "git": os.path.dirname(SCRIPT_DIR),
+    "github": os.getenv("GITHUB_REPO_BASE"),
+    "web": "https://documentation-using-ai-agent.readthedocs.io/en/latest/"
+}
+SOURCE_PATH = os.getenv("AGENTIC_SOURCE_PATH") or DEFAULT_SOURCE_PATHS.get(SOURCE)
+# Maximum crews talking to the LLM at the same time
+LLM_CONCURRENCY = int(os.getenv("AGENTIC_LLM_CONCURRENCY", "4"))
+# Seconds between background corpus refreshes; 0 disables refreshing
+REFRESH_SECONDS = int(os.getenv("AGENTIC_REFRESH_SECONDS", "3600"))
+# Seconds a stream waits for the next token before checking whether the client went away
+DISCONNECT_POLL_SECONDS = 1.0
+# Embed the corpus chunks at build time for vector retrieval; with 0 retrieval is lexical only
+SNAPSHOT_VECTORS = os.getenv("AGENTIC_SNAPSHOT_VECTORS", "1") == "1"
+
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
+
+
+def build_user_assistant() -> Agent:
+    """Create a fresh assistant agent so concurrent requests share no agent state."""
+    return Agent(
+        role="Documentation Guide",
+        goal="Help users understand and apply documentation effectively.",
+        backstory="""You are an expert technical assistant who helps users navigate and understand documentation.
+        You can break down complex problems into step-by-step solutions and provide clear, actionable guidance.""",
+        verbose=False,
+        memory=False,
+        llm="gemini/gemini-1.5-flash-latest"
+    )
+
+
+def load_content_store() -> Dict[str, Dict]:
+    """Fetch the configured corpus and structure it the way the fast path expects."""
+    if SOURCE == "local":
+        return markdown_content_store(collect_content(iter_local_markdown(SOURCE_PATH)))
+    if SOURCE == "git":
+        return markdown_content_store(collect_content(iter_git_markdown(SOURCE_PATH)))
+    if SOURCE == "github":
+        return markdown_content_store(collect_content(iter_github_markdown(SOURCE_PATH)))
+    if SOURCE == "web":
+        # Start from an empty cache so a refresh sees updated pages
+        page_cache.clear()
+        tool = EnhancedDocumentationTool(SOURCE_PATH)
+        tool.collect(SOURCE_PATH)
+        return tool.content_store
+    raise ValueError(f"Unknown AGENTIC_SOURCE: {SOURCE}")
+
+
+def source_version(documents: Iterable[str] = ()) -> Optional[str]:
+    """
+    Version of the configured source, computed without building the corpus.
+
+    A local folder is hashed directly. Repositories are versioned from the blob
+    SHAs of their markdown files and sites from the ETag or Last-Modified of
+    `documents`, the pages of the last build (see source_versions), so a site
+    is seen as changed once a page that links to a new page changes.
+
+    Returns:
+        str: The version, or None if the versions could not be read cheaply.
+    """
+    extra_files = [summary_store_path(SOURCE_PATH)]
+    if SOURCE == "local":
+        return directory_version(SOURCE_PATH, extra_files=extra_files)
+    try:
+        versions = source_versions.corpus_versions(SOURCE, SOURCE_PATH, documents)
+    except Exception as e:
+        print(f"Could not read the versions of {SOURCE_PATH}: {e}")
+        return None
+    return versions_version(versions, extra_files) if versions is not None else None
+
+
+def chunk_key(chunk: Dict) -> str:
+    return hashlib.sha256(chunk['content'].encode('utf-8')).hexdigest()
+
+
+def build_index(content_store: Dict[str, Dict], previous: Optional[ChunkIndex] = None) -> ChunkIndex:
+    """
+    Chunk the corpus and index the chunks for retrieval.
+
+    With SNAPSHOT_VECTORS the chunks are also embedded through the embedding
+    service. Vectors of chunks whose text is unchanged since the previous
+    index are reused, so a rebuild only embeds new and edited chunks. If
+    embedding fails the index is built without vectors.
+
+    Args:
+        content_store (dict): Page id mapped to title and content.
+        previous (ChunkIndex): Index of the last snapshot, even an outdated one.
+
+    Returns:
+        ChunkIndex: Index over the chunks, held in memory.
+    """
+    chunks = list(chunk_documents(
+        {'source': SOURCE, 'path': page_id, 'title': page.get('title'), 'content': page['content']}
+        for page_id, page in content_store.items() if 'error' not in page
+    ))
+    if not SNAPSHOT_VECTORS:
+        return ChunkIndex.build(chunks)
+
+    model = embedder_id()
+    known: Dict[str, np.ndarray] = {}
+    if previous is not None and previous.vectors is not None and previous.vector_model == model:
+        for row in range(previous.size):
+            known[chunk_key(previous.chunks.get(str(row)))] = previous.vectors[row]
+    missing = [chunk for chunk in chunks if chunk_key(chunk) not in known]
+    try:
+        for chunk in embed_chunks(missing):
+            known[chunk_key(chunk)] = np.asarray(chunk.pop('embedding'), dtype=np.float32)
+    except Exception as e:
+        print(f"Could not embed the corpus chunks, retrieval is lexical only: {e}")
+        return ChunkIndex.build(chunks)
+    print(f"Embedded {len(missing)} chunks, reused the vectors of {len(chunks) - len(missing)} unchanged ones")
+    vectors = np.stack([known[chunk_key(chunk)] for chunk in chunks]) if chunks else None
+    return ChunkIndex.build(chunks, vectors, model)
+
+
+def build_corpus() -> Dict:
+    """
+    Build the immutable corpus snapshot that queries read from.
+
+    The built state is also written to disk (see corpus_snapshot) so the next
+    process start can restore it with load_corpus instead of rebuilding.
+
+    Returns:
+        dict: version (content hash), pages, built_at, the rendered doc_context
+        and the chunk index.
+    """
+    start = time.perf_counter()
+    # Read before the build, so a document edited during it counts as changed
+    version = source_version() if SOURCE != "web" else None
+    content_store = load_content_store()
+    documents: Optional[List[str]] = None
+    if SOURCE == "web":
+        # Versioned from the pages just cached, so this sends no requests
+        documents = sorted(page_id for page_id, page in content_store.items() if 'error' not in page)
+        version = source_version(documents)
+    context = [build_doc_context(content_store)]
+    summaries = current_summaries(load_summaries(summary_store_path(SOURCE_PATH)), {
+        page_id: page['content'] for page_id, page in content_store.items() if 'error' not in page
+    })
+    if summaries:
+        context.insert(0, render_summaries(summaries))
+    doc_context = "\n\n".join(context)
+    previous = open_snapshot(SOURCE_PATH)
+    index = build_index(content_store, previous.index if previous else None)
+    if previous is not None:
+        previous.close()
+
+    corpus = {
+        'version': hashlib.sha256(doc_context.encode('utf-8')).hexdigest()[:16],
+        'pages': len(content_store),
+        'built_at': datetime.now().isoformat(),
+        'build_seconds': time.perf_counter() - start,
+        'doc_context': doc_context,
+        'index': index
+    }
+    print(f"Corpus {corpus['version']} built: {corpus['pages']} pages, {index.size} chunks "
+          f"in {corpus['build_seconds']:.2f}s")
+
+    if SNAPSHOT_DIR:
+        try:
+            write_snapshot(SOURCE_PATH, corpus, content_store, build_link_graph(content_store),
+                           summaries, index, source_version=version, source_documents=documents)
+        except Exception as e:
+            # Serving does not depend on the snapshot; the next start simply rebuilds
+            print(f"Could not write corpus snapshot: {e}")
+    return corpus
+
+
+def load_corpus() -> Dict:
+    """
+    Restore the corpus from its snapshot if it is still valid, otherwise build it.
+
+    A corpus is valid while its source version (see source_version) and
+    summary store are unchanged. When the version cannot be read, e.g. GitHub
+    truncated the tree listing or the site is unreachable, the snapshot is
+    reused only while it is younger than the refresh interval.
+    """
+    start = time.perf_counter()
+    snapshot = open_snapshot(SOURCE_PATH)
+    if snapshot is not None:
+        version = source_version(snapshot.manifest.get('source_documents') or ())
+        if not snapshot.current(version, max_age=REFRESH_SECONDS):
+            snapshot = None
+    if snapshot is None:
+        return build_corpus()
+    corpus = snapshot.corpus()
+    print(f"Corpus {corpus['version']} restored from {snapshot.path}: {corpus['pages']} pages "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return corpus
+
+
+def query_context(corpus: Dict, query: str) -> str:
+    """
+    Prompt context for one query: the passages retrieved for it ahead of the rendered documentation.
+
+    A restored corpus reads its context and index from the snapshot, so the
+    first query pays for reading them rather than startup.
+    """
+    snapshot = corpus.get('snapshot')
+    doc_context = snapshot.doc_context if snapshot else corpus['doc_context']
+    index = snapshot.index if snapshot else corpus.get('index')
+    if index is None or RETRIEVAL_PASSAGES <= 0:
+        return doc_context
+    query_vector = None
+    if index.vectors is not None and index.vector_model == embedder_id():
+        try:
+            query_vector = get_service().embed([query])[0]
+        except Exception as e:
+            print(f"Could not embed the query, retrieving lexically: {e}")
+    passages = index.search(query, RETRIEVAL_PASSAGES, query_vector)
+    if not passages:
+        return doc_context
+    return f"{render_passages(passages)}\n\n{doc_context}"
+
+
+class QueryService:
+    def __init__(self):
+        """
+        Keeps the corpus warm and answers queries against it.
+
+        Each query gets its own agent and crew, but all queries read the same
+        prebuilt corpus snapshot. A refresh builds a new snapshot and swaps it in,
+        so in-flight queries keep the one they started with. Startup and
+        background refreshes restore the on-disk snapshot while it is valid.
+        """
+        self.corpus: Optional[Dict] = None
+        self.llm_slots = asyncio.Semaphore(LLM_CONCURRENCY)
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task = None
+
+    async def start(self):
+        self.corpus = await asyncio.to_thread(load_corpus)
+        if REFRESH_SECONDS > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+
+    async def refresh(self, rebuild: bool = True) -> Dict:
+        """Rebuild the corpus in a worker thread and swap it in; rebuild=False keeps a still-valid snapshot."""
+        async with self._refresh_lock:
+            self.corpus = await asyncio.to_thread(build_corpus if rebuild else load_corpus)
+        return self.corpus
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_SECONDS)
+            try:
+                await self.refresh(rebuild=False)
+            except Exception as e:
+                print(f"Corpus refresh failed, keeping version {self.corpus['version']}: {e}")
+
+    async def answer(self, query: str, user_context: str) -> Dict:
+        """Answer one query with a per-request crew under the LLM concurrency limit."""
+        corpus = self.corpus
+        crew = build_fast_crew(build_user_assistant(), embedder_config, memory=False)
+        inputs = {
+            "query": query,
+            "user_context": user_context,
+            "doc_context": await asyncio.to_thread(query_context, corpus, query)
+        }
+        start = time.perf_counter()
+        async with self.llm_slots:
+            result = await asyncio.to_thread(profiling.kickoff, crew, inputs)
+        return {
+            'answer': str(result),
+            'corpus_version': corpus['version'],
+            'elapsed_seconds': time.perf_counter() - start
+        }
+
+    async def stream(self, query: str, user_context: str,
+                     is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> AsyncIterator[str]:
+        """
+        Stream one answer as server-sent events.
+
+        Emits a "token" event per text chunk and a final "done" event with the
+        time-to-first-token and tokens/s, or an "error" event if generation fails.
+        When the client disconnects, or the response is closed, the crew is
+        stopped before the LLM slot is released, so an abandoned stream does not
+        keep generating while other requests wait.
+
+        Args:
+            is_disconnected: Coroutine function telling whether the client went away, e.g. Request.is_disconnected.
+        """
+        corpus = self.corpus
+        crew = build_fast_crew(build_user_assistant(), embedder_config, memory=False)
+        inputs = {
+            "query": query,
+            "user_context": user_context,
+            "doc_context": await asyncio.to_thread(query_context, corpus, query)
+        }
+        stats = StreamStats()
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def produce():
+            # The LLM client is blocking, so chunks are handed back to the event loop
+            try:
+                for text in stream_answer(crew, inputs, stats, stop):
+                    loop.call_soon_threadsafe(chunks.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, finished)
+
+        async with self.llm_slots:
+            producer = asyncio.create_task(asyncio.to_thread(produce))
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(chunks.get(), DISCONNECT_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        if is_disconnected is not None and await is_disconnected():
+                            return
+                        continue
+                    if item is finished:
+                        break
+                    if isinstance(item, Exception):
+                        yield f"event: error\ndata: {json.dumps({'error': str(item)})}\n\n"
+                        continue
+                    yield f"event: token\ndata: {json.dumps({'text': item})}\n\n"
+            finally:
+                # Also reached when the server closes the response after a disconnect
+                stop.set()
+                await producer
+
+        done = dict(stats.as_dict(), corpus_version=corpus['version'])
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+
+service = QueryService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await service.start()
+    yield
+    await service.stop()
+
+
+app = FastAPI(title="Documentation query service", lifespan=lifespan)
+
+
+class QueryRequest(BaseModel):
+    query: str = Field(..., description="The user's question about the documentation.")
+    user_context: str = Field("", description="Experience level, focus or other context.")
+
+
+@app.post("/query")
+async def query(request: QueryRequest):
+    if service.corpus is None:
+        raise HTTPException(status_code=503, detail="Corpus is not loaded yet")
+    return await service.answer(request.query, request.user_context)
+
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest, http_request: Request):
+    if service.corpus is None:
+        raise HTTPException(status_code=503, detail="Corpus is not loaded yet")
+    return StreamingResponse(
+        service.stream(request.query, request.user_context, http_request.is_disconnected),
+        media_type="text/event-stream"
+    )
+
+
+@app.post("/refresh")
+async def refresh():
+    corpus = await service.refresh()
+    return {'corpus_version': corpus['version'], 'pages': corpus['pages']}
+
+
+@app.get("/health")
+async def health():
+    if service.corpus is None:
+        return {'status': 'loading'}
+    return {
+        'status': 'ok',
+        'source': SOURCE,
+        'corpus_version': service.corpus['version'],
+        'pages': service.corpus['pages'],
+        'built_at': service.corpus['built_at'],
+        'restored_from_snapshot': 'snapshot' in service.corpus
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "8000")))
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+from output_dir import output_path
+
+load_dotenv()
+
+# Change history of every page visited by scheduled refreshes
+REFRESH_HISTORY_PATH = os.getenv("AGENTIC_REFRESH_HISTORY", output_path("refresh_history.json"))
+# Pages re-fetched per refresh cycle; unset re-fetches every page as before
+REFRESH_BUDGET = int(os.getenv("AGENTIC_REFRESH_BUDGET", "0")) or None
+# Change interval assumed for a page before its history says otherwise
+REFRESH_PRIOR_DAYS = float(os.getenv("AGENTIC_REFRESH_PRIOR_DAYS", "7"))
+# Visits kept per page; the change and time totals cover every visit
+REFRESH_HISTORY_VISITS = int(os.getenv("AGENTIC_REFRESH_HISTORY_VISITS", "50"))
+
+
+def content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+class RefreshScheduler:
+    def __init__(self, path: Optional[str] = REFRESH_HISTORY_PATH, prior_days: float = REFRESH_PRIOR_DAYS,
+                 max_visits: int = REFRESH_HISTORY_VISITS):
+        """
+        Decide which pages to re-fetch from how often each one has changed.
+
+        Every visit records the page's content hash. A page's change rate is
+        estimated from the changes seen over the time it has been watched,
+        corrected for changes hidden between visits and pulled towards one
+        change per prior_days while the history is short. The chance a page
+        changed since its last visit is then 1 - exp(-rate * elapsed), and each
+        cycle spends its fetch budget on the pages with the highest chance.
+
+        Args:
+            path (str): JSON file the history is loaded from and saved to; None keeps it in memory.
+            prior_days (float): Change interval assumed for a page without history.
+            max_visits (int): Visits kept per page in the history list.
+        """
+        self.path = path
+        self.prior_seconds = prior_days * 86400
+        self.max_visits = max_visits
+        self.pages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.pages = json.load(f)
+
+    def record(self, url: str, content: str, visited_at: Optional[float] = None) -> bool:
+        """
+        Record one visit to a page.
+
+        Returns:
+            bool: Whether the content changed since the previous visit.
+        """
+        visited_at = time.time() if visited_at is None else visited_at
+        digest = content_digest(content)
+        with self._lock:
+            page = self.pages.get(url)
+            if page is None:
+                self.pages[url] = {
+                    'hash': digest,
+                    'first_visit': visited_at,
+                    'last_visit': visited_at,
+                    'last_change': visited_at,
+                    'intervals': 0,
+                    'changes': 0,
+                    'visits': [[visited_at, digest]]
+                }
+                return False
+            changed = digest != page['hash']
+            page['intervals'] += 1
+            page['changes'] += changed
+            page['hash'] = digest
+            page['last_visit'] = visited_at
+            if changed:
+                page['last_change'] = visited_at
+            page['visits'] = (page['visits'] + [[visited_at, digest]])[-self.max_visits:]
+            return changed
+
+    def change_rate(self, url: str) -> float:
+        """Estimated changes per second of a page."""
+        page = self.pages.get(url)
+        if page is None:
+            return 1 / self.prior_seconds
+        intervals, changes = page['intervals'], page['changes']
+        # A visit only shows whether the page changed, not how often, so correct
+        # the count for several changes falling between two visits
+        if intervals:
+            changes = -intervals * math.log((intervals - changes + 0.5) / (intervals + 0.5))
+        watched = page['last_visit'] - page['first_visit']
+        return (changes + 1) / (watched + self.prior_seconds)
+
+    def stale_probability(self, url: str, now: Optional[float] = None) -> float:
+        """Probability that a page changed since it was last visited; 1 for pages never visited."""
+        page = self.pages.get(url)
+        if page is None:
+            return 1.0
+        elapsed = max((time.time() if now is None else now) - page['last_visit'], 0.0)
+        return 1 - math.exp(-self.change_rate(url) * elapsed)
+
+    def plan(self, urls: Iterable[str], budget: Optional[int], now: Optional[float] = None) -> List[str]:
+        """
+        Pick the pages to re-fetch this cycle, most likely stale first.
+
+        Args:
+            urls (Iterable[str]): Every page that should be kept fresh.
+            budget (int): Pages to fetch; None fetches them all.
+            now (float): Time of the cycle, defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        ranked = sorted(
+            dict.fromkeys(urls),
+            key=lambda url: (-self.stale_probability(url, now), self.pages.get(url, {}).get('last_visit', 0))
+        )
+        return ranked if budget is None else ranked[:budget]
+
+    def expected_stale(self, urls: Iterable[str], now: Optional[float] = None) -> float:
+        """Expected number of pages whose stored copy is out of date."""
+        return sum(self.stale_probability(url, now) for url in urls)
+
+    def refresh(self, urls: Iterable[str], fetch: Callable[[str], Dict], budget: Optional[int] = REFRESH_BUDGET,
+                now: Optional[float] = None, fetched: Optional[Dict[str, Dict]] = None) -> List[str]:
+        """
+        Re-fetch the pages most likely to be stale and record what they contain now.
+
+        Args:
+            urls (Iterable[str]): Every page that should be kept fresh.
+            fetch (Callable): Downloads a URL and returns a page dict with status_code,
+                text and html, e.g. page_cache.refresh.
+            budget (int): Pages to fetch this cycle; None fetches them all.
+            now (float): Time of the cycle, defaults to the current time.
+            fetched (dict): Pages already downloaded this cycle (e.g. while discovering
+                the site) mapped to their page dicts; they are recorded as visits
+                and never fetched again.
+
+        Returns:
+            list: The URLs that were fetched.
+        """
+        urls = list(dict.fromkeys(urls))
+        fetched = fetched or {}
+        changed = 0
+        for url, page in fetched.items():
+            if page.get('status_code', 200) == 200:
+                changed += self.record(url, page.get('text') or page.get('html') or '', now)
+        selected = self.plan([url for url in urls if url not in fetched], budget, now)
+        for url in selected:
+            try:
+                page = fetch(url)
+            except Exception as e:
+                print(f"Could not refresh {url}: {e}")
+                continue
+            if page.get('status_code', 200) == 200:
+                changed += self.record(url, page.get('text') or page.get('html') or '', now)
+        self.save()
+        print(
+            f"Refreshed {len(selected)} of {len(urls)} pages ({len(fetched)} more were just downloaded), "
+            f"{changed} had changed; "
+            f"about {self.expected_stale(urls, now):.1f} pages are expected to be out of date"
+        )
+        return selected
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            data = json.dumps(self.pages, separators=(',', ':'))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
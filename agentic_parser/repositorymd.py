@@ -1,13 +1,14 @@
 import os
-import requests
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
+from embedding_service import crew_embedder_config
+from document_source import iter_github_listing
+from fast_path import kickoff_with_context, markdown_content_store
+from pipeline import collect_content
 
 # Load environment variables
 load_dotenv()
 
-gapi_key = os.getenv("GEMINI_API_KEY")
-
 # GitHub repository and path setup loaded from .env file
 GITHUB_REPO = os.getenv("GITHUB_REPO")  # Fetching from .env
 GITHUB_RAW_URL = os.getenv("GITHUB_RAW_URL")  # Fetching from .env
@@ -24,30 +25,7 @@ def read_markdown_files_from_github(repo_url: str, raw_url: str):
     Returns:
         dict: A dictionary with filenames as keys and their content as values.
     """
-    docs_content = {}
-    
-    # Fetch list of files from the GitHub repository
-    response = requests.get(repo_url)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch files from GitHub: {response.status_code}")
-    
-    files = response.json()
-    
-    for file_info in files:
-        if file_info['name'].endswith(".md"):  # Only process markdown files
-            file_name = file_info['name']
-            file_url = file_info['download_url']
-            
-            try:
-                file_response = requests.get(file_url)
-                if file_response.status_code == 200:
-                    docs_content[file_name] = file_response.text
-                else:
-                    docs_content[file_name] = f"Error downloading file: {file_response.status_code}"
-            except Exception as e:
-                docs_content[file_name] = f"Error reading file: {e}"
-    
-    return docs_content
+    return collect_content(iter_github_listing(repo_url))
 
 # Fetch markdown content from the GitHub repository
 documentation_content = read_markdown_files_from_github(GITHUB_REPO, GITHUB_RAW_URL)
@@ -141,14 +119,8 @@ assist_task = Task(
     verbose=True
 )
 
-# Updated embedder configuration
-embedder_config = {
-    "provider": "google",
-    "config": {
-        "api_key": gapi_key,
-        "model": "models/embedding-001"
-    }
-}
+# Memory embeddings are batched and rate-limited by the embedding service
+embedder_config = crew_embedder_config()
 
 # Create and configure the crew
 crew = Crew(
@@ -166,7 +138,12 @@ if __name__ == "__main__":
     }
 
     # Kick off the Crew
-    result = crew.kickoff(inputs=inputs)
+    # Answers from precomputed summaries, a map-reduce analysis and/or markdown
+    # structured in code when enabled, running only the assist task
+    result = kickoff_with_context(
+        crew, user_assistant, embedder_config, lambda: markdown_content_store(documentation_content),
+        inputs, GITHUB_REPO
+    )
 
 # Display extracted documentation content for verification
 print("\nExtracted Documentation Content:")
@@ -0,0 +1,156 @@
+import re
+import zlib
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+import requests
+import http_client
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+# Same line format Sphinx itself uses to read objects.inv
+INVENTORY_LINE = re.compile(r'(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)')
+
+
+def _site_root(base_url: str) -> str:
+    """Make sure relative index locations resolve under the documentation root."""
+    return base_url if base_url.endswith('/') else base_url + '/'
+
+
+def _get(url: str, timeout: int = 10) -> Optional[requests.Response]:
+    try:
+        response = http_client.get(url, source="site_index", timeout=timeout)
+    except Exception as e:
+        print(f"Could not fetch {url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    return response
+
+
+def from_mkdocs_search_index(base_url: str) -> Optional[Dict[str, Dict]]:
+    """
+    Read the search index MkDocs publishes at search/search_index.json.
+
+    The index holds one entry per page plus one per section anchor, so a single
+    request yields every page URL together with its full text and headings.
+
+    Returns:
+        dict: Page URL mapped to title, text and sections, or None if unavailable.
+    """
+    root = _site_root(base_url)
+    response = _get(urljoin(root, 'search/search_index.json'))
+    if response is None:
+        return None
+
+    try:
+        docs = response.json().get('docs', [])
+    except ValueError:
+        return None
+
+    pages = {}
+    for doc in docs:
+        location = doc.get('location', '')
+        page_location, _, anchor = location.partition('#')
+        page_url = urljoin(root, page_location)
+        page = pages.setdefault(page_url, {'title': '', 'text': '', 'sections': []})
+        if anchor:
+            page['sections'].append({'level': 2, 'text': doc.get('title', '')})
+        else:
+            page['title'] = doc.get('title', '')
+            page['text'] = doc.get('text', '')
+    return pages or None
+
+
+def _sitemap_urls(sitemap_url: str, depth: int = 0) -> List[str]:
+    response = _get(sitemap_url)
+    if response is None:
+        return []
+
+    try:
+        tree = ElementTree.fromstring(response.content)
+    except ElementTree.ParseError:
+        return []
+
+    urls = []
+    # A sitemap index points at further sitemaps; follow one level of nesting
+    if tree.tag == f'{SITEMAP_NS}sitemapindex' and depth == 0:
+        for loc in tree.iter(f'{SITEMAP_NS}loc'):
+            urls.extend(_sitemap_urls(loc.text.strip(), depth + 1))
+    else:
+        for loc in tree.iter(f'{SITEMAP_NS}loc'):
+            urls.append(loc.text.strip())
+    return urls
+
+
+def from_sitemap(base_url: str) -> Optional[Dict[str, Dict]]:
+    """
+    Read page URLs from sitemap.xml. Text is not included and must be fetched.
+
+    Returns:
+        dict: Page URL mapped to an entry with no text, or None if unavailable.
+    """
+    root = _site_root(base_url)
+    urls = [url for url in _sitemap_urls(urljoin(root, 'sitemap.xml')) if url.startswith(root)]
+    if not urls:
+        return None
+    return {url: {'title': '', 'text': None, 'sections': []} for url in urls}
+
+
+def from_sphinx_inventory(base_url: str) -> Optional[Dict[str, Dict]]:
+    """
+    Read page URLs from the objects.inv inventory Sphinx publishes.
+
+    Returns:
+        dict: Page URL mapped to an entry with no text, or None if unavailable.
+    """
+    root = _site_root(base_url)
+    response = _get(urljoin(root, 'objects.inv'))
+    if response is None:
+        return None
+
+    # Four plain-text header lines precede the zlib-compressed body
+    parts = response.content.split(b'\n', 4)
+    if len(parts) < 5 or not parts[0].startswith(b'# Sphinx inventory version 2'):
+        return None
+
+    try:
+        body = zlib.decompress(parts[4]).decode('utf-8')
+    except zlib.error:
+        return None
+
+    doc_uris, all_uris = [], []
+    for line in body.splitlines():
+        match = INVENTORY_LINE.match(line.rstrip())
+        if not match:
+            continue
+        name, role, _, uri, _ = match.groups()
+        uri = uri.replace('$', name) if uri.endswith('$') else uri
+        uri = uri.split('#', 1)[0]
+        (doc_uris if role == 'std:doc' else all_uris).append(uri)
+
+    pages = {}
+    for uri in doc_uris or all_uris:
+        pages.setdefault(urljoin(root, uri), {'title': '', 'text': None, 'sections': []})
+    return pages or None
+
+
+def discover_site_pages(base_url: str) -> Optional[Dict[str, Dict]]:
+    """
+    Discover documentation pages from machine-readable site indexes.
+
+    Tries the MkDocs search index first because it also carries the page text,
+    then sitemap.xml, then the Sphinx inventory.
+
+    Args:
+        base_url (str): Root URL of the documentation site.
+
+    Returns:
+        dict: Page URL mapped to title, text (None when it must be fetched) and
+        sections, or None when the site publishes no usable index.
+    """
+    for source in (from_mkdocs_search_index, from_sitemap, from_sphinx_inventory):
+        pages = source(base_url)
+        if pages:
+            print(f"Discovered {len(pages)} pages from {source.__name__}")
+            return pages
+    return None
@@ -0,0 +1,104 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import http_client
+from git_source import GIT_REV, MARKDOWN_EXTENSION, GitRepository
+from page_cache import page_cache, response_validator
+
+# Cheap version of every document of a corpus, read without downloading or
+# reading the documents themselves. A version changes whenever its document does:
+#   local  - size and modification time of each markdown file
+#   git    - blob SHA of each markdown file at the revision
+#   github - blob SHA of each markdown file, from one tree listing request
+#   web    - ETag or Last-Modified of each page, from the page cache or a HEAD request
+# Documents are keyed by the names document_source and the crawler give them.
+SOURCE_KINDS = ('local', 'git', 'github', 'web')
+
+
+def local_versions(directory: str) -> Dict[str, str]:
+    """Markdown files of a local directory mapped to their size and modification time."""
+    versions = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(MARKDOWN_EXTENSION):
+            stat = os.stat(os.path.join(directory, filename))
+            versions[filename] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return versions
+
+
+def git_versions(repo_path: str, rev: str = GIT_REV) -> Dict[str, str]:
+    """Markdown files of a local repository at a revision mapped to their blob SHAs."""
+    repository = GitRepository(repo_path)
+    return {
+        os.path.basename(path): sha
+        for path, sha in repository.markdown_blobs(repository.resolve(rev)).items()
+    }
+
+
+def github_versions(repo_url: str) -> Optional[Dict[str, str]]:
+    """
+    Markdown files of a GitHub repository's default branch mapped to their blob SHAs.
+
+    Returns:
+        dict: The versions, or None when GitHub truncated the tree listing.
+    """
+    response = http_client.get(f"{repo_url}/git/trees/HEAD?recursive=1", source="github")
+    if response.status_code != 200:
+        raise Exception(f"Failed to list the GitHub tree: {response.status_code}")
+    listing = response.json()
+    if listing.get('truncated'):
+        return None
+    return {
+        os.path.basename(entry['path']): entry['sha']
+        for entry in listing['tree']
+        if entry['type'] == 'blob' and entry['path'].endswith(MARKDOWN_EXTENSION)
+    }
+
+
+def page_version(page: Dict) -> str:
+    """Version of a cached page: its validator, or the hash of its text when the server sent none."""
+    return page.get('validator') or hashlib.sha256((page.get('text') or '').encode('utf-8')).hexdigest()[:16]
+
+
+def web_versions(urls: Iterable[str], workers: int = http_client.HTTP_HOST_CONCURRENCY) -> Dict[str, Optional[str]]:
+    """
+    Pages mapped to their versions.
+
+    A page still fresh in the page cache is versioned from the cached copy,
+    which is what a crawl would use. Any other page gets a HEAD request; a
+    page whose server sends no ETag or Last-Modified gets None, which never
+    matches a recorded version.
+    """
+    def version(url):
+        page = page_cache.get(url)
+        if page is not None:
+            return url, page_version(page)
+        response = http_client.head(url)
+        return url, response_validator(response.headers) if response.status_code == 200 else None
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return dict(executor.map(version, urls))
+
+
+def corpus_versions(kind: str, corpus_id: str, names: Iterable[str] = ()) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Current versions of a corpus's documents.
+
+    Args:
+        kind (str): One of SOURCE_KINDS.
+        corpus_id (str): Docs folder, repository path, GitHub API URL or site.
+        names (Iterable): Pages of a web corpus; other kinds list their documents themselves.
+
+    Returns:
+        dict: Document name mapped to its version, or None if it cannot be listed cheaply.
+    """
+    if kind == 'local':
+        return local_versions(corpus_id)
+    if kind == 'git':
+        return git_versions(corpus_id)
+    if kind == 'github':
+        return github_versions(corpus_id)
+    if kind == 'web':
+        return web_versions(names)
+    raise ValueError(f"Unknown source kind: {kind}")
+
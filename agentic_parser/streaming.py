@@ -0,0 +1,235 @@
+import inspect
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+import litellm
+from crewai import LLM
+from dotenv import load_dotenv
+import profiling
+import telemetry
+
+load_dotenv()
+
+# When set, the final answer is printed token by token as it is generated
+STREAM = os.getenv("AGENTIC_STREAM", "").lower() in ("1", "true")
+
+
+class StreamStats:
+    def __init__(self):
+        """Timing of one streamed answer."""
+        self.start = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.end: Optional[float] = None
+        self.tokens = 0
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        return None if self.first_token_at is None else self.first_token_at - self.start
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.first_token_at is None or self.end is None or self.end <= self.first_token_at:
+            return None
+        return self.tokens / (self.end - self.first_token_at)
+
+    def as_dict(self) -> Dict:
+        return {
+            'time_to_first_token': self.time_to_first_token,
+            'total_seconds': None if self.end is None else self.end - self.start,
+            'completion_tokens': self.tokens,
+            'tokens_per_second': self.tokens_per_second
+        }
+
+
+# crewai parses the text after this marker as the agent's answer; only that part is streamed
+FINAL_ANSWER = "Final Answer:"
+# LLM attributes crewai passes to litellm.completion
+COMPLETION_PARAMS = (
+    "model", "timeout", "temperature", "top_p", "n", "stop", "presence_penalty", "frequency_penalty",
+    "logit_bias", "response_format", "seed", "logprobs", "top_logprobs", "api_version", "api_key"
+)
+
+
+class StreamingLLM(LLM):
+    def __init__(self, *args, on_text: Optional[Callable[[str], None]] = None,
+                 stop_event: Optional[threading.Event] = None, **kwargs):
+        """
+        crewai LLM that streams the final answer of a task while the agent runs as usual.
+
+        crewai 0.98 always calls the model with stream=False. This LLM keeps the
+        agent's prompts, tools, memory and callbacks, and only switches the
+        completion itself to streaming once `active` is set. The text after
+        "Final Answer:" is handed to on_text as it arrives, and the full reply
+        is returned to crewai, which parses it as usual.
+
+        Args:
+            on_text (Callable): Receives each new piece of the answer.
+            stop_event (threading.Event): When set, the stream is cut off and
+                every later call answers at once, so the crew ends without
+                further model calls.
+        """
+        super().__init__(*args, **kwargs)
+        self.on_text = on_text
+        self.stop_event = stop_event
+        self.active = False
+        self.streamed = False
+
+    @classmethod
+    def wrap(cls, llm: LLM, **kwargs) -> 'StreamingLLM':
+        """Streaming copy of an agent's LLM with the same model settings."""
+        names = [name for name in inspect.signature(LLM.__init__).parameters if name != 'self']
+        return cls(**{name: getattr(llm, name) for name in names if hasattr(llm, name)}, **kwargs)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None) -> str:
+        if self.stop_event is not None and self.stop_event.is_set():
+            return f"{FINAL_ANSWER} "
+        # Function calls come back whole, and a retried answer is not streamed twice
+        if not self.active or self.streamed or tools:
+            return super().call(messages, tools, callbacks, available_functions)
+
+        if callbacks:
+            self.set_callbacks(callbacks)
+        params = {name: getattr(self, name) for name in COMPLETION_PARAMS}
+        params.update(
+            messages=messages, max_tokens=self.max_tokens or self.max_completion_tokens, api_base=self.base_url,
+            stream=True, stream_options={"include_usage": True}
+        )
+        params = {key: value for key, value in params.items() if value is not None}
+
+        reply, usage, sent = "", None, None
+        with telemetry.span("llm.stream", model=str(self.model)):
+            for chunk in litellm.completion(**params):
+                usage = getattr(chunk, 'usage', None) or usage
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    reply += text
+                    if sent is None and FINAL_ANSWER in reply:
+                        sent = reply.index(FINAL_ANSWER) + len(FINAL_ANSWER)
+                        while sent < len(reply) and reply[sent].isspace():
+                            sent += 1
+                    if sent is not None and sent < len(reply):
+                        self.streamed = True
+                        self.on_text(reply[sent:])
+                        sent = len(reply)
+                if self.stop_event is not None and self.stop_event.is_set():
+                    break
+
+        # crewai counts tokens from the usage its callbacks receive
+        for callback in callbacks or []:
+            if usage and hasattr(callback, "log_success_event"):
+                callback.log_success_event(kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0)
+        return reply
+
+
+def stream_answer(crew, inputs: Dict, stats: Optional[StreamStats] = None,
+                  stop: Optional[threading.Event] = None) -> Iterator[str]:
+    """
+    Run a crew and stream its final task's answer as it is generated.
+
+    The crew runs through crewai as usual, in a worker thread. The final task's
+    agent gets a StreamingLLM that is switched on when the task before the
+    final one completes, so earlier tasks, tools, memory and callbacks behave
+    exactly as in a normal kickoff. If the model never wrote "Final Answer:",
+    the crew's answer is yielded whole at the end.
+
+    Args:
+        crew (Crew): The configured crew.
+        inputs (dict): Inputs interpolated into the task descriptions.
+        stats (StreamStats): Filled with time-to-first-token and tokens/s.
+        stop (threading.Event): Set to end the crew early, e.g. when the client
+            disconnected. Closing the generator sets it as well.
+
+    Yields:
+        str: Answer text chunks in order.
+    """
+    stats = stats or StreamStats()
+    stop = stop or threading.Event()
+    chunks = queue.Queue()
+    finished = object()
+    result = {}
+
+    agent = crew.tasks[-1].agent
+    agent_llm = agent.llm
+    llm = StreamingLLM.wrap(agent_llm, on_text=chunks.put, stop_event=stop)
+    llm.active = len(crew.tasks) == 1
+    previous_task = crew.tasks[-2] if len(crew.tasks) > 1 else None
+    previous_callback = previous_task.callback if previous_task else None
+
+    def start_streaming(output):
+        llm.active = True
+        callback = previous_callback or crew.task_callback
+        if callback:
+            callback(output)
+
+    def run():
+        try:
+            result['output'] = profiling.kickoff(crew, inputs)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            chunks.put(finished)
+
+    agent.llm = llm
+    if previous_task:
+        previous_task.callback = start_streaming
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    answer = []
+    try:
+        while True:
+            text = chunks.get()
+            if text is finished:
+                break
+            if stats.first_token_at is None:
+                stats.first_token_at = time.perf_counter()
+            answer.append(text)
+            yield text
+        if 'error' in result:
+            raise result['error']
+        if not answer and not stop.is_set():
+            text = str(result['output'])
+            stats.first_token_at = time.perf_counter()
+            answer.append(text)
+            yield text
+        stats.end = time.perf_counter()
+    finally:
+        stop.set()
+        worker.join()
+        agent.llm = agent_llm
+        if previous_task:
+            previous_task.callback = previous_callback
+
+    stats.tokens = litellm.token_counter(model=llm.model, text=''.join(answer))
+    telemetry.add("agentic.tokens.completion", stats.tokens)
+    if stats.time_to_first_token is not None:
+        telemetry.record("agentic.stream.time_to_first_token", stats.time_to_first_token)
+
+
+def kickoff(crew, inputs: Dict):
+    """
+    Run the crew, streaming the final answer to stdout when AGENTIC_STREAM is set.
+
+    Returns:
+        The crew result, or the streamed answer text in streaming mode.
+    """
+    if not STREAM:
+        return profiling.kickoff(crew, inputs)
+
+    stats = StreamStats()
+    answer = []
+    for text in stream_answer(crew, inputs, stats):
+        answer.append(text)
+        print(text, end='', flush=True)
+    print()
+
+    timing = stats.as_dict()
+    ttft = timing['time_to_first_token']
+    rate = timing['tokens_per_second']
+    print(
+        f"\nTime to first token: {ttft:.2f}s, " if ttft is not None else "\nNo tokens received, ",
+        f"{timing['completion_tokens']} tokens at {rate:.1f} tokens/s" if rate else "",
+        sep=''
+    )
+    return ''.join(answer)
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+import block_store
+import source_versions
+from output_dir import output_path
+
+load_dotenv()
+
+SUMMARY_DIR = os.getenv("AGENTIC_SUMMARY_DIR") or output_path("summaries")
+SUMMARY_MODEL = os.getenv("AGENTIC_SUMMARY_MODEL", "gemini/gemini-1.5-flash-latest")
+SUMMARY_WORKERS = int(os.getenv("AGENTIC_SUMMARY_WORKERS", "4"))
+# Bump when the prompt changes so every stored summary is regenerated
+PROMPT_VERSION = "1"
+
+SUMMARY_PROMPT = """Summarise the documentation page below for a knowledge base.
+Return only JSON with this shape:
+{{"summary": "2-4 sentence page summary",
+  "sections": [{{"heading": "section heading", "summary": "1-2 sentence summary"}}],
+  "key_concepts": [{{"name": "concept", "definition": "one sentence"}}]}}
+
+Page: {name}
+
+{content}
+"""
+
+
+def content_hash(content: str) -> str:
+    """Hash a document together with the model and prompt version that summarise it."""
+    digest = hashlib.sha256()
+    digest.update(f"{SUMMARY_MODEL}\0{PROMPT_VERSION}\0".encode('utf-8'))
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def summary_store_path(corpus_id: str) -> str:
+    """
+    Where the summaries of a corpus are stored.
+
+    Every corpus (local docs folder, GitHub API URL, documentation site) gets
+    one file in AGENTIC_SUMMARY_DIR. With AGENTIC_STORE_FORMAT=blocks the store
+    is a compressed block store.
+    """
+    if os.path.isdir(corpus_id):
+        corpus_id = os.path.abspath(corpus_id)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', corpus_id).strip('_')[:80]
+    digest = hashlib.sha256(corpus_id.encode('utf-8')).hexdigest()[:8]
+    return block_store.store_path(os.path.join(SUMMARY_DIR, f"{slug}_{digest}.json"))
+
+
+def load_summaries(store_path: str) -> Optional[Dict]:
+    """Load a summary store, or return None if it has not been built."""
+    if not os.path.exists(store_path):
+        return None
+    if store_path.endswith(block_store.BLOCK_EXTENSION):
+        meta, documents = block_store.read_records(store_path)
+        return dict(meta, documents=documents)
+    with open(store_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def current_summaries(store: Optional[Dict], documents: Dict[str, str]) -> Optional[Dict]:
+    """
+    Check a summary store against the documents it will be used with.
+
+    Entries whose hash does not match the current content, model and prompt
+    version, and entries of documents that no longer exist, are dropped. If any
+    current document is left without a summary the store is not used at all,
+    so the caller falls back to reading the documents.
+
+    Args:
+        store (dict): Summary store from load_summaries, or None.
+        documents (dict): Document name mapped to its current content.
+
+    Returns:
+        dict: The store with only current entries, or None if it is missing or out of date.
+    """
+    if not store:
+        return None
+    entries = store['documents']
+    current = {
+        name: entries[name] for name, content in documents.items()
+        if name in entries and entries[name].get('hash') == content_hash(content)
+    }
+    stale = len(documents) - len(current)
+    if stale:
+        print(f"Warning: {stale} of {len(documents)} documents were added or changed since their summaries "
+              f"were built; not using the summaries (rebuild them with summaries.py)")
+        return None
+    return dict(store, documents=current)
+
+
+def load_current_summaries(corpus_id: str) -> Optional[Dict]:
+    """
+    Load the summary store of a corpus if none of its documents changed since it was built.
+
+    Freshness is judged from the cheap per-document versions recorded at build
+    time (see source_versions), so the documents themselves are never read or
+    fetched. Any added, removed or changed document means the store is not
+    used, so the caller falls back to reading the documents.
+
+    Args:
+        corpus_id (str): Docs folder, repository path, GitHub API URL or site the store was built from.
+
+    Returns:
+        dict: The store, or None if it is missing or out of date.
+    """
+    store = load_summaries(summary_store_path(corpus_id))
+    if not store:
+        return None
+    recorded = store.get('versions')
+    if recorded is None:
+        print("Warning: the summary store has no document versions; not using the summaries "
+              "(rebuild them with summaries.py)")
+        return None
+    try:
+        current = source_versions.corpus_versions(store['source'], corpus_id, recorded)
+    except Exception as e:
+        print(f"Warning: could not check the summaries against the corpus ({e}); not using them")
+        return None
+    if current != recorded:
+        changed = sum(1 for name in (current or {}) if recorded.get(name) != current[name])
+        removed = len(set(recorded) - set(current or {}))
+        print(f"Warning: {changed} documents were added or changed and {removed} removed since the summaries "
+              f"were built; not using the summaries (rebuild them with summaries.py)")
+        return None
+    return store
+
+
+def summarize_with_llm(name: str, content: str) -> Dict:
+    """Summarise one document with the configured LLM."""
+    from crewai import LLM
+
+    llm = LLM(model=SUMMARY_MODEL, temperature=0)
+    response = llm.call([{"role": "user", "content": SUMMARY_PROMPT.format(name=name, content=content)}])
+    # Models often wrap JSON in a fenced code block
+    match = re.search(r'\{.*\}', response, re.DOTALL)
+    try:
+        parsed = json.loads(match.group(0)) if match else {}
+    except json.JSONDecodeError:
+        parsed = {}
+    return {
+        'summary': parsed.get('summary') or response.strip(),
+        'sections': parsed.get('sections', []),
+        'key_concepts': parsed.get('key_concepts', [])
+    }
+
+
+def build_summaries(documents: Dict[str, str], store_path: str,
+                    summarize: Callable[[str, str], Dict] = summarize_with_llm,
+                    workers: int = SUMMARY_WORKERS, source: Optional[str] = None,
+                    versions: Optional[Dict[str, Optional[str]]] = None) -> Dict:
+    """
+    Build or refresh the summary store for a corpus.
+
+    Only documents whose content hash changed since the last build are sent to
+    the LLM; summaries of deleted documents are dropped.
+
+    Args:
+        documents (dict): Document name mapped to its content.
+        store_path (str): JSON file holding the summaries.
+        summarize (Callable): Returns summary, sections and key_concepts for one document.
+        workers (int): Documents summarised concurrently.
+        source (str): Kind of corpus (see source_versions.SOURCE_KINDS).
+        versions (dict): Cheap per-document versions of the corpus, read before
+            the documents, that load_current_summaries checks at query time.
+
+    Returns:
+        dict: The updated store.
+    """
+    store = load_summaries(store_path) or {'documents': {}}
+    previous = store['documents']
+
+    hashes = {name: content_hash(content) for name, content in documents.items()}
+    stale = [name for name, digest in hashes.items() if previous.get(name, {}).get('hash') != digest]
+    print(f"Summaries: {len(documents) - len(stale)} up to date, {len(stale)} to generate")
+
+    def generate(name):
+        return name, summarize(name, documents[name])
+
+    generated = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for name, result in executor.map(generate, stale):
+            generated[name] = dict(result, hash=hashes[name])
+            print(f"Summarised {name}")
+
+    store = {
+        'model': SUMMARY_MODEL,
+        'prompt_version': PROMPT_VERSION,
+        'built_at': datetime.now().isoformat(),
+        'source': source,
+        'versions': versions,
+        'documents': {
+            name: generated.get(name) or previous[name]
+            for name in documents
+        }
+    }
+
+    if store_path.endswith(block_store.BLOCK_EXTENSION):
+        meta = {key: value for key, value in store.items() if key != 'documents'}
+        block_store.write_records(store_path, store['documents'].items(), meta=meta)
+        return store
+
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    tmp_path = store_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, store_path)
+    return store
+
+
+def render_summaries(store: Dict) -> str:
+    """Render a summary store as prompt context for the assist task."""
+    lines = ["Precomputed section summaries and key concepts:"]
+    for name, entry in store['documents'].items():
+        lines.append(f"\n## {name}\n{entry['summary']}")
+        for section in entry.get('sections', []):
+            lines.append(f"- {section.get('heading', '')}: {section.get('summary', '')}")
+        concepts = entry.get('key_concepts', [])
+        if concepts:
+            lines.append("Key concepts: " + '; '.join(
+                f"{concept.get('name', '')}: {concept.get('definition', '')}" for concept in concepts
+            ))
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Build summaries offline.
+
+    Usage:
+        python summaries.py local <docs_dir>
+        python summaries.py git <repository_path>
+        python summaries.py github <github_api_repo_url>
+        python summaries.py web <documentation_url>
+    """
+    if len(sys.argv) != 3 or sys.argv[1] not in source_versions.SOURCE_KINDS:
+        print(main.__doc__)
+        sys.exit(1)
+
+    kind, corpus_id = sys.argv[1], sys.argv[2]
+    if kind == 'web':
+        # Same pages and text that agents.py crawls; the versions come from the pages just cached
+        from documentation_tool import EnhancedDocumentationTool
+        tool = EnhancedDocumentationTool(corpus_id)
+        tool.collect(corpus_id)
+        documents = {url: page['content'] for url, page in tool.content_store.items() if 'error' not in page}
+        versions = source_versions.corpus_versions(kind, corpus_id, documents)
+    else:
+        import document_source
+        from pipeline import collect_content
+        # Read the versions first, so a document edited while it is summarised counts as changed
+        versions = source_versions.corpus_versions(kind, corpus_id)
+        documents = collect_content(getattr(document_source, f"iter_{kind}_markdown")(corpus_id))
+
+    store_path = summary_store_path(corpus_id)
+    build_summaries(documents, store_path, source=kind, versions=versions)
+    print(f"Summaries saved to: {store_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import atexit
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dotenv import load_dotenv
+from output_dir import output_path
+
+load_dotenv()
+
+# Instrumentation is off unless AGENTIC_TELEMETRY is set to "otlp" or "file"
+TELEMETRY_MODE = os.getenv("AGENTIC_TELEMETRY", "").lower()
+TELEMETRY_FILE = os.getenv("AGENTIC_TELEMETRY_FILE") or output_path("telemetry.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "agentic-parser")
+
+enabled = TELEMETRY_MODE in ("otlp", "file")
+
+_NOOP = nullcontext()
+_tracer = None
+_meter = None
+_instruments = {}
+
+
+def _setup():
+    """Create the tracer and meter providers on first use."""
+    global _tracer, _meter, enabled
+
+    try:
+        from opentelemetry import metrics, trace
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        print("Warning: opentelemetry-sdk is not installed, telemetry disabled")
+        enabled = False
+        return
+
+    if TELEMETRY_MODE == "otlp":
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        span_exporter = OTLPSpanExporter()
+        metric_exporter = OTLPMetricExporter()
+    else:
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        os.makedirs(os.path.dirname(os.path.abspath(TELEMETRY_FILE)), exist_ok=True)
+        out = open(TELEMETRY_FILE, "a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(
+            out=out,
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+        metric_exporter = ConsoleMetricExporter(
+            out=out,
+            formatter=lambda data: data.to_json(indent=None) + "\n"
+        )
+
+    resource = Resource.create({"service.name": SERVICE_NAME})
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    meter_provider = MeterProvider(
+        resource=resource,
+        metric_readers=[PeriodicExportingMetricReader(metric_exporter)]
+    )
+    trace.set_tracer_provider(tracer_provider)
+    metrics.set_meter_provider(meter_provider)
+    atexit.register(meter_provider.shutdown)
+    atexit.register(tracer_provider.shutdown)
+
+    _tracer = trace.get_tracer("agentic_parser")
+    _meter = metrics.get_meter("agentic_parser")
+
+
+def _instrument(kind: str, name: str):
+    key = (kind, name)
+    instrument = _instruments.get(key)
+    if instrument is None:
+        if kind == "counter":
+            instrument = _meter.create_counter(name)
+        elif kind == "up_down_counter":
+            instrument = _meter.create_up_down_counter(name)
+        else:
+            instrument = _meter.create_histogram(name, unit="s" if name.endswith("duration") else "1")
+        _instruments[key] = instrument
+    return instrument
+
+
+def add(name: str, value: int = 1, **attributes):
+    """Increment a counter such as agentic.requests or agentic.bytes."""
+    if not enabled:
+        return
+    if _meter is None:
+        _setup()
+        if not enabled:
+            return
+    _instrument("counter", name).add(value, attributes)
+
+
+def adjust(name: str, delta: int, **attributes):
+    """Move a value that goes up and down, such as agentic.http.concurrency_limit, by delta."""
+    if not enabled:
+        return
+    if _meter is None:
+        _setup()
+        if not enabled:
+            return
+    _instrument("up_down_counter", name).add(delta, attributes)
+
+
+def record(name: str, value: float, **attributes):
+    """Record a value in a histogram such as agentic.stage.duration."""
+    if not enabled:
+        return
+    if _meter is None:
+        _setup()
+        if not enabled:
+            return
+    _instrument("histogram", name).record(value, attributes)
+
+
+@contextmanager
+def _timed_span(stage: str, attributes: dict):
+    start = time.perf_counter()
+    with _tracer.start_as_current_span(stage, attributes=attributes) as current:
+        try:
+            yield current
+        finally:
+            record("agentic.stage.duration", time.perf_counter() - start, stage=stage)
+
+
+def span(stage: str, **attributes):
+    """
+    Trace a pipeline stage and record its latency.
+
+    Returns a shared no-op context manager when telemetry is disabled, so the
+    call sites cost a single flag check.
+
+    Args:
+        stage (str): Stage name, e.g. "fetch", "parse", "embed" or "crew.kickoff".
+        **attributes: Span attributes such as the URL or file path.
+    """
+    if not enabled:
+        return _NOOP
+    if _tracer is None:
+        _setup()
+        if not enabled:
+            return _NOOP
+    return _timed_span(stage, attributes)
+
+
+def record_response(response, source: str, size: int = None):
+    """Count one HTTP request and the bytes it returned."""
+    if not enabled:
+        return
+    add("agentic.requests", source=source, status=response.status_code)
+    add("agentic.bytes", len(response.content) if size is None else size, source=source)
+
+
+def kickoff(crew, inputs: dict):
+    """
+    Run crew.kickoff inside a span, with one child span per task and token counters.
+
+    Args:
+        crew (Crew): The configured crew.
+        inputs (dict): Inputs interpolated into the task descriptions.
+
+    Returns:
+        CrewOutput: The crew result, unchanged.
+    """
+    if not enabled:
+        return crew.kickoff(inputs=inputs)
+
+    with span("crew.kickoff", agents=len(crew.agents), tasks=len(crew.tasks)):
+        previous_callback = crew.task_callback
+        task_start = [time.time_ns()]
+
+        def task_callback(output):
+            # Tasks run sequentially, so each one spans from the previous completion
+            end = time.time_ns()
+            task_span = _tracer.start_span(
+                "crew.task",
+                start_time=task_start[0],
+                attributes={"agent": str(output.agent)}
+            )
+            task_span.end(end_time=end)
+            record("agentic.stage.duration", (end - task_start[0]) / 1e9, stage="crew.task", agent=str(output.agent))
+            task_start[0] = end
+            if previous_callback:
+                previous_callback(output)
+
+        crew.task_callback = task_callback
+        try:
+            result = crew.kickoff(inputs=inputs)
+        finally:
+            crew.task_callback = previous_callback
+
+        usage = getattr(result, "token_usage", None)
+        if usage is not None:
+            add("agentic.tokens.prompt", usage.prompt_tokens)
+            add("agentic.tokens.completion", usage.completion_tokens)
+            add("agentic.llm.requests", usage.successful_requests)
+        return result
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules in agentic_parser/ import each other by name, as when its scripts are run directly
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agentic_parser'))
+# Keep markdown parses in memory instead of writing to the user cache directory
+os.environ.setdefault("AGENTIC_MARKDOWN_CACHE_DIR", "")
@@ -0,0 +1,71 @@
+import os
+import pytest
+import block_store
+from block_store import BlockReader, BlockWriter, read_records, write_records
+
+RECORDS = [(f"page{i}", {'title': f"Page {i}", 'content': 'text ' * i, 'links': [i, None]}) for i in range(200)]
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'zstd'])
+def test_records_and_meta_round_trip(tmp_path, codec):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+    path = str(tmp_path / 'store.blocks')
+    write_records(path, RECORDS, meta={'source': 'docs'}, codec=codec, block_size=1024)
+    meta, records = read_records(path)
+    assert meta == {'source': 'docs'}
+    assert records == dict(RECORDS)
+
+
+def test_records_are_read_one_block_at_a_time(tmp_path):
+    path = str(tmp_path / 'store.blocks')
+    write_records(path, RECORDS, codec='zlib', block_size=1024)
+    with BlockReader(path) as reader:
+        assert len(reader._blocks) > 1
+        assert len(reader) == len(RECORDS) and 'page7' in reader and 'missing' not in reader
+        assert reader.get('page150') == dict(RECORDS)['page150']
+        assert reader.get('missing', 'default') == 'default'
+        assert [key for key, _ in reader.items()] == [key for key, _ in RECORDS]
+
+
+def test_unicode_and_empty_stores(tmp_path):
+    path = str(tmp_path / 'unicode.blocks')
+    write_records(path, [('ключ', {'text': 'naïve – 文档'})], codec='zlib')
+    assert read_records(path)[1] == {'ключ': {'text': 'naïve – 文档'}}
+
+    empty = str(tmp_path / 'empty.blocks')
+    write_records(empty, [], codec='zlib')
+    assert read_records(empty) == ({}, {})
+
+
+def test_duplicate_keys_are_rejected_and_a_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / 'store.blocks')
+    with pytest.raises(ValueError):
+        with BlockWriter(path, codec='zlib') as writer:
+            writer.add('a', 1)
+            writer.add('a', 2)
+    assert os.listdir(tmp_path) == []
+
+
+def test_rewriting_a_store_keeps_open_readers_on_the_old_file(tmp_path):
+    path = str(tmp_path / 'store.blocks')
+    write_records(path, [('a', 'old')], codec='zlib')
+    with BlockReader(path) as reader:
+        write_records(path, [('a', 'new')], codec='zlib')
+        assert reader.get('a') == 'old'
+    assert read_records(path)[1] == {'a': 'new'}
+
+
+def test_non_store_file_is_rejected(tmp_path):
+    path = tmp_path / 'store.json'
+    path.write_bytes(b'{"not": "a block store", "padding": "' + b'x' * 64 + b'"}')
+    with pytest.raises(ValueError):
+        BlockReader(str(path))
+
+
+def test_store_path_follows_the_store_format(monkeypatch):
+    monkeypatch.setattr(block_store, 'STORE_FORMAT', 'json')
+    assert block_store.store_path('rag_data/repo.json') == 'rag_data/repo.json'
+    monkeypatch.setattr(block_store, 'STORE_FORMAT', 'blocks')
+    assert block_store.store_path('rag_data/repo.json') == 'rag_data/repo.blocks'
+    assert block_store.store_path('summaries/docs') == 'summaries/docs.blocks'
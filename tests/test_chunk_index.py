@@ -0,0 +1,67 @@
+import os
+import numpy as np
+from chunk_index import ChunkIndex, render_passages
+from corpus_snapshot import MANIFEST, open_snapshot, write_snapshot
+
+
+def chunk(path, content, section=None):
+    return {'source': 'local', 'path': path, 'title': path, 'chunk_index': 0, 'content': content, 'section': section}
+
+
+CHUNKS = [
+    chunk('install.md', 'Install the package with pip and configure the API key.', 'Install'),
+    chunk('crawl.md', 'The crawler follows links within the site and respects the page budget.'),
+    chunk('cache.md', 'Cached pages expire after the TTL and are evicted least recently used first.'),
+]
+
+
+def test_lexical_search_ranks_matching_chunks_and_skips_the_rest():
+    index = ChunkIndex.build(CHUNKS)
+    assert [c['path'] for c in index.search('how do I install with pip?', k=3)] == ['install.md']
+    assert [c['path'] for c in index.search('page budget', k=1)] == ['crawl.md']
+    assert index.search('kubernetes', k=3) == []
+
+
+def test_vectors_add_semantic_matches_through_rank_fusion():
+    vectors = np.eye(3, dtype=np.float32)
+    index = ChunkIndex.build(CHUNKS, vectors, 'test:3')
+    results = index.search('install', k=2, query_vector=[0, 0, 1])
+    # The lexical and the vector match both make the cut
+    assert {c['path'] for c in results} == {'install.md', 'cache.md'}
+
+
+def test_render_passages_names_the_page_and_section():
+    rendered = render_passages(CHUNKS[:1])
+    assert '### install.md > Install (install.md)' in rendered
+    assert CHUNKS[0]['content'] in rendered
+
+
+def corpus():
+    return {'version': 'v1', 'pages': 3, 'built_at': '2026-01-01T00:00:00', 'doc_context': 'context'}
+
+
+def test_snapshot_round_trips_the_index_memory_mapped(tmp_path):
+    index = ChunkIndex.build(CHUNKS, np.arange(6, dtype=np.float32).reshape(3, 2), 'test:2')
+    write_snapshot('docs', corpus(), {}, {}, index=index, source_version='s1', directory=str(tmp_path))
+
+    snapshot = open_snapshot('docs', 's1', directory=str(tmp_path))
+    restored = snapshot.index
+    assert isinstance(restored.rows, np.memmap) and isinstance(restored.vectors, np.memmap)
+    assert restored.vector_model == 'test:2'
+    assert np.array_equal(restored.vectors, index.vectors)
+    assert restored.search('page budget', k=1) == index.search('page budget', k=1)
+    assert snapshot.doc_context == 'context'
+    snapshot.close()
+
+    assert open_snapshot('docs', 's2', directory=str(tmp_path)) is None
+
+
+def test_snapshot_whose_arrays_do_not_match_the_manifest_is_not_opened(tmp_path):
+    index = ChunkIndex.build(CHUNKS, np.ones((3, 2), dtype=np.float32), 'test:2')
+    path = write_snapshot('docs', corpus(), {}, {}, index=index, directory=str(tmp_path))
+    np.save(os.path.join(path, 'vectors.npy'), np.ones((2, 2), dtype=np.float32))
+    assert open_snapshot('docs', directory=str(tmp_path)) is None
+
+    os.remove(os.path.join(path, 'vectors.npy'))
+    assert open_snapshot('docs', directory=str(tmp_path)) is None
+    assert os.path.exists(os.path.join(path, MANIFEST))
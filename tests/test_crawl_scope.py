@@ -0,0 +1,131 @@
+import threading
+import pytest
+import crawl_scope
+from crawl_scope import CrawlBudgetExhausted, CrawlScope, CrawlScopeError
+
+
+class FakeResponse:
+    def __init__(self, body=b'<html>page</html>', status_code=200, content_type='text/html', length=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        if length is not None:
+            self.headers['Content-Length'] = str(length)
+        self.encoding = 'utf-8'
+        self.closed = False
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSite:
+    def __init__(self):
+        """URL mapped to the response the fake server sends; every request is recorded."""
+        self.responses = {}
+        self.requests = []
+
+    def __setitem__(self, url, response):
+        self.responses[url] = response
+
+    def get(self, url, timeout=10, stream=False):
+        self.requests.append(('GET', url))
+        return self.responses[url]
+
+    def head(self, url, timeout=10):
+        self.requests.append(('HEAD', url))
+        return self.responses[url]
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    site = FakeSite()
+    monkeypatch.setattr(crawl_scope.http_client, 'get', site.get)
+    monkeypatch.setattr(crawl_scope.http_client, 'head', site.head)
+    return site
+
+
+def test_accepted_pages_and_their_bytes_are_charged(responses):
+    responses['https://docs/a'] = FakeResponse(b'x' * 10)
+    scope = CrawlScope(max_pages=5, max_bytes=None, max_page_bytes=None, include=[], exclude=[])
+    status, body, headers = scope.download('https://docs/a')
+    assert (status, body) == (200, 'x' * 10)
+    assert (scope.pages, scope.bytes) == (1, 10)
+
+
+def test_rejected_responses_use_no_page_budget(responses):
+    responses['https://docs/file'] = FakeResponse(b'%PDF', content_type='application/pdf')
+    responses['https://docs/huge'] = FakeResponse(b'x' * 100, length=100)
+    responses['https://docs/long'] = FakeResponse(b'x' * 100)
+    responses['https://docs/page'] = FakeResponse(b'ok')
+    scope = CrawlScope(max_pages=1, max_bytes=None, max_page_bytes=50, include=[], exclude=[])
+
+    for url in ('https://docs/file', 'https://docs/huge', 'https://docs/long'):
+        with pytest.raises(CrawlScopeError):
+            scope.download(url)
+    assert scope.pages == 0
+    assert scope.skipped == {'content_type': 1, 'size': 2}
+    # The abandoned body was read up to the limit and still counts as bytes
+    assert scope.bytes > 50
+
+    assert scope.download('https://docs/page')[1] == 'ok'
+    assert scope.pages == 1 and scope.exhausted
+    with pytest.raises(CrawlBudgetExhausted):
+        scope.download('https://docs/page')
+
+
+def test_head_rejection_skips_the_get(responses):
+    responses['https://docs/image'] = FakeResponse(content_type='image/png')
+    scope = CrawlScope(max_pages=3, max_page_bytes=None, include=[], exclude=[], head_requests=True)
+    with pytest.raises(CrawlScopeError):
+        scope.download('https://docs/image')
+    assert responses.requests == [('HEAD', 'https://docs/image')]
+    assert scope.pages == 0
+
+
+def test_byte_budget_stops_the_crawl(responses):
+    responses['https://docs/a'] = FakeResponse(b'x' * 60)
+    responses['https://docs/b'] = FakeResponse(b'x' * 60)
+    scope = CrawlScope(max_pages=None, max_bytes=100, max_page_bytes=None, include=[], exclude=[])
+    scope.download('https://docs/a')
+    scope.download('https://docs/b')
+    assert scope.exhausted and scope.bytes == 120
+    with pytest.raises(CrawlBudgetExhausted):
+        scope.download('https://docs/a')
+
+
+def test_parallel_downloads_never_exceed_the_page_budget(responses):
+    for i in range(20):
+        responses[f'https://docs/{i}'] = FakeResponse(b'page')
+    scope = CrawlScope(max_pages=7, max_page_bytes=None, include=[], exclude=[])
+    outcomes = []
+
+    def fetch(url):
+        try:
+            scope.download(url)
+            outcomes.append('page')
+        except CrawlBudgetExhausted:
+            outcomes.append('exhausted')
+
+    threads = [threading.Thread(target=fetch, args=(f'https://docs/{i}',)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes.count('page') == scope.pages == 7
+
+
+def test_scope_rules_count_each_skipped_url_once():
+    scope = CrawlScope(max_depth=1, include=[r'/en/latest/'], exclude=[r'/genindex'])
+    assert scope.allows('https://docs/en/latest/guide.html', depth=1)
+    assert not scope.allows('https://docs/en/latest/guide.html', depth=2)
+    assert not scope.allows('https://docs/en/latest/_static/app.js')
+    assert not scope.allows('https://docs/en/latest/manual.pdf')
+    assert not scope.allows('https://docs/en/stable/guide.html')
+    assert not scope.allows('https://docs/en/latest/genindex.html')
+    assert not scope.allows('https://docs/en/latest/genindex.html')
+    assert not scope.allows('mailto:docs@example.com')
+    assert scope.skipped == {'depth': 1, 'asset': 2, 'include': 1, 'exclude': 1, 'scheme': 1}
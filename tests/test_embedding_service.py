@@ -0,0 +1,86 @@
+import threading
+import numpy as np
+import pytest
+import embedding_service
+from embedding_service import EmbeddingService, HashedNgramEmbedder, estimate_tokens
+from pipeline import embed_chunks
+
+
+class RecordingEmbedder:
+    max_batch_size = None
+
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def embed(self, texts):
+        with self.lock:
+            self.calls.append(list(texts))
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("rate limited")
+        return [[float(len(text))] for text in texts]
+
+
+def test_batches_are_bounded_by_count_and_tokens():
+    service = EmbeddingService(RecordingEmbedder(), batch_size=3, max_batch_tokens=10)
+    texts = ['a' * 4 * i for i in range(1, 8)]
+    batches = service.batches(texts)
+    assert [text for batch in batches for text in batch] == texts
+    for batch in batches:
+        assert len(batch) <= 3
+        # Only a text too long for any batch goes over the token bound, and it goes alone
+        assert sum(estimate_tokens(text) for text in batch) <= 10 or len(batch) == 1
+
+
+def test_embedder_batch_limit_caps_the_batch_size():
+    embedder = RecordingEmbedder()
+    embedder.max_batch_size = 2
+    assert EmbeddingService(embedder, batch_size=64).batch_size == 2
+
+
+def test_identical_texts_are_embedded_once_and_results_keep_input_order():
+    embedder = RecordingEmbedder()
+    service = EmbeddingService(embedder, batch_size=2, concurrency=4)
+    texts = ['one', 'three', 'one', 'fifteen', 'three']
+    assert service.embed(texts) == [[3.0], [5.0], [3.0], [7.0], [5.0]]
+    sent = [text for call in embedder.calls for text in call]
+    assert sorted(sent) == ['fifteen', 'one', 'three']
+    assert service.requests == len(embedder.calls) == 2 and service.texts == 3
+
+
+def test_failed_batch_is_retried(monkeypatch):
+    monkeypatch.setattr(embedding_service.time, 'sleep', lambda seconds: None)
+    embedder = RecordingEmbedder(failures=2)
+    assert EmbeddingService(embedder, retries=2).embed(['text']) == [[4.0]]
+    assert len(embedder.calls) == 3
+
+    with pytest.raises(RuntimeError):
+        EmbeddingService(RecordingEmbedder(failures=2), retries=1).embed(['text'])
+
+
+def test_hashed_ngram_vectors_are_deterministic_and_normalised():
+    embedder = HashedNgramEmbedder(dim=64)
+    first, again = embedder.embed(['Install the package']), HashedNgramEmbedder(dim=64).embed(['Install the package'])
+    assert first == again
+    assert len(first[0]) == 64
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+    assert embedder.embed_one('') == [0.0] * 64
+
+
+def test_hashed_ngram_similarity_follows_shared_vocabulary():
+    embedder = HashedNgramEmbedder()
+    query, close, far = (np.array(v) for v in embedder.embed(
+        ['install the package', 'installing packages', 'crawl budget exhausted']
+    ))
+    assert query @ close > query @ far
+
+
+def test_embed_chunks_adds_embeddings_across_windows():
+    service = EmbeddingService(HashedNgramEmbedder(dim=16), batch_size=2)
+    chunks = [{'content': f"chunk {i}"} for i in range(5)]
+    embedded = list(embed_chunks(chunks, service=service, window=2))
+    assert [chunk['content'] for chunk in embedded] == [chunk['content'] for chunk in chunks]
+    assert all(len(chunk['embedding']) == 16 for chunk in embedded)
+    assert service.requests == 3
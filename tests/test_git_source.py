@@ -0,0 +1,80 @@
+import subprocess
+import pytest
+from git_source import GitError, GitRepository, iter_repository_markdown, sync_repository
+from GitLabScrappper import load_rag_document
+
+
+def git(repo, *args):
+    return subprocess.run(['git', '-C', str(repo), *args], check=True, capture_output=True).stdout.decode().strip()
+
+
+def commit(repo, files, message):
+    for path, content in files.items():
+        target = repo / path
+        if content is None:
+            target.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content)
+    git(repo, 'add', '-A')
+    git(repo, '-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', message)
+    return git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / 'repo'
+    path.mkdir()
+    git(path, 'init', '-q')
+    commit(path, {'README.md': '# Readme\n\nIntro.', 'docs/guide.md': '# Guide\n\nSteps.', 'app.py': 'print()'}, 'first')
+    return path
+
+
+def test_markdown_is_read_from_the_commit_not_the_working_tree(repo):
+    (repo / 'README.md').write_text('# Uncommitted edit')
+    documents = {document['source_file']: document for document in iter_repository_markdown(str(repo))}
+    assert sorted(documents) == ['README.md', 'docs/guide.md']
+    assert documents['README.md']['content'] == '# Readme\n\nIntro.'
+    assert documents['docs/guide.md']['title'] == 'Guide'
+
+
+def test_missing_blobs_are_skipped(repo, capsys):
+    repository = GitRepository(str(repo))
+    blobs = repository.markdown_blobs(repository.resolve('HEAD'))
+    missing = '0' * 40
+    contents = repository.read_blobs([blobs['README.md'], missing, blobs['docs/guide.md']])
+    assert contents == {blobs['README.md']: '# Readme\n\nIntro.', blobs['docs/guide.md']: '# Guide\n\nSteps.'}
+    assert f"skipping blob {missing}, which git reports as missing" in capsys.readouterr().out
+
+
+def test_changed_markdown_detects_each_kind_of_change(repo):
+    first = git(repo, 'rev-parse', 'HEAD')
+    git(repo, 'mv', 'docs/guide.md', 'docs/tutorial.md')
+    second = commit(repo, {'README.md': '# Readme\n\nMore.', 'NEW.md': '# New', 'app.py': None}, 'second')
+    changes = sorted(GitRepository(str(repo)).changed_markdown(first, second), key=str)
+    assert changes == sorted([
+        ('modified', 'README.md', 'README.md'),
+        ('added', None, 'NEW.md'),
+        ('renamed', 'docs/guide.md', 'docs/tutorial.md'),
+    ], key=str)
+
+
+def test_sync_reads_only_changed_files_after_the_first_run(repo, tmp_path):
+    output = str(tmp_path / 'rag.json')
+    result = sync_repository(str(repo), output)
+    assert result['full'] and sorted(result['added']) == ['README.md', 'docs/guide.md']
+
+    assert sync_repository(str(repo), output)['commit'] == result['commit']
+
+    commit(repo, {'docs/guide.md': None, 'NEW.md': '# New'}, 'second')
+    result = sync_repository(str(repo), output)
+    assert not result['full']
+    assert result['added'] == ['NEW.md'] and result['deleted'] == ['docs/guide.md']
+    document = load_rag_document(output)
+    assert [entry['source_file'] for entry in document['documents']] == ['NEW.md', 'README.md']
+    assert document['project_info']['commit_sha'] == result['commit']
+
+
+def test_unknown_revision_raises_git_error(repo):
+    with pytest.raises(GitError):
+        GitRepository(str(repo)).resolve('no-such-branch')
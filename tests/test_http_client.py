@@ -0,0 +1,89 @@
+import threading
+import pytest
+import http_client
+from http_client import AdaptiveLimit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(http_client.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def send(limit, latency=0.1, overloaded=False):
+    saturated = limit.acquire()
+    limit.release(saturated, None if overloaded else latency, overloaded=overloaded)
+
+
+def test_limit_grows_by_about_one_per_round_at_the_limit(clock):
+    limit = AdaptiveLimit('docs', initial=1, maximum=32)
+    assert limit.acquire() is True
+    limit.release(True, 0.1)
+    assert limit.limit == 2.0
+    # With one request held, each further one is sent at the limit: 1/2 + 1/2.5
+    assert limit.acquire() is False
+    for _ in range(2):
+        limit.release(limit.acquire(), 0.1)
+    assert limit.limit == pytest.approx(2.9)
+    # A request sent below the limit leaves it alone
+    limit.release(False, 0.1)
+    limit.release(limit.acquire(), 0.1)
+    assert limit.limit == pytest.approx(2.9)
+
+
+def test_limit_never_exceeds_the_maximum(clock):
+    limit = AdaptiveLimit('docs', initial=1, maximum=3)
+    for _ in range(50):
+        limit.acquire()
+        limit.release(True, 0.1)
+    assert limit.limit == 3.0
+    assert AdaptiveLimit('docs', initial=10, maximum=3).limit == 3.0
+
+
+def test_overload_halves_the_limit_once_per_round_trip(clock):
+    limit = AdaptiveLimit('docs', initial=8, maximum=32)
+    send(limit)
+    send(limit, overloaded=True)
+    assert limit.limit == 4.0
+    # Requests already in flight when the host pushed back do not cut it again
+    send(limit, overloaded=True)
+    assert limit.limit == 4.0
+    clock[0] += 1
+    send(limit, overloaded=True)
+    assert limit.limit == 2.0
+    for _ in range(5):
+        clock[0] += 1
+        send(limit, overloaded=True)
+    assert limit.limit == 1.0
+
+
+def test_rising_latency_counts_as_overload(clock):
+    limit = AdaptiveLimit('docs', initial=4, maximum=4, latency_factor=2.0)
+    for _ in range(5):
+        send(limit, latency=0.1)
+    assert limit.limit == 4.0
+    for _ in range(10):
+        send(limit, latency=1.0)
+        if limit.limit < 4:
+            break
+    assert limit.limit == 2.0
+
+
+def test_acquire_waits_for_a_free_slot(clock):
+    limit = AdaptiveLimit('docs', initial=2, maximum=2)
+    assert limit.acquire() is False
+    assert limit.acquire() is True
+    acquired = threading.Event()
+
+    def third():
+        limit.acquire()
+        acquired.set()
+
+    waiter = threading.Thread(target=third)
+    waiter.start()
+    assert not acquired.wait(0.1)
+    limit.release(False, 0.1)
+    assert acquired.wait(1)
+    waiter.join()
+    assert limit.in_flight == 2
@@ -0,0 +1,53 @@
+from map_reduce import FakeLLM, MapReduceAnalyzer
+from pipeline import chunk_documents
+
+
+def analyze(documents, concurrency=4, chunk_chars=200, fan_in=2, latency=0):
+    # Enough words that merged analyses keep every part they cover
+    llm = FakeLLM(latency=latency, words=1000)
+    analyzer = MapReduceAnalyzer(llm, concurrency=concurrency, chunk_chars=chunk_chars, fan_in=fan_in)
+    return llm, analyzer.analyze(documents)
+
+
+def test_reduce_merges_fan_in_at_a_time_level_by_level():
+    # 7 map calls; level 1 merges d0-d2 and d3-d5 and carries d6 up, level 2 merges the three
+    llm, analysis = analyze({f"d{i}": f"content of document {i}" for i in range(7)}, fan_in=3)
+    assert llm.calls == analysis['llm_calls'] == 7 + 2 + 1
+    assert sorted(analysis['documents']) == [f"d{i}" for i in range(7)]
+    assert analysis['corpus'].startswith('### d0 to d2')
+    assert '### d3 to d5' in analysis['corpus'] and '### d6 ' in analysis['corpus']
+
+
+def test_long_document_is_chunked_and_merged_into_one_analysis():
+    content = ' '.join(f"word{i}" for i in range(500))
+    parts = len(list(chunk_documents(
+        [{'source': 'corpus', 'path': 'guide', 'title': None, 'content': content}], chunk_size=200, overlap=20
+    )))
+    assert parts > 2
+    llm, analysis = analyze({'guide': content}, fan_in=2)
+    # A binary merge of n parts takes n - 1 reduce calls; the corpus of one document needs none
+    assert llm.calls == parts + parts - 1
+    assert analysis['corpus'] == analysis['documents']['guide']
+
+
+def test_single_short_document_needs_one_call():
+    llm, analysis = analyze({'readme': 'Install the package with pip.'})
+    assert llm.calls == 1
+    assert 'Install the package with pip.' in analysis['corpus']
+    assert analysis['corpus'] == analysis['documents']['readme']
+
+
+def test_calls_in_flight_never_exceed_the_concurrency():
+    llm, analysis = analyze({f"d{i}": f"content of document {i}" for i in range(12)}, concurrency=3, latency=0.01)
+    assert 1 < llm.max_in_flight <= 3
+    assert analysis['llm_calls'] == 12 + 11
+
+
+def test_empty_corpus_makes_no_calls():
+    llm, analysis = analyze({})
+    assert llm.calls == 0
+    assert analysis['documents'] == {} and analysis['corpus'] == ''
+
+    llm, analysis = analyze({'blank': ''})
+    assert llm.calls == 0
+    assert analysis['documents'] == {} and analysis['corpus'] == ''
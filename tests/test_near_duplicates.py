@@ -0,0 +1,29 @@
+from near_duplicates import MinHasher, NearDuplicateFilter
+
+PAGE = ' '.join(f"word{i}" for i in range(200))
+
+
+def test_near_identical_pages_are_duplicates():
+    detector = NearDuplicateFilter(0.9)
+    assert detector.check('latest', PAGE) is None
+    assert detector.check('stable', PAGE + ' version banner') == 'latest'
+
+
+def test_unrelated_pages_are_kept():
+    detector = NearDuplicateFilter(0.9)
+    assert detector.check('a', PAGE) is None
+    assert detector.check('b', ' '.join(f"other{i}" for i in range(200))) is None
+
+
+def test_text_without_shingles_has_no_signature():
+    assert MinHasher().signature('') is None
+    assert MinHasher().signature('  --- ** ') is None
+
+
+def test_empty_pages_are_never_duplicates():
+    detector = NearDuplicateFilter(0.9)
+    assert detector.check('e1', '') is None
+    assert detector.check('e2', '') is None
+    assert detector.check('e3', '  ---  ') is None
+    assert detector.duplicates == {}
+    assert detector.signatures == {}
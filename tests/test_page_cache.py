@@ -0,0 +1,113 @@
+import threading
+import page_cache as page_cache_module
+from page_cache import PageCache
+
+
+def html(size):
+    return 'x' * size
+
+
+def test_least_recently_used_pages_are_evicted_first():
+    cache = PageCache(ttl=0, max_bytes=300)
+    cache.put('a', html(100), extract=False)
+    cache.put('b', html(100), extract=False)
+    cache.put('c', html(100), extract=False)
+    cache.get('a')
+    cache.put('d', html(100), extract=False)
+    assert list(cache.pages) == ['c', 'a', 'd']
+    assert cache.bytes == 300 and cache.stats['evicted'] == 1
+
+
+def test_a_page_larger_than_the_cache_is_still_kept():
+    cache = PageCache(ttl=0, max_bytes=100)
+    cache.put('small', html(50), extract=False)
+    cache.put('large', html(500), extract=False)
+    assert list(cache.pages) == ['large']
+
+
+def test_expired_pages_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache_module.time, 'time', lambda: now[0])
+    cache = PageCache(ttl=60, max_bytes=0)
+    cache.put('a', html(10), extract=False)
+    now[0] += 59
+    assert cache.get('a') is not None
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats['expired'] == 1 and cache.bytes == 0
+
+
+def test_set_text_updates_the_size_accounting():
+    cache = PageCache(ttl=0, max_bytes=0)
+    cache.put('a', html(10), extract=False)
+    cache.set_text('a', 'some text')
+    assert cache.get('a')['text'] == 'some text'
+    assert cache.bytes == 10 + len('some text')
+
+
+def test_saved_pages_are_read_back_from_disk_on_demand(tmp_path):
+    path = str(tmp_path / 'pages.blocks')
+    cache = PageCache(path=path, ttl=0, max_bytes=0)
+    cache.put('a', '<p>alpha</p>')
+    cache.put('b', '<p>beta</p>', validator='etag:"1"')
+    cache.save()
+
+    restored = PageCache(path=path, ttl=0, max_bytes=0)
+    assert restored.pages == {}
+    page = restored.get('b')
+    assert page['text'] == 'beta' and page['validator'] == 'etag:"1"'
+    assert list(restored.pages) == ['b']
+
+
+def test_set_text_fills_in_a_page_that_is_only_on_disk(tmp_path):
+    path = str(tmp_path / 'pages.blocks')
+    cache = PageCache(path=path, ttl=0, max_bytes=0)
+    cache.put('a', '<p>alpha</p>', extract=False)
+    cache.save()
+
+    restored = PageCache(path=path, ttl=0, max_bytes=0)
+    restored.set_text('a', 'alpha')
+    assert restored.get('a')['text'] == 'alpha'
+    # The reader's own copy of the record is left alone
+    assert restored._disk.get('a')['text'] is None
+    restored.set_text('missing', 'text')
+    assert restored.get('missing') is None
+
+
+def test_save_keeps_disk_pages_and_drops_expired_ones(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache_module.time, 'time', lambda: now[0])
+    path = str(tmp_path / 'pages.blocks')
+    cache = PageCache(path=path, ttl=60, max_bytes=0)
+    cache.put('old', html(10), extract=False)
+    cache.save()
+    now[0] += 30
+    cache = PageCache(path=path, ttl=60, max_bytes=0)
+    cache.put('new', html(10), extract=False)
+    cache.save()
+    assert set(cache._disk.keys()) == {'old', 'new'}
+
+    now[0] += 40
+    cache.save()
+    assert set(cache._disk.keys()) == {'new'}
+
+
+def test_save_while_pages_are_added_concurrently(tmp_path):
+    path = str(tmp_path / 'pages.blocks')
+    cache = PageCache(path=path, ttl=0, max_bytes=0)
+    for i in range(50):
+        cache.put(f'disk{i}', html(10), extract=False)
+    cache.save()
+
+    def add_pages():
+        for i in range(200):
+            cache.put(f'new{i}', html(10), extract=False)
+            cache.get(f'disk{i % 50}')
+
+    writer = threading.Thread(target=add_pages)
+    writer.start()
+    for _ in range(5):
+        cache.save()
+    writer.join()
+    cache.save()
+    assert len(cache._disk) == 250
@@ -0,0 +1,40 @@
+import threading
+
+from document_source import _document
+from pipeline import collect_content, prefetch
+
+PAGE = ' '.join(f"word{i}" for i in range(100))
+DOCUMENTS = [
+    _document('local', 'docs/a.md', 'a.md', PAGE),
+    _document('local', 'docs/b.md', 'b.md', PAGE),
+    _document('local', 'docs/c.md', 'c.md', 'Error reading file: denied', error='denied'),
+]
+
+
+def test_collect_content_keeps_every_file_by_default():
+    assert collect_content(iter(DOCUMENTS), dedup=False) == {
+        'a.md': PAGE, 'b.md': PAGE, 'c.md': 'Error reading file: denied'
+    }
+
+
+def test_collect_content_dedup_drops_unreadable_and_duplicate_files():
+    assert collect_content(iter(DOCUMENTS), dedup=True) == {'a.md': PAGE}
+
+
+def test_prefetch_producer_stops_when_the_consumer_does():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    threads = threading.active_count()
+    for item in prefetch(source(), max_buffered=2):
+        break
+    for _ in range(50):
+        if threading.active_count() == threads:
+            break
+        threading.Event().wait(0.05)
+    assert threading.active_count() == threads
+    assert len(produced) < 10
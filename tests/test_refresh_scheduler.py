@@ -0,0 +1,49 @@
+import math
+
+from refresh_scheduler import RefreshScheduler
+
+DAY = 86400.0
+
+
+def scheduler():
+    return RefreshScheduler(path=None, prior_days=7)
+
+
+def test_unvisited_page_is_certainly_stale():
+    assert scheduler().stale_probability('https://docs.example/new', now=0) == 1.0
+
+
+def test_change_rate_follows_the_history():
+    history = scheduler()
+    for day in range(11):
+        # "often" changes on every visit, "rarely" never does
+        history.record('often', f"version {day}", visited_at=day * DAY)
+        history.record('rarely', 'same', visited_at=day * DAY)
+    assert history.change_rate('often') > history.change_rate('rarely')
+    # No changes in 10 days, pulled towards one change per week by the prior
+    assert math.isclose(history.change_rate('rarely'), 1 / (17 * DAY))
+    assert history.stale_probability('often', now=11 * DAY) > history.stale_probability('rarely', now=11 * DAY)
+
+
+def test_plan_spends_the_budget_on_the_stalest_pages():
+    history = scheduler()
+    for day in range(5):
+        history.record('often', f"version {day}", visited_at=day * DAY)
+        history.record('rarely', 'same', visited_at=day * DAY)
+    assert history.plan(['rarely', 'often', 'new'], budget=2, now=5 * DAY) == ['new', 'often']
+    assert history.plan(['rarely', 'often'], budget=None, now=5 * DAY) == ['often', 'rarely']
+
+
+def test_pages_fetched_this_cycle_are_recorded_not_refetched():
+    history = scheduler()
+    fetches = []
+
+    def fetch(url):
+        fetches.append(url)
+        return {'status_code': 200, 'text': f"text of {url}"}
+
+    just_fetched = {'a': {'status_code': 200, 'text': 'text of a'}}
+    selected = history.refresh(['a', 'b', 'c'], fetch, budget=1, now=0, fetched=just_fetched)
+    assert fetches == selected and len(selected) == 1 and 'a' not in selected
+    assert history.pages['a']['last_visit'] == 0
+    assert history.stale_probability('a', now=0) == 0.0
@@ -0,0 +1,50 @@
+import pytest
+
+import source_versions
+import summaries
+
+
+def summarize(name, content):
+    return {'summary': f"summary of {name}", 'sections': [], 'key_concepts': []}
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    monkeypatch.setattr(summaries, 'SUMMARY_DIR', str(tmp_path / 'summaries'))
+    docs_dir = tmp_path / 'docs'
+    docs_dir.mkdir()
+    (docs_dir / 'intro.md').write_text('# Intro\nWelcome.')
+    (docs_dir / 'setup.md').write_text('# Setup\nInstall it.')
+    documents = {path.name: path.read_text() for path in docs_dir.iterdir()}
+    summaries.build_summaries(
+        documents, summaries.summary_store_path(str(docs_dir)), summarize,
+        source='local', versions=source_versions.local_versions(str(docs_dir))
+    )
+    return docs_dir
+
+
+def test_unchanged_corpus_uses_the_summaries(docs):
+    store = summaries.load_current_summaries(str(docs))
+    assert sorted(store['documents']) == ['intro.md', 'setup.md']
+
+
+def test_changed_document_disables_the_summaries(docs):
+    (docs / 'intro.md').write_text('# Intro\nWelcome, with an edit.')
+    assert summaries.load_current_summaries(str(docs)) is None
+
+
+def test_added_document_disables_the_summaries(docs):
+    (docs / 'faq.md').write_text('# FAQ')
+    assert summaries.load_current_summaries(str(docs)) is None
+
+
+def test_removed_document_disables_the_summaries(docs):
+    (docs / 'setup.md').unlink()
+    assert summaries.load_current_summaries(str(docs)) is None
+
+
+def test_store_without_versions_is_not_used(docs):
+    summaries.build_summaries(
+        {'intro.md': '# Intro\nWelcome.'}, summaries.summary_store_path(str(docs)), summarize
+    )
+    assert summaries.load_current_summaries(str(docs)) is None